@@ -0,0 +1 @@
+from .benchmarks import SCENARIOS, compare, load_results, run_benchmarks, save_results, time_scenario
@@ -0,0 +1,353 @@
+import argparse
+import json
+import platform
+import random
+import statistics
+import time
+from functools import partial
+
+from bot.bot import BotPlayer
+from card.card import CARD_TABLE, COLORS, card_index
+from game.game import Game
+from hand.hand import Hand
+from hit_manager.hit_manager import HitManager
+from laiddownset.laiddownset import LaidDownSet
+from phase_validator.phase_validator import PhaseValidator
+from player.player import Player
+from simulation.simulation import HeadlessSimulation
+
+RESULTS_VERSION = 1
+DEFAULT_THRESHOLD = 0.10
+WILD_INDICES = [index for index, card in enumerate(CARD_TABLE) if card.card_type == 'wild']
+
+# Scenario name -> setup function. A setup builds fresh state from fixed
+# seeds and returns a list of zero-argument cases; only running the cases
+# is timed, and every case is run exactly once per repeat.
+SCENARIOS = {}
+
+
+def scenario(name):
+    """Register a setup function under a scenario name."""
+    def register(setup):
+        SCENARIOS[name] = setup
+        return setup
+    return register
+
+
+def _hand(indices):
+    hand = Hand()
+    for index in indices:
+        hand.add(CARD_TABLE[index])
+    return hand
+
+
+def _dealt_hands(seed, count, size, pool=CARD_TABLE):
+    rng = random.Random(seed)
+    hands = []
+    for _ in range(count):
+        hand = Hand()
+        for card in rng.sample(pool, size):
+            hand.add(card)
+        hands.append(hand)
+    return hands
+
+
+def phase_groups(requirements):
+    """Build one valid lay-down for a requirement list, with a wild in every group of 3 or more.
+
+    Each set uses its own number from 1 up, runs start at 5 (or lower, to
+    fit) and color groups take colors from the last one down, so no table
+    card is used twice.
+    """
+    used = set()
+    wilds = iter(WILD_INDICES)
+    next_number = 1
+    next_color = 0
+    groups = []
+
+    def take(color, number):
+        for copy in (0, 1):
+            index = card_index(color, number, copy)
+            if index not in used:
+                used.add(index)
+                return index
+        return None
+
+    for group_type, size in requirements:
+        if group_type == 'set':
+            number = next_number
+            next_number += 1
+            naturals = [take(color, number) for color in COLORS for _ in (0, 1)]
+            naturals = [index for index in naturals if index is not None]
+        elif group_type == 'run':
+            start = min(5, 13 - size)
+            naturals = [take(COLORS[offset % len(COLORS)], start + offset) for offset in range(size)]
+        else:
+            color = COLORS[len(COLORS) - 1 - next_color]
+            next_color += 1
+            naturals = [take(color, number) for number in range(1, size + 1)]
+        group = naturals[:size - 1 if size >= 3 else size]
+        group += [next(wilds) for _ in range(size - len(group))]
+        groups.append([CARD_TABLE[index] for index in group])
+    return groups
+
+
+def _register_validate_phase(phase):
+    def setup():
+        groups = phase_groups(PhaseValidator.PHASE_REQUIREMENTS[phase])
+        if not PhaseValidator.validate_phase(phase, groups):
+            raise ValueError(f"Benchmark lay-down for phase {phase} is not valid")
+        return [partial(PhaseValidator.validate_phase, phase, groups)] * 500
+    scenario(f"validate_phase/phase_{phase}")(setup)
+
+
+for _phase in PhaseValidator.PHASE_REQUIREMENTS:
+    _register_validate_phase(_phase)
+
+
+def _realistic_hands():
+    # Freshly dealt 11-card hands
+    return _dealt_hands(21, 200, 11)
+
+
+def _adversarial_hands():
+    # 24-card hands from numbers 3-8 only: many duplicates, long runs
+    pool = [card for card in CARD_TABLE if card.card_type == 'number' and 3 <= card.number <= 8]
+    return _dealt_hands(22, 50, 24, pool)
+
+
+@scenario("hand/find_sets/realistic")
+def _find_sets_realistic():
+    return [partial(hand.find_sets, 3) for hand in _realistic_hands()]
+
+
+@scenario("hand/find_sets/adversarial")
+def _find_sets_adversarial():
+    return [partial(hand.find_sets, 3) for hand in _adversarial_hands()]
+
+
+@scenario("hand/find_runs/realistic")
+def _find_runs_realistic():
+    return [partial(hand.find_runs, 4) for hand in _realistic_hands()]
+
+
+@scenario("hand/find_runs/adversarial")
+def _find_runs_adversarial():
+    return [partial(hand.find_runs, 4) for hand in _adversarial_hands()]
+
+
+_turn_snapshots = []
+
+
+def _bot_turn_snapshots():
+    """Return game states, one before each of the first turns of a seeded bot game."""
+    if not _turn_snapshots:
+        players = [BotPlayer(f"Bot {seat + 1}") for seat in range(4)]
+        game = Game(players, rng=random.Random("benchmark:turns"))
+        while len(_turn_snapshots) < 300:
+            game.start_new_round()
+            turns = 0
+            while not game.is_round_over() and turns < 500 and len(_turn_snapshots) < 300:
+                _turn_snapshots.append(game.clone())
+                game.get_current_player().play_turn(game)
+                game.end_turn()
+                turns += 1
+            game.calculate_round_scores()
+            if game.is_game_over():
+                break
+            game.reset_for_next_round()
+    return _turn_snapshots
+
+
+@scenario("bot/play_turn")
+def _bot_play_turn():
+    cases = []
+    for snapshot in _bot_turn_snapshots():
+        game = snapshot.clone()
+        player = game.get_current_player()
+        # Build the usefulness scores up front, as they are kept across turns in play
+        player._usefulness()
+        cases.append(partial(player.play_turn, game))
+    return cases
+
+
+def _hit_cases(card_spec, set_index, count=200):
+    """Build try_hit calls of one card on a fresh game and target each.
+
+    The target has laid down phase 2 (a set of 7s and a run of 3-6); the
+    source holds the card (a table index) and three others.
+    """
+    target_groups = [[CARD_TABLE[card_index(color, 7)] for color in COLORS[:3]],
+                     [CARD_TABLE[card_index(COLORS[number % 4], number)] for number in range(3, 7)]]
+    card = CARD_TABLE[card_spec]
+    others = [card_index('blue', 1, 1), card_index('green', 11, 1), WILD_INDICES[0]]
+    cases = []
+    for seat in range(count):
+        source, target = Player(f"Source {seat}"), Player(f"Target {seat}")
+        source.hand = _hand(others + [card_spec])
+        target.laid_down_sets = [LaidDownSet(list(group), set_type)
+                                 for group, set_type in zip(target_groups, ('set', 'run'))]
+        target.has_laid_down_phase = True
+        game = Game([source, target])
+        game.rebuild_hit_index()
+        cases.append(partial(HitManager.try_hit, source, target, set_index, card, game=game))
+    return cases
+
+
+@scenario("hit_manager/try_hit/set")
+def _try_hit_set():
+    return _hit_cases(card_index('yellow', 7), 0)
+
+
+@scenario("hit_manager/try_hit/run")
+def _try_hit_run():
+    return _hit_cases(card_index('yellow', 2), 1)
+
+
+@scenario("hit_manager/try_hit/rejected")
+def _try_hit_rejected():
+    return _hit_cases(card_index('red', 10), 1)
+
+
+@scenario("game/headless")
+def _headless_games():
+    simulation = HeadlessSimulation(base_seed="benchmark")
+    return [partial(simulation.play_game, game_index) for game_index in range(3)]
+
+
+def time_scenario(setup, repeat=5, clock=time.perf_counter):
+    """Time one scenario.
+
+    Returns:
+        dict: The number of cases, the repeats, and the best, median and
+              mean seconds per case across repeats.
+    """
+    per_case = []
+    cases = []
+    for _ in range(repeat):
+        cases = setup()
+        start = clock()
+        for case in cases:
+            case()
+        per_case.append((clock() - start) / len(cases))
+    return {
+        'cases': len(cases),
+        'repeat': repeat,
+        'best': min(per_case),
+        'median': statistics.median(per_case),
+        'mean': statistics.fmean(per_case),
+    }
+
+
+def run_benchmarks(names=None, repeat=5, only=None):
+    """Run scenarios and return machine-readable results.
+
+    Args:
+        names (list, optional): Scenarios to run. Defaults to all of them.
+        repeat (int): Timed repeats per scenario.
+        only (str, optional): Run only scenarios whose name contains this.
+    """
+    if names is None:
+        names = list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        raise ValueError(f"Unknown benchmark scenarios: {', '.join(unknown)}")
+    if only is not None:
+        names = [name for name in names if only in name]
+    return {
+        'version': RESULTS_VERSION,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'results': {name: time_scenario(SCENARIOS[name], repeat) for name in names},
+    }
+
+
+def save_results(results, path):
+    """Write benchmark results to a JSON file."""
+    with open(path, 'w') as stream:
+        json.dump(results, stream, indent=2, sort_keys=True)
+
+
+def load_results(path):
+    """Read benchmark results written by save_results."""
+    with open(path) as stream:
+        results = json.load(stream)
+    if results.get('version') != RESULTS_VERSION:
+        raise ValueError(f"Unsupported benchmark results version {results.get('version')!r}")
+    return results
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD, stat='best'):
+    """Compare two result sets scenario by scenario.
+
+    Args:
+        baseline, current: Results as returned by run_benchmarks.
+        threshold (float): Relative slowdown beyond which a scenario counts
+            as a regression, e.g. 0.10 for 10%.
+        stat (str): Per-case statistic to compare ('best', 'median' or 'mean').
+
+    Returns:
+        list[dict]: One row per scenario present in both, with the two
+                    times, the relative change and a 'regressed' flag.
+    """
+    rows = []
+    for name, result in current['results'].items():
+        before = baseline['results'].get(name)
+        if before is None:
+            continue
+        old, new = before[stat], result[stat]
+        change = new / old - 1 if old > 0 else 0.0
+        rows.append({'name': name, 'baseline': old, 'current': new,
+                     'change': change, 'regressed': change > threshold})
+    return rows
+
+
+def format_comparison(rows):
+    """Render comparison rows as a text table."""
+    lines = [f"{'scenario':<34} {'baseline':>12} {'current':>12} {'change':>8}"]
+    for row in rows:
+        flag = "  REGRESSION" if row['regressed'] else ""
+        lines.append(f"{row['name']:<34} {row['baseline'] * 1e6:>10.2f}us "
+                     f"{row['current'] * 1e6:>10.2f}us {row['change']:>+8.1%}{flag}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """Command line entry point; returns 1 if a comparison found regressions."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks",
+                                     description="Time Phase 10 operations on fixed-seed scenarios.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    run = commands.add_parser('run', help="run the scenarios and write JSON results")
+    run.add_argument('-o', '--output', default='benchmark_results.json')
+    run.add_argument('-r', '--repeat', type=int, default=5)
+    run.add_argument('-k', '--only', help="run only scenarios whose name contains this")
+    run.add_argument('--baseline', help="compare the new results against this file")
+    check = commands.add_parser('compare', help="compare two result files")
+    check.add_argument('baseline')
+    check.add_argument('current')
+    commands.add_parser('list', help="list the scenarios")
+    for command in (run, check):
+        command.add_argument('-t', '--threshold', type=float, default=DEFAULT_THRESHOLD,
+                             help="relative slowdown reported as a regression (default 0.10)")
+        command.add_argument('--stat', choices=('best', 'median', 'mean'), default='best')
+    args = parser.parse_args(argv)
+
+    if args.command == 'list':
+        print("\n".join(SCENARIOS))
+        return 0
+    if args.command == 'run':
+        current = run_benchmarks(repeat=args.repeat, only=args.only)
+        save_results(current, args.output)
+        for name, result in current['results'].items():
+            print(f"{name:<34} {result[args.stat] * 1e6:>10.2f}us per case")
+        if args.baseline is None:
+            return 0
+        baseline = load_results(args.baseline)
+    else:
+        baseline = load_results(args.baseline)
+        current = load_results(args.current)
+    rows = compare(baseline, current, args.threshold, args.stat)
+    print(format_comparison(rows))
+    return 1 if any(row['regressed'] for row in rows) else 0
+
@@ -1 +1 @@
-from .board import GameBoard
+from .board import GameBoard, HitIndex
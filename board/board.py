@@ -1,6 +1,6 @@
 from card.card import Card
 from laiddownset.laiddownset import LaidDownSet
-from typing import List
+from typing import Dict, Hashable, List, Set
 
 class GameBoard:
     """Tracks all players' laid-down sets during gameplay."""
@@ -28,3 +28,71 @@ class GameBoard:
                 cards_str = ', '.join(str(card) for card in laid_down_set.cards)
                 output.append(f"  Set {i} ({laid_down_set.set_type}): {cards_str}")
         return '\n'.join(output)
+
+
+class HitIndex:
+    """Maps every laid-down set to the cards it currently accepts.
+
+    Sets are identified by a hashable key, e.g. (player_index, set_index).
+    Finding where a card can be hit is then a dictionary lookup instead of a
+    scan over every set on the table.
+    """
+    def __init__(self):
+        """Initialize an empty index."""
+        self.by_number: Dict[int, Set[Hashable]] = {}
+        self.by_color: Dict[str, Set[Hashable]] = {}
+        self.wild_targets: Set[Hashable] = set()
+        self._entries = {}  # key -> (numbers, colors) currently indexed
+        self.owner = None  # token of the Game allowed to modify the index in place
+
+    def copy(self) -> 'HitIndex':
+        """Return an independent copy of the index."""
+        other = HitIndex()
+        other.by_number = {number: set(keys) for number, keys in self.by_number.items()}
+        other.by_color = {color: set(keys) for color, keys in self.by_color.items()}
+        other.wild_targets = set(self.wild_targets)
+        other._entries = dict(self._entries)
+        return other
+
+    def update(self, key: Hashable, laid_down_set: LaidDownSet) -> None:
+        """Re-index one set after it was laid down or hit."""
+        self.remove(key)
+        numbers = laid_down_set.accepted_numbers()
+        colors = laid_down_set.accepted_colors()
+        for number in numbers:
+            self.by_number.setdefault(number, set()).add(key)
+        for color in colors:
+            self.by_color.setdefault(color, set()).add(key)
+        if laid_down_set.accepts_wild():
+            self.wild_targets.add(key)
+        self._entries[key] = (numbers, colors)
+
+    def remove(self, key: Hashable) -> None:
+        """Drop a set from the index."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        numbers, colors = entry
+        for number in numbers:
+            self.by_number[number].discard(key)
+        for color in colors:
+            self.by_color[color].discard(key)
+        self.wild_targets.discard(key)
+
+    def clear(self) -> None:
+        """Remove every set from the index."""
+        self.by_number.clear()
+        self.by_color.clear()
+        self.wild_targets.clear()
+        self._entries.clear()
+
+    def targets(self, card: Card) -> Set[Hashable]:
+        """Return the keys of all sets the card can currently be hit on."""
+        if card.card_type == 'wild':
+            return set(self.wild_targets)
+        if card.card_type != 'number':
+            return set()
+        return self.by_number.get(card.number, set()) | self.by_color.get(card.color, set())
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,5 +1,7 @@
+from bot.usefulness import UsefulnessScores
 from player.player import Player
 import random
+import time
 
 
 class BotPlayer(Player):
@@ -8,26 +10,60 @@ class BotPlayer(Player):
     def __init__(self, name: str):
         """Initialize the bot player with a name."""
         super().__init__(name)
+        self.last_decision_stats = None  # Work done in the last turn, see play_turn
+        self._scores = None  # UsefulnessScores of the current hand
     
-    def play_turn(self, game):
-        """Automatically play the bot's turn."""
+    def clone(self):
+        """Return a copy of the bot; its scores are rebuilt for the copied hand."""
+        other = super().clone()
+        other._scores = None
+        return other
+
+    def play_turn(self, game, time_budget=None, clock=time.monotonic):
+        """Automatically play the bot's turn.
+
+        Args:
+            game (Game): Game being played.
+            time_budget (float, optional): Seconds the turn may take. The
+                deadline is checked before each decision: once it has
+                passed, the draw comes from the deck without weighing the
+                discard pile, laying down and hitting are skipped, and the
+                discard, which every turn must make, uses the scores kept
+                from earlier turns.
+            clock: Monotonic clock returning seconds, used for the budget.
+
+        The work done is recorded in last_decision_stats; 'timed_out' is set
+        if any decision found the deadline passed.
+        """
+        start = clock()
+        deadline = None if time_budget is None else start + time_budget
+        stats = self.last_decision_stats = {'candidates': 0, 'elapsed': 0.0, 'timed_out': False}
+
+        def out_of_time():
+            if deadline is not None and clock() >= deadline:
+                stats['timed_out'] = True
+                return True
+            return False
+
         # Decision 1: Draw from deck or discard pile
-        should_draw_discard = self._should_draw_from_discard(game)
+        should_draw_discard = not out_of_time() and self._should_draw_from_discard(game)
         if should_draw_discard and game.deck.discard_pile:
             card = game.take_from_discard(self)
         else:
             card = game.draw_from_deck(self)
         
         # Decision 2: Try to lay down phase if possible
-        if not self.has_laid_down_phase:
-            self._try_lay_down_phase()
+        if not self.has_laid_down_phase and not out_of_time():
+            self._try_lay_down_phase(game)
         
         # Decision 3: Try to hit on other players if already laid down
-        if self.has_laid_down_phase:
+        if self.has_laid_down_phase and not out_of_time():
             self._try_hit_on_players(game)
         
         # Decision 4: Discard the least useful card
-        self._discard_worst_card(game)
+        out_of_time()  # the discard is required; a late one is still recorded
+        stats['candidates'] = self._discard_worst_card(game)
+        stats['elapsed'] = clock() - start
     
     def _should_draw_from_discard(self, game):
         """Determine if bot should draw from discard pile."""
@@ -56,8 +92,7 @@ class BotPlayer(Player):
         if card.card_type != 'number':
             return True  # Wild cards are always useful
         
-        same_number_count = sum(1 for c in self.hand.cards 
-                               if c.card_type == 'number' and c.number == card.number)
+        same_number_count = self.hand.count_number(card.number)
         return same_number_count >= 2  # Would make a set of 3
     
     def _card_extends_run(self, card):
@@ -65,121 +100,59 @@ class BotPlayer(Player):
         if card.card_type != 'number':
             return True  # Wild cards are always useful
         
-        numbers = [c.number for c in self.hand.cards if c.card_type == 'number']
-        numbers.append(card.number)
-        numbers.sort()
-        
-        # Check for consecutive sequences
-        consecutive_count = 1
-        max_consecutive = 1
-        
-        for i in range(1, len(numbers)):
-            if numbers[i] == numbers[i-1] + 1:
-                consecutive_count += 1
-                max_consecutive = max(max_consecutive, consecutive_count)
-            else:
-                consecutive_count = 1
-        
-        return max_consecutive >= 3  # Forms a run of at least 3
+        # Longest stretch of consecutive numbers once the card is added
+        return self.hand.longest_run(extra_number=card.number) >= 3  # Forms a run of at least 3
     
-    def _try_lay_down_phase(self):
+    def _try_lay_down_phase(self, game):
         """Try to lay down the current phase."""
-        from phase_validator.phase_validator import PhaseValidator
-        
-        # Find all possible sets and runs
-        sets = self.hand.find_sets(3)
-        runs = self.hand.find_runs(4)
-        
-        # Try different combinations based on current phase
-        phase_req = PhaseValidator.PHASE_REQUIREMENTS.get(self.current_phase, [])
-        
-        # Simple strategy: try to lay down if we have enough groups
-        if self.current_phase == 1:  # 2 sets of 3
-            if len(sets) >= 2:
-                selected_sets = sets[:2]
-                success = self.lay_down(selected_sets)
-                if success:
-                    return True
+        from phase_solver.phase_cache import phase_cache
+        from phase_solver.phase_solver import PhaseSolver
         
-        elif self.current_phase == 2:  # 1 set of 3 + 1 run of 4
-            if len(sets) >= 1 and len(runs) >= 1:
-                selected_groups = [sets[0], runs[0]]
-                success = self.lay_down(selected_groups)
-                if success:
-                    return True
+        plan = self.phase_plan()
+        if plan is None or not phase_cache.can_complete(self.hand, plan):
+            return False
         
-        elif self.current_phase == 4:  # 1 run of 7
-            long_runs = [run for run in runs if len(run) >= 7]
-            if long_runs:
-                success = self.lay_down([long_runs[0]])
-                if success:
-                    return True
+        # Lay down the grouping that leaves the fewest penalty points
+        solution = PhaseSolver.solve(self.hand, plan)
+        if solution and game.lay_down_phase(self, solution.groups):
+            return True
         
         return False
     
     def _try_hit_on_players(self, game):
         """Try to hit cards on other players' laid down sets."""
-        for other_player in game.players:
-            if other_player != self and other_player.has_laid_down_phase:
-                for set_index, laid_set in enumerate(other_player.laid_down_sets):
-                    # Try each card in hand
-                    for card in self.hand.cards[:]:  # Copy list to avoid modification during iteration
-                        if laid_set.can_add_card(card):
-                            success = game.hit_on_player_set(self, other_player, set_index, card)
-                            if success:
-                                break  # Only hit one card per turn
+        hit_sets = set()
+        for card, other_player, set_index in game.find_hits(self):
+            key = (id(other_player), set_index)
+            if key in hit_sets:
+                continue
+            success = game.hit_on_player_set(self, other_player, set_index, card)
+            if success:
+                hit_sets.add(key)  # Only hit one card per set per turn
     
+    def _usefulness(self):
+        """Return the usefulness scores of the current hand.
+
+        A new hand is dealt every round, so the scores are re-attached
+        whenever the hand object changes.
+        """
+        scores = self._scores
+        if scores is None or scores.hand is not self.hand:
+            scores = self._scores = UsefulnessScores(self.hand)
+        return scores
+
     def _discard_worst_card(self, game):
-        """Discard the least useful card."""
-        if not self.hand.cards:
-            return
-        
-        # Score each card and discard the worst one
-        card_scores = []
-        for i, card in enumerate(self.hand.cards):
-            score = self._score_card_usefulness(card)
-            card_scores.append((score, i, card))
-        
-        # Sort by score (lower is worse)
-        card_scores.sort()
-        
-        # Discard the worst card
-        worst_score, worst_index, worst_card = card_scores[0]
-        game.discard_card(self, worst_index)
+        """Discard the least useful card and return how many candidates were weighed.
+
+        Candidates are the usefulness-heap entries inspected to find the
+        worst number card, plus the skip and wild options.
+        """
+        scores = self._usefulness()
+        worst_index = scores.worst_index()
+        if worst_index is not None:
+            game.discard_card(self, worst_index)
+        return scores.last_candidates
     
     def _score_card_usefulness(self, card):
         """Score how useful a card is (higher = more useful)."""
-        score = 0
-        
-        # Wild cards are always valuable
-        if card.card_type == 'wild':
-            return 100
-        
-        # Skip cards have medium value
-        if card.card_type == 'skip':
-            return 50
-        
-        # Number cards - check if they help with sets or runs
-        if card.card_type == 'number':
-            # Check if forms sets
-            same_number_count = sum(1 for c in self.hand.cards 
-                                   if c != card and c.card_type == 'number' and c.number == card.number)
-            score += same_number_count * 10  # More matching cards = higher score
-            
-            # Check if extends runs
-            numbers = [c.number for c in self.hand.cards if c != card and c.card_type == 'number']
-            numbers.sort()
-            
-            # Check how well this card fits into sequences
-            adjacent_count = 0
-            for num in numbers:
-                if abs(num - card.number) == 1:
-                    adjacent_count += 1
-            
-            score += adjacent_count * 5
-            
-            # Lower numbered cards are generally easier to use
-            if card.number <= 6:
-                score += 5
-        
-        return score
+        return self._usefulness().score(card)
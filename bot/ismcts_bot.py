@@ -0,0 +1,363 @@
+import math
+import random
+import time
+
+from bot.bot import BotPlayer
+from card.card import card_points
+from hand.hand import Hand, MAX_NUMBER
+from move_generator.move_generator import (DRAW_DECK, DRAW_PILE, DRAW_STAGE, apply_move, card_kind,
+                                           discard_moves, generate_moves, lay_down_move)
+from phase_solver.phase_cache import phase_cache
+from phase_solver.phase_solver import PhaseSolver
+
+# A turn is searched as three decisions; stages without a choice are skipped.
+# Actions are move_generator moves, plus HOLD for not laying down.
+DRAW, LAY, DISCARD = DRAW_STAGE, 'lay', 'discard'
+HOLD = ('lay', None)
+# Decisions left in the turn at each stage, used to share out a time budget
+STAGES_LEFT = {DRAW: 3, LAY: 2, DISCARD: 1}
+
+
+def determinize(game, observer, rng):
+    """Return a clone of the game with the observer's hidden information resampled.
+
+    The cards the observer cannot see, the other players' hands and the
+    deck, are pooled, shuffled and dealt back so every hand and the deck
+    keep their sizes. Everything visible (the observer's hand, the discard
+    pile and the laid-down sets) is unchanged.
+    """
+    clone = game.clone(rng=random.Random(rng.getrandbits(64)))
+    seat = game.players.index(observer)
+    hidden = list(game.deck.cards)
+    for index, player in enumerate(game.players):
+        if index != seat:
+            hidden.extend(player.hand.cards)
+    rng.shuffle(hidden)
+
+    position = 0
+    for index, player in enumerate(clone.players):
+        if index == seat:
+            continue
+        size = len(player.hand.cards)
+        hand = Hand()
+        for card in hidden[position:position + size]:
+            hand.add(card)
+        player.hand = hand
+        position += size
+    clone.deck.cards = hidden[position:]
+    return clone
+
+
+def can_lay_down(player):
+    """Check whether the player could lay down their phase right now."""
+    plan = player.phase_plan()
+    return (not player.has_laid_down_phase and plan is not None
+            and phase_cache.can_complete(player.hand, plan))
+
+
+def best_lay_down(player):
+    """Return the lay-down move leaving the fewest penalty points, or None."""
+    if not can_lay_down(player):
+        return None
+    plan = player.phase_plan()
+    solution = PhaseSolver.solve(player.hand, plan)
+    return lay_down_move(plan.requirements, solution.groups) if solution else None
+
+
+def lay_down_best(game, player):
+    """Lay down the grouping leaving the fewest penalty points, if there is one."""
+    move = best_lay_down(player)
+    return move is not None and apply_move(game, player, move)
+
+
+def hit_greedily(game, player):
+    """Make every available hit, at most one per set."""
+    hit_sets = set()
+    for card, other_player, set_index in game.find_hits(player):
+        key = (id(other_player), set_index)
+        if key not in hit_sets and game.hit_on_player_set(player, other_player, set_index, card):
+            hit_sets.add(key)
+
+
+def worst_card_index(hand):
+    """Return the index of the card a rollout discards.
+
+    Skips go first, wilds last; number cards are ranked by how many copies
+    and neighbouring numbers the hand holds, dropping high-point cards on ties.
+    """
+    counts = hand.number_counts
+
+    def value(card):
+        if card.card_type == 'wild':
+            return 1000
+        if card.card_type != 'number':
+            return -1000
+        n = card.number - 1
+        neighbours = (n > 0 and counts[n - 1] > 0) + (n < MAX_NUMBER - 1 and counts[n + 1] > 0)
+        return 100 * counts[n] + 50 * neighbours - card_points(card)
+
+    cards = hand.cards
+    return min(range(len(cards)), key=lambda index: value(cards[index]))
+
+
+def rollout_turn(game, player):
+    """Play one cheap heuristic turn; used for every seat during rollouts."""
+    pile = game.deck.discard_pile
+    top = pile[-1] if pile else None
+    if top is not None and (top.card_type == 'wild'
+                            or (top.card_type == 'number' and player.hand.count_number(top.number))):
+        game.take_from_discard(player)
+    else:
+        game.draw_from_deck(player)
+    lay_down_best(game, player)
+    if player.has_laid_down_phase:
+        hit_greedily(game, player)
+    if player.hand.cards:
+        game.discard_card(player, worst_card_index(player.hand))
+
+
+def legal_actions(game, player, stage):
+    """List the player's distinct choices at a stage of their turn.
+
+    Only the solver's best lay-down is offered against holding the phase;
+    hits are not searched.
+    """
+    if stage == DRAW:
+        return list(generate_moves(game, player, DRAW_STAGE))
+    if stage == LAY:
+        move = best_lay_down(player)
+        return [move, HOLD] if move is not None else []
+    if stage == DISCARD:
+        return discard_moves(player)
+    return []
+
+
+def apply_action(game, player, action):
+    """Carry out one action and return the stage that follows it.
+
+    Hits are not searched: once the phase is down, every available hit is
+    made right after the lay-down stage.
+    """
+    if action[0] == 'draw':
+        apply_move(game, player, action)
+        return LAY
+    if action[0] == 'lay':
+        if action != HOLD:
+            apply_move(game, player, action)
+        if player.has_laid_down_phase:
+            hit_greedily(game, player)
+        return DISCARD
+    apply_move(game, player, action)
+    return None
+
+
+def next_choice(game, player, stage):
+    """Skip stages without a choice; return (stage, actions) or (None, [])."""
+    while stage is not None:
+        actions = legal_actions(game, player, stage)
+        if len(actions) > 1 or (actions and stage != LAY):
+            return stage, actions
+        if stage == LAY:
+            stage = apply_action(game, player, HOLD)
+        elif stage == DRAW:
+            stage = LAY  # Deck and discard pile are both empty
+        else:
+            stage = None  # Went out by laying down and hitting
+    return None, []
+
+
+def default_action(game, player, stage, actions):
+    """The rollout policy's choice at a stage of the searching player's turn."""
+    if stage == LAY:
+        return actions[0]  # The best lay-down
+    if stage == DISCARD:
+        return ('discard', card_kind(player.hand.cards[worst_card_index(player.hand)]))
+    top = game.deck.discard_pile[-1] if game.deck.discard_pile else None
+    if DRAW_PILE in actions and (top.card_type == 'wild'
+                                 or (top.card_type == 'number' and player.hand.count_number(top.number))):
+        return DRAW_PILE
+    return DRAW_DECK
+
+
+def round_reward(game, player):
+    """Score the round for the player against every opponent, in [0, 1].
+
+    Players are ranked by going out, then by having laid down their phase,
+    then by the penalty points left in hand. The reward is the fraction of
+    opponents the player beats, counting ties as half.
+    """
+    def key(other):
+        hand = other.hand.cards
+        return (not hand, other.has_laid_down_phase, -sum(card_points(card) for card in hand))
+
+    mine = key(player)
+    opponents = [key(other) for other in game.players if other is not player]
+    beaten = sum(1.0 if mine > theirs else 0.5 if mine == theirs else 0.0 for theirs in opponents)
+    return beaten / len(opponents) if opponents else 1.0
+
+
+def best_action(stats):
+    """Pick the most visited root action, breaking ties by total reward."""
+    return max(stats, key=lambda action: stats[action])
+
+
+class _Node:
+    """A node of the information-set tree: one action of the searching player."""
+    __slots__ = ('action', 'children', 'visits', 'reward', 'available')
+
+    def __init__(self, action=None):
+        self.action = action
+        self.children = {}
+        self.visits = 0
+        self.reward = 0.0
+        self.available = 0  # Iterations in which this action was legal
+
+    def select(self, actions, exploration):
+        """Pick the legal child with the best upper confidence bound."""
+        best, best_value = None, -1.0
+        for action in actions:
+            child = self.children[action]
+            value = (child.reward / child.visits
+                     + exploration * math.sqrt(math.log(child.available) / child.visits))
+            if value > best_value:
+                best, best_value = child, value
+        return best
+
+
+class ISMCTSBot(BotPlayer):
+    """A bot that chooses its actions by information-set Monte Carlo tree search.
+
+    Every search iteration deals the hidden cards (other hands and the deck
+    order) at random in a way that is consistent with what the bot can see,
+    descends the tree of its own draw, lay-down and discard choices, and
+    finishes the round with fast heuristic rollouts for all seats.
+    """
+
+    def __init__(self, name, iterations=48, rollout_turns=16, exploration=0.7, seed=None):
+        """Initialize the bot.
+
+        Args:
+            name (str): Player name.
+            iterations (int): Search iterations per decision.
+            rollout_turns (int): Turns simulated after the bot's turn before
+                the round is scored.
+            exploration (float): UCB exploration constant.
+            seed: Seed of the bot's own random stream. Defaults to the
+                player's name, so seeded simulations stay reproducible.
+        """
+        super().__init__(name)
+        self.iterations = iterations
+        self.rollout_turns = rollout_turns
+        self.exploration = exploration
+        self.rng = random.Random(name if seed is None else seed)
+        self.decisions = 0  # Searched decisions
+        self.iterations_run = 0
+
+    def clone(self):
+        """Return a copy of the bot with its own copy of the random stream."""
+        other = super().clone()
+        other.rng = random.Random()
+        other.rng.setstate(self.rng.getstate())
+        return other
+
+    def play_turn(self, game, time_budget=None, clock=time.monotonic):
+        """Play the bot's turn, searching every decision that has a choice.
+
+        Args:
+            game (Game): Game being played.
+            time_budget (float, optional): Seconds the turn may take. Each
+                search gets an equal share of what is left for the turn's
+                remaining decisions and stops early, returning its best
+                action so far, when the share is spent.
+            clock: Monotonic clock returning seconds, used for the budget.
+
+        The iterations run are recorded in last_decision_stats.
+        """
+        start = clock()
+        deadline = None if time_budget is None else start + time_budget
+        stats = self.last_decision_stats = {'candidates': 0, 'elapsed': 0.0, 'timed_out': False}
+        stage, actions = next_choice(game, self, DRAW)
+        while stage is not None:
+            if len(actions) == 1:
+                action = actions[0]
+            else:
+                search_deadline = None
+                if deadline is not None:
+                    search_deadline = clock() + (deadline - clock()) / STAGES_LEFT[stage]
+                action = self.search(game, stage, search_deadline, clock)
+            stage, actions = next_choice(game, self, apply_action(game, self, action))
+        stats['elapsed'] = clock() - start
+        stats['timed_out'] = deadline is not None and clock() >= deadline
+
+    def search(self, game, stage, deadline=None, clock=time.monotonic):
+        """Return the most visited action at the given stage of the bot's turn.
+
+        Args:
+            deadline (float, optional): Clock time at which to stop searching,
+                even if fewer than self.iterations iterations have run.
+            clock: Monotonic clock the deadline refers to.
+        """
+        stats = self.search_root(game, stage, self.iterations, deadline, clock)
+        self._record_search(sum(visits for visits, _ in stats.values()))
+        return best_action(stats)
+
+    def _record_search(self, iterations):
+        """Count one search of the given number of iterations."""
+        self.decisions += 1
+        self.iterations_run += iterations
+        if self.last_decision_stats is not None:
+            self.last_decision_stats['candidates'] += iterations
+
+    def search_root(self, game, stage, iterations, deadline=None, clock=time.monotonic):
+        """Run the search and return the root statistics.
+
+        At least one iteration runs, whatever the deadline.
+
+        Returns:
+            dict: action -> [visits, total reward] for every root action tried.
+        """
+        root = _Node()
+        seat = game.players.index(self)
+        for iteration in range(iterations):
+            if iteration and deadline is not None and clock() >= deadline:
+                break
+            world = determinize(game, self, self.rng)
+            me = world.players[seat]
+            node = root
+            path = [root]
+            current, actions = next_choice(world, me, stage)
+            # Selection and expansion over the bot's own remaining choices
+            while current is not None:
+                for action in actions:
+                    child = node.children.get(action)
+                    if child is not None:
+                        child.available += 1
+                untried = [action for action in actions if action not in node.children]
+                if untried:
+                    action = self.rng.choice(untried)
+                    child = _Node(action)
+                    child.available = 1
+                    node.children[action] = node = child
+                    path.append(node)
+                    current, actions = next_choice(world, me, apply_action(world, me, action))
+                    break
+                node = node.select(actions, self.exploration)
+                path.append(node)
+                current, actions = next_choice(world, me, apply_action(world, me, node.action))
+            # Finish the turn, then the round, with the rollout policy
+            while current is not None:
+                action = default_action(world, me, current, actions)
+                current, actions = next_choice(world, me, apply_action(world, me, action))
+            world.end_turn()
+            for _ in range(self.rollout_turns):
+                if world.is_round_over():
+                    break
+                rollout_turn(world, world.get_current_player())
+                world.end_turn()
+
+            reward = round_reward(world, me)
+            for visited in path:
+                visited.visits += 1
+                visited.reward += reward
+
+        return {action: [child.visits, child.reward] for action, child in root.children.items()}
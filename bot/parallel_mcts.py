@@ -0,0 +1,139 @@
+import atexit
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from bot.ismcts_bot import ISMCTSBot, best_action
+from journal.journal import decode_state, encode_state
+from phase_validator.rules import RuleSet, get_rule_set
+from player.player import Player
+
+# Long-lived worker pools, one per worker count, shared by every bot
+_pools = {}
+# Rule sets sent by the caller that this worker process had not registered
+_shard_rule_sets = {}
+
+
+def _warm_up():
+    """Worker initializer: import the search stack and fill the phase cache."""
+    from phase_solver.phase_cache import phase_cache
+    from phase_validator.phase_validator import PhaseValidator
+    from simulation.simulation import HeadlessSimulation
+
+    # A short headless round touches every code path a search uses
+    game = HeadlessSimulation(max_rounds=1, max_turns_per_round=40).create_game(0)
+    game.start_new_round()
+    for _ in range(40):
+        if game.is_round_over():
+            break
+        game.get_current_player().play_turn(game)
+        game.end_turn()
+    for phase in PhaseValidator.PHASE_REQUIREMENTS:
+        phase_cache.can_complete(game.players[0].hand, phase)
+
+
+def _shard_rules(name, phases):
+    """Return the rule set a shard plays by, building it if this process lacks it."""
+    try:
+        rules = get_rule_set(name)
+    except ValueError:
+        rules = None
+    if rules is None or rules.phases != phases:
+        rules = _shard_rule_sets.get(name)
+        if rules is None or rules.phases != phases:
+            rules = _shard_rule_sets[name] = RuleSet(name, phases)
+    return rules
+
+
+def _search_shard(state, seat, num_players, stage, iterations, rollout_turns, exploration, seed,
+                  time_left=None, rule_set=None):
+    """Worker entry point: search one independent tree from an encoded state.
+
+    time_left is measured on the worker's own monotonic clock, since the
+    caller's clock cannot be shared across processes. rule_set is the
+    game's (name, phases), as the worker may not have that rule set
+    registered; without it the name in the state is looked up.
+    """
+    deadline = None if time_left is None else time.monotonic() + time_left
+    players = [Player(f"Player {index + 1}") for index in range(num_players)]
+    searcher = ISMCTSBot(players[seat].name, rollout_turns=rollout_turns,
+                         exploration=exploration, seed=seed)
+    players[seat] = searcher
+    rules = None if rule_set is None else _shard_rules(*rule_set)
+    game = decode_state(state, players, rules=rules)
+    return searcher.search_root(game, stage, iterations, deadline)
+
+
+def get_pool(workers):
+    """Return the shared, pre-warmed pool with the given number of workers."""
+    pool = _pools.get(workers)
+    if pool is None:
+        pool = _pools[workers] = ProcessPoolExecutor(max_workers=workers, initializer=_warm_up)
+    return pool
+
+
+def shutdown_pools():
+    """Stop every worker pool; they are started again on demand."""
+    while _pools:
+        _, pool = _pools.popitem()
+        pool.shutdown()
+
+
+atexit.register(shutdown_pools)
+
+
+def merge_root_stats(shards):
+    """Add up root statistics from independent searches."""
+    merged = {}
+    for stats in shards:
+        for action, (visits, reward) in stats.items():
+            total = merged.setdefault(action, [0, 0.0])
+            total[0] += visits
+            total[1] += reward
+    return merged
+
+
+class RootParallelISMCTSBot(ISMCTSBot):
+    """An ISMCTS bot that spreads each search over a pool of worker processes.
+
+    Every worker runs an independent search, with its own determinizations,
+    from the same snapshot of the game; the root visit counts are summed and
+    the most visited action is played. The snapshot is sent as the compact
+    byte encoding of journal.encode_state, and the workers are started once
+    and kept warm between turns.
+    """
+
+    def __init__(self, name, iterations=192, workers=None, rollout_turns=16, exploration=0.7, seed=None):
+        """Initialize the bot.
+
+        Args:
+            name (str): Player name.
+            iterations (int): Search iterations per decision, split evenly
+                across the workers.
+            workers (int, optional): Number of worker processes; 1 searches
+                in-process. Defaults to the CPU count.
+            rollout_turns (int): See ISMCTSBot.
+            exploration (float): See ISMCTSBot.
+            seed: See ISMCTSBot.
+        """
+        super().__init__(name, iterations, rollout_turns, exploration, seed)
+        self.workers = workers or os.cpu_count() or 1
+
+    def search(self, game, stage, deadline=None, clock=time.monotonic):
+        """Return the action with the most visits summed over all workers."""
+        if self.workers <= 1:
+            return super().search(game, stage, deadline, clock)
+        per_worker = -(-self.iterations // self.workers)
+        state = encode_state(game)
+        seat = game.players.index(self)
+        time_left = None if deadline is None else deadline - clock()
+        rule_set = (game.rules.name, game.rules.phases)
+        futures = [
+            get_pool(self.workers).submit(_search_shard, state, seat, len(game.players), stage,
+                                          per_worker, self.rollout_turns, self.exploration,
+                                          self.rng.getrandbits(64), time_left, rule_set)
+            for _ in range(self.workers)
+        ]
+        stats = merge_root_stats(future.result() for future in futures)
+        self._record_search(sum(visits for visits, _ in stats.values()))
+        return best_action(stats)
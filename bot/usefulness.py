@@ -0,0 +1,117 @@
+import heapq
+
+from hand.hand import MAX_NUMBER
+
+WILD_SCORE = 100
+SKIP_SCORE = 50
+# Discard order among equal scores: skips, then number cards, then wilds
+_SKIP_RANK, _NUMBER_RANK, _WILD_RANK = 0, 1, 2
+
+
+class UsefulnessScores:
+    """Card-usefulness scores of a hand, kept up to date as the hand changes.
+
+    Every number card with number n scores
+
+        10 * (other cards numbered n) + 5 * (cards numbered n - 1 or n + 1)
+        + 5 if n <= 6,
+
+    so the score depends only on the number, and a card entering or leaving
+    the hand changes the scores of at most three numbers. Those are
+    recomputed from the hand's histogram and pushed onto a min-heap; entries
+    that no longer match the current score are dropped lazily when the
+    worst card is asked for. Wilds always score 100 and skips 50.
+    """
+
+    def __init__(self, hand):
+        """Attach to a hand and score its current cards."""
+        self.hand = hand
+        self.scores = [0] * MAX_NUMBER  # scores[number - 1]
+        self._heap = []
+        self.last_candidates = 0  # entries weighed by the last worst_index call
+        for number in range(MAX_NUMBER):
+            self._rescore(number)
+        hand.add_listener(self._on_change)
+
+    def detach(self):
+        """Stop following the hand."""
+        self.hand.remove_listener(self._on_change)
+
+    def _rescore(self, number):
+        counts = self.hand.number_counts
+        if not counts[number]:
+            return
+        score = 10 * (counts[number] - 1)
+        if number > 0:
+            score += 5 * counts[number - 1]
+        if number < MAX_NUMBER - 1:
+            score += 5 * counts[number + 1]
+        if number < 6:
+            score += 5
+        self.scores[number] = score
+        heapq.heappush(self._heap, (score, number))
+
+    def _on_change(self, card, delta):
+        if card.card_type != 'number':
+            return
+        number = card.number - 1
+        for neighbour in (number - 1, number, number + 1):
+            if 0 <= neighbour < MAX_NUMBER:
+                self._rescore(neighbour)
+        # Stale entries are bounded by rebuilding once they dominate the heap
+        if len(self._heap) > 8 * MAX_NUMBER:
+            counts = self.hand.number_counts
+            self._heap = [(self.scores[n], n) for n in range(MAX_NUMBER) if counts[n]]
+            heapq.heapify(self._heap)
+
+    def score(self, card):
+        """Return the usefulness of a card held in the hand (higher = more useful)."""
+        if card.card_type == 'wild':
+            return WILD_SCORE
+        if card.card_type == 'skip':
+            return SKIP_SCORE
+        if card.card_type == 'number':
+            return self.scores[card.number - 1]
+        return 0
+
+    def _worst_number(self):
+        """Return (score, number index) of the least useful number held, or None."""
+        heap = self._heap
+        counts = self.hand.number_counts
+        while heap:
+            self.last_candidates += 1
+            score, number = heap[0]
+            if counts[number] and self.scores[number] == score:
+                return heap[0]
+            heapq.heappop(heap)
+        return None
+
+    def worst_index(self):
+        """Return the hand index of the least useful card, or None if the hand is empty.
+
+        Finding the worst score takes O(log n) amortized; the index is that
+        of the first card of the chosen kind in the hand. The heap entries
+        inspected (stale ones included) and the skip and wild options are
+        counted in last_candidates.
+        """
+        hand = self.hand
+        options = []
+        self.last_candidates = 0
+        worst_number = self._worst_number()
+        if worst_number is not None:
+            options.append((worst_number[0], _NUMBER_RANK, worst_number[1]))
+        if hand.skip_count:
+            options.append((SKIP_SCORE, _SKIP_RANK, None))
+        if hand.wild_count:
+            options.append((WILD_SCORE, _WILD_RANK, None))
+        self.last_candidates += bool(hand.skip_count) + bool(hand.wild_count)
+        if not options:
+            return None
+        _, rank, number = min(options)
+        for index, card in enumerate(hand.cards):
+            if rank == _NUMBER_RANK:
+                if card.card_type == 'number' and card.number - 1 == number:
+                    return index
+            elif card.card_type == ('skip' if rank == _SKIP_RANK else 'wild'):
+                return index
+        return None
@@ -1 +1 @@
-from .card import Card
+from .card import Card, CARD_TABLE, card_from_index
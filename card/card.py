@@ -1,18 +1,48 @@
+COLORS = ('red', 'green', 'blue', 'yellow')
+NUMBERS = range(1, 13)
+COPIES_PER_NUMBER = 2
+SKIP_COUNT = 4
+WILD_COUNT = 8
+
+
 class Card:
+    """An immutable playing card.
+
+    Cards dealt in a game are shared flyweights from CARD_TABLE, so a card's
+    ``id`` is also its index in the canonical 108-card deck. Cards built
+    directly with ``Card(...)`` take their IDs from a running counter that
+    starts after the table, so the two never collide.
+    """
+    __slots__ = ('card_type', 'color', 'number', 'id')
+
     _id_counter = 0
-    
+
     @classmethod
     def reset_id_counter(cls):
-        """Reset the ID counter. Used mainly for testing."""
-        cls._id_counter = 0
+        """Reset the ID counter to the first ID after the table. Used mainly for testing."""
+        cls._id_counter = DECK_SIZE
 
-    def __init__(self, card_type, color=None, number=None):
+    def __init__(self, card_type, color=None, number=None, card_id=None):
         """Initialize a card with type, color, number and unique ID."""
-        self.card_type = card_type
-        self.color = color
-        self.number = number
-        self.id = Card._id_counter
-        Card._id_counter += 1
+        if card_id is None:
+            card_id = Card._id_counter
+            Card._id_counter += 1
+        object.__setattr__(self, 'card_type', card_type)
+        object.__setattr__(self, 'color', color)
+        object.__setattr__(self, 'number', number)
+        object.__setattr__(self, 'id', card_id)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Card objects are immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Card objects are immutable")
+
+    def __reduce__(self):
+        # Table cards unpickle to the shared instance of the receiving process
+        if 0 <= self.id < len(CARD_TABLE) and CARD_TABLE[self.id] is self:
+            return card_from_index, (self.id,)
+        return Card, (self.card_type, self.color, self.number, self.id)
 
     def __str__(self):
         if self.card_type == 'number':
@@ -23,8 +53,50 @@ class Card:
             return f'Wild (ID: {self.id})'
         else:
             return f"Unknown Card (ID: {self.id})"
-        
+
     def __repr__(self):
         return f"Card({self.card_type!r}, color={self.color!r}, number={self.number!r}, id={self.id})"
 
 
+def number_points(number):
+    """Return the penalty points of a number card left in hand."""
+    return 5 if number <= 9 else 10
+
+
+def card_points(card):
+    """Return the penalty points a card scores when left in hand."""
+    if card.card_type == 'number':
+        return number_points(card.number)
+    elif card.card_type == 'skip':
+        return 15
+    elif card.card_type == 'wild':
+        return 25
+    return 0
+
+
+def _build_card_table():
+    """Build the canonical 108-card deck in dealing order."""
+    specs = []
+    for color in COLORS:
+        for number in NUMBERS:
+            specs.extend([('number', color, number)] * COPIES_PER_NUMBER)
+    specs.extend([('skip', None, None)] * SKIP_COUNT)
+    specs.extend([('wild', None, None)] * WILD_COUNT)
+    return tuple(Card(card_type, color, number, card_id=index)
+                 for index, (card_type, color, number) in enumerate(specs))
+
+
+# The shared flyweights; index i holds the card with id i
+CARD_TABLE = _build_card_table()
+DECK_SIZE = len(CARD_TABLE)
+Card.reset_id_counter()
+
+
+def card_from_index(index):
+    """Return the shared table card with the given index."""
+    return CARD_TABLE[index]
+
+
+def card_index(color, number, copy=0):
+    """Return the table index of a number card (copy is 0 or 1)."""
+    return (COLORS.index(color) * len(NUMBERS) + number - 1) * COPIES_PER_NUMBER + copy
@@ -1,27 +1,42 @@
-from card.card import Card
+import random
+
+from card.card import CARD_TABLE
+
+
 class Deck:
-    def __init__(self):
+    def __init__(self, rng=None):
+        """Initialize a shuffled deck.
+
+        Args:
+            rng (random.Random, optional): Random number generator used for
+                shuffling. Defaults to the global ``random`` module.
+        """
+        self.rng = rng if rng is not None else random
         self.cards = []
         self.discard_pile = []
         self.build_deck()
         self.shuffle()
     
     def build_deck(self):
-        colors = ['red', 'green', 'blue', 'yellow']
-        for color in colors:
-            for number in range(1,13):
-                self.cards.append(Card('number', color, number))
-                self.cards.append(Card('number', color, number))
-        
-        for _ in range(4):
-            self.cards.append(Card('skip'))
-        
-        for _ in range(8):
-            self.cards.append(Card('wild'))
+        """Fill the deck with the shared cards of the canonical 108-card table."""
+        self.cards.extend(CARD_TABLE)
+
+    def reset(self):
+        """Return every card to the deck, empty the discard pile and shuffle."""
+        self.cards = list(CARD_TABLE)
+        self.discard_pile = []
+        self.shuffle()
         
+    def clone(self, rng=None):
+        """Return a copy of the deck and discard pile, shuffling with rng if given."""
+        other = Deck.__new__(Deck)
+        other.rng = rng if rng is not None else self.rng
+        other.cards = list(self.cards)
+        other.discard_pile = list(self.discard_pile)
+        return other
+
     def shuffle(self):
-        import random
-        random.shuffle(self.cards)
+        self.rng.shuffle(self.cards)
 
     def draw(self):
         if not self.cards:
@@ -42,13 +57,17 @@ class Deck:
     def draw_card(self):
         """Draw a card from the deck. If the deck is empty, reshuffle the discard pile."""
         if not self.cards:
-            if not self.discard_pile:
-                raise ValueError("No cards left to draw.")
-            self.cards = self.discard_pile
-            self.discard_pile = []
-            self.shuffle()
+            self.recycle_discard_pile()
         return self.cards.pop()
 
+    def recycle_discard_pile(self):
+        """Shuffle the whole discard pile back in as the deck."""
+        if not self.discard_pile:
+            raise ValueError("No cards left to draw.")
+        self.cards = self.discard_pile
+        self.discard_pile = []
+        self.shuffle()
+
     def take_from_discard(self):
         """Take the top card from the discard pile."""
         if self.discard_pile:
@@ -0,0 +1 @@
+from .events import BufferedSink, ConsoleSink, EventSink, NullSink, NULL_SINK
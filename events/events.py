@@ -0,0 +1,95 @@
+import sys
+from collections import deque
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+
+
+class EventSink:
+    """Receives game events.
+
+    Emitters pass a message template and its fields separately; a sink only
+    formats a message once it has decided to keep the event. Hot paths should
+    also check enabled() first so that disabled events skip building the
+    fields altogether.
+    """
+    def __init__(self, level=INFO):
+        """Initialize the sink to accept events at or above the given level."""
+        self.level = level
+
+    def enabled(self, level):
+        """Check whether events of the given level will be recorded."""
+        return level >= self.level
+
+    def emit(self, level, kind, template, **fields):
+        """Record an event. The base sink ignores it; subclasses keep or print it.
+
+        Args:
+            level (int): DEBUG, INFO or WARNING.
+            kind (str): Machine-readable event name, e.g. 'round_started'.
+            template (str): str.format template for a human-readable message.
+            **fields: Values for the template; also the structured payload.
+        """
+
+
+class NullSink(EventSink):
+    """Discards every event; the default for headless games."""
+    def __init__(self):
+        super().__init__(level=float('inf'))
+
+    def enabled(self, level):
+        return False
+
+    def emit(self, level, kind, template, **fields):
+        pass
+
+
+class ConsoleSink(EventSink):
+    """Prints event messages, for the interactive CLI."""
+    def __init__(self, level=INFO, stream=None):
+        super().__init__(level)
+        self.stream = stream
+
+    def emit(self, level, kind, template, **fields):
+        if level >= self.level:
+            print(template.format(**fields), file=self.stream or sys.stdout)
+
+
+class BufferedSink(EventSink):
+    """Keeps events as structured records in memory.
+
+    Messages are only formatted when read back through messages().
+    """
+    def __init__(self, level=DEBUG, maxlen=None):
+        """Initialize the buffer.
+
+        Args:
+            level (int): Lowest level to keep.
+            maxlen (int, optional): Keep only the most recent maxlen events.
+        """
+        super().__init__(level)
+        self.buffer = deque(maxlen=maxlen)
+
+    def emit(self, level, kind, template, **fields):
+        if level >= self.level:
+            self.buffer.append((level, kind, template, fields))
+
+    def records(self):
+        """Return the buffered events as dicts with 'level', 'kind' and their fields."""
+        return [dict(fields, level=level, kind=kind) for level, kind, _, fields in self.buffer]
+
+    def messages(self):
+        """Return the formatted message of every buffered event."""
+        return [template.format(**fields) for _, _, template, fields in self.buffer]
+
+    def clear(self):
+        """Drop all buffered events."""
+        self.buffer.clear()
+
+    def __len__(self):
+        return len(self.buffer)
+
+
+# Shared no-op sink
+NULL_SINK = NullSink()
@@ -1,30 +1,62 @@
+from board.board import HitIndex
 from deck.deck import Deck
+from events.events import DEBUG, INFO, NULL_SINK
+from perf.perf import PerfStats, activate, deactivate
+from phase_solver.phase_cache import phase_cache
+from phase_solver.phase_solver import PhaseSolver
+from phase_validator.rules import STANDARD_RULES
 from player.player import Player
 import random
+import weakref
 
 
 class Game:
     """Main game controller for Phase 10."""
     
-    def __init__(self, players):
-        """Initialize a new game with the given players."""
+    def __init__(self, players, rng=None, events=None, rules=None):
+        """Initialize a new game with the given players.
+
+        Args:
+            players: List of Player objects, in turn order.
+            rng (random.Random, optional): Random number generator used for
+                every deck of this game. Defaults to the global ``random``
+                module; pass a seeded instance for reproducible games.
+            events (EventSink, optional): Receives the game's output.
+                Defaults to a sink that discards everything.
+            rules (RuleSet, optional): Phases every player must complete.
+                Defaults to the ten standard phases.
+        """
         self.players = players
-        self.deck = Deck()
+        self.rules = rules if rules is not None else STANDARD_RULES
+        for player in players:
+            player.rules = self.rules
+        self.rng = rng if rng is not None else random
+        self.events = events if events is not None else NULL_SINK
+        self.deck = Deck(self.rng)
+        # Laid-down sets and the hit index may be shared with clones; only
+        # objects whose owner is this token may be modified in place
+        self._token = object()
+        self.hit_index = HitIndex()  # (player_index, set_index) -> accepted cards
+        self.hit_index.owner = self._token
         self.current_player_index = 0
         self.round_number = 1
+        self.turn_number = 0  # turns completed over the whole game
         self.game_over = False
+        self.journal = None  # JournalWriter recording this game, if any
+        self.perf = None  # PerfStats, once enable_perf_stats has been called
+        self._perf_finalizer = None  # switches the stats off if the game is dropped
         
     def start_new_round(self):
         """Start a new round of the game."""
-        print(f"\nStarting Round {self.round_number}")
+        self.events.emit(INFO, 'round_started', "\nStarting Round {round}", round=self.round_number)
         
         # Reset all players for new round
         for player in self.players:
             player.reset_for_new_round()
+        self._reset_hit_index()
         
-        # Create and shuffle new deck
-        self.deck = Deck()
-        self.deck.shuffle()
+        # Gather all cards back into the deck and shuffle
+        self.deck.reset()
         
         # Deal 10 cards to each player
         for _ in range(10):
@@ -40,6 +72,8 @@ class Game:
         
         # Reset turn order
         self.current_player_index = 0
+        if self.journal is not None:
+            self.journal.record_deal()
     
     def get_current_player(self):
         """Get the current player whose turn it is."""
@@ -48,12 +82,23 @@ class Game:
     def end_turn(self):
         """End the current player's turn and move to next player."""
         self.current_player_index = (self.current_player_index + 1) % len(self.players)
+        self.turn_number += 1
+        if self.journal is not None:
+            self.journal.record_turn_end()
     
     def draw_from_deck(self, player):
         """Draw a card from the deck for the given player."""
+        reshuffled = not self.deck.cards
         card = self.deck.draw_card()
         if card:
             player.draw_card(card)
+            if self.journal is not None:
+                if reshuffled:
+                    self.journal.record_reshuffle(self.deck.cards + [card])
+                self.journal.record_draw(player, card, from_pile=False)
+            if self.events.enabled(DEBUG):
+                self.events.emit(DEBUG, 'card_drawn', "{player} draws from the deck",
+                                 player=player.name, source='deck')
             return card
         return None
     
@@ -62,6 +107,11 @@ class Game:
         if self.deck.discard_pile:
             card = self.deck.discard_pile.pop()
             player.draw_card(card)
+            if self.journal is not None:
+                self.journal.record_draw(player, card, from_pile=True)
+            if self.events.enabled(DEBUG):
+                self.events.emit(DEBUG, 'card_drawn', "{player} takes {card} from the discard pile",
+                                 player=player.name, source='discard', card=card)
             return card
         return None
     
@@ -70,20 +120,128 @@ class Game:
         card = player.discard_card(card_index)
         if card:
             self.deck.discard_pile.append(card)
+            if self.journal is not None:
+                self.journal.record_discard(player, card)
+            if self.events.enabled(DEBUG):
+                self.events.emit(DEBUG, 'card_discarded', "{player} discards {card}",
+                                 player=player.name, card=card)
             return card
         return None
     
+    def lay_down_phase(self, player, groups):
+        """Lay down the player's phase and index the new sets for hitting."""
+        if not player.lay_down(groups):
+            return False
+        player_index = self.players.index(player)
+        hit_index = self._writable_hit_index()
+        for set_index, laid_set in enumerate(player.laid_down_sets):
+            laid_set.owner = self._token
+            hit_index.update((player_index, set_index), laid_set)
+        if self.journal is not None:
+            self.journal.record_lay_down(player, player.laid_down_sets)
+        if self.events.enabled(INFO):
+            self.events.emit(INFO, 'phase_laid_down', "{player} laid down Phase {phase}!",
+                             player=player.name, phase=player.current_phase)
+        return True
+
     def hit_on_player_set(self, hitting_player, target_player, set_index, card):
         """Allow a player to hit a card on another player's laid down set."""
         if set_index < len(target_player.laid_down_sets):
             laid_set = target_player.laid_down_sets[set_index]
             if laid_set.can_add_card(card):
                 # Remove card from hitting player's hand
-                if card in hitting_player.hand.cards:
-                    hitting_player.hand.cards.remove(card)
+                if hitting_player.hand.remove(card) is not None:
+                    laid_set = self._writable_set(target_player, set_index)
                     laid_set.add_card(card)
+                    self._writable_hit_index().update((self.players.index(target_player), set_index), laid_set)
+                    if self.journal is not None:
+                        self.journal.record_hit(hitting_player, target_player, set_index, card)
+                    if self.events.enabled(DEBUG):
+                        self.events.emit(DEBUG, 'card_hit', "{player} hits {card} on {target}'s set {set_index}",
+                                         player=hitting_player.name, target=target_player.name,
+                                         set_index=set_index, card=card)
                     return True
         return False
+
+    def find_hits(self, player, include_own=False):
+        """List every legal hit for the player's hand on other players' sets.
+
+        Args:
+            player (Player): Player whose hand is hitting.
+            include_own (bool): Also list hits on the player's own sets,
+                which hit_on_player_set accepts as well.
+
+        Returns:
+            list[tuple]: (card, target_player, set_index) for each card and
+                         each set that currently accepts it.
+        """
+        hits = []
+        for card in player.hand.cards:
+            for player_index, set_index in sorted(self.hit_index.targets(card)):
+                target = self.players[player_index]
+                if include_own or target is not player:
+                    hits.append((card, target, set_index))
+        return hits
+
+    def rebuild_hit_index(self):
+        """Re-index every laid-down set, e.g. after sets were changed directly."""
+        self._reset_hit_index()
+        for player_index, player in enumerate(self.players):
+            for set_index, laid_set in enumerate(player.laid_down_sets):
+                self.hit_index.update((player_index, set_index), laid_set)
+
+    def _reset_hit_index(self):
+        """Start a new, empty hit index owned by this game."""
+        self.hit_index = HitIndex()
+        self.hit_index.owner = self._token
+
+    def _writable_hit_index(self):
+        """Return the hit index, copying it first if it is shared with a clone."""
+        if self.hit_index.owner is not self._token:
+            self.hit_index = self.hit_index.copy()
+            self.hit_index.owner = self._token
+        return self.hit_index
+
+    def _writable_set(self, player, set_index):
+        """Return a laid-down set, copying it first if it is shared with a clone."""
+        laid_set = player.laid_down_sets[set_index]
+        if laid_set.owner is not self._token:
+            laid_set = laid_set.copy()
+            laid_set.owner = self._token
+            player.laid_down_sets[set_index] = laid_set
+        return laid_set
+
+    def clone(self, rng=None):
+        """Return an independent copy of the game for lookahead search.
+
+        Deck, discard pile and hands are list copies of the shared card
+        flyweights. Laid-down sets and the hit index rarely change, so both
+        games keep sharing them until one of them modifies a set, at which
+        point only that set (or the index) is copied.
+
+        Args:
+            rng (random.Random, optional): RNG for the clone. Defaults to a
+                copy of this game's RNG state.
+
+        Returns:
+            Game: The clone, with no journal and a no-op event sink.
+        """
+        other = Game.__new__(Game)
+        other.__dict__.update(self.__dict__)
+        if rng is None and isinstance(self.rng, random.Random):
+            rng = random.Random()
+            rng.setstate(self.rng.getstate())
+        other.rng = rng if rng is not None else self.rng
+        other.deck = self.deck.clone(other.rng)
+        other.players = [player.clone() for player in self.players]
+        other.events = NULL_SINK
+        other.journal = None
+        other.perf = None
+        other._perf_finalizer = None
+        # Neither game owns the shared sets and index any more
+        self._token = object()
+        other._token = object()
+        return other
     
     def is_round_over(self):
         """Check if the current round is over."""
@@ -95,9 +253,9 @@ class Game:
     
     def is_game_over(self):
         """Check if the entire game is over."""
-        # Game is over when any player reaches phase 11
+        # Game is over when any player has completed the last phase
         for player in self.players:
-            if player.current_phase > 10:
+            if player.current_phase > self.rules.last_phase:
                 return True
         return False
     
@@ -109,20 +267,64 @@ class Game:
         
         # Advance phases for players who laid down and went out
         self.advance_phases()
+        if self.journal is not None:
+            self.journal.record_round_scored()
+        if self.perf is not None:
+            self.perf.end_round(self.round_number)
     
     def advance_phases(self):
         """Advance phases for eligible players."""
         for player in self.players:
             if player.has_laid_down_phase and len(player.hand.cards) == 0:
                 player.current_phase += 1
-                print(f"{player.name} advances to Phase {player.current_phase}!")
+                self.events.emit(INFO, 'phase_advanced', "{player} advances to Phase {phase}!",
+                                 player=player.name, phase=player.current_phase)
     
     def reset_for_next_round(self):
         """Reset game state for the next round."""
         self.round_number += 1
         for player in self.players:
             player.reset_for_new_round()
+        self._reset_hit_index()
+        if self.journal is not None:
+            self.journal.record_next_round()
     
+    def enable_perf_stats(self):
+        """Start counting and timing validators, hand searches, hit checks and reshuffles.
+
+        Instrumentation is off by default and costs nothing then. While it is
+        on, the calls made for this game are recorded: those inside its own
+        methods and its bots' play_turn, including the ones made on clones of
+        this game during bot lookahead. Other games are not counted. If the
+        game is dropped while recording, the instrumentation is switched off.
+
+        Returns:
+            PerfStats: The stats, also reported by get_perf_stats.
+        """
+        if self.perf is None:
+            self.perf = PerfStats()
+        if not self.perf.active:
+            activate(self.perf)
+            self._perf_finalizer = weakref.finalize(self, deactivate, self.perf)
+        return self.perf
+
+    def disable_perf_stats(self):
+        """Stop recording; the stats gathered so far stay readable."""
+        if self.perf is not None and self.perf.active:
+            self._perf_finalizer()
+
+    def get_perf_stats(self):
+        """Return the instrumentation report, or None if it was never enabled.
+
+        Returns:
+            dict: 'totals', the per-round stats in 'rounds' (closed when a
+                  round is scored) and 'current_round'; each maps operation
+                  names to their 'calls', 'seconds' and 'mean' seconds.
+        """
+        if self.perf is None:
+            return None
+        return self.perf.report()
+
     def get_game_state(self):
         """Get a summary of the current game state."""
         state = {
@@ -180,38 +382,25 @@ class Game:
         
         # Check if card helps with sets or runs
         if top_card.card_type == 'number':
-            for card in player.hand.cards:
-                if card.card_type == 'number' and card.number == top_card.number:
-                    return True  # Helps form a set
+            if player.hand.count_number(top_card.number):
+                return True  # Helps form a set
         
         return False
     
     def _try_lay_phase(self, player):
         """Try to lay down the player's current phase."""
-        # Find potential sets and runs
-        sets = player.hand.find_sets(3)
-        runs = player.hand.find_runs(4)
-        
-        # Phase-specific logic
-        if player.current_phase == 1:  # 2 sets of 3
-            if len(sets) >= 2:
-                player.lay_down(sets[:2])
-        
-        elif player.current_phase == 2:  # 1 set of 3 + 1 run of 4
-            if len(sets) >= 1 and len(runs) >= 1:
-                player.lay_down([sets[0], runs[0]])
+        plan = player.phase_plan()
+        if plan is None or not phase_cache.can_complete(player.hand, plan):
+            return
         
-        elif player.current_phase == 4:  # 1 run of 7
-            long_runs = [run for run in runs if len(run) >= 7]
-            if long_runs:
-                player.lay_down([long_runs[0]])
+        solution = PhaseSolver.solve(player.hand, plan)
+        if solution:
+            self.lay_down_phase(player, solution.groups)
     
     def _try_hit_on_sets(self, player):
         """Try to hit cards on other players' sets."""
-        for other_player in self.players:
-            if other_player != player and other_player.has_laid_down_phase:
-                for set_index, laid_set in enumerate(other_player.laid_down_sets):
-                    for card in player.hand.cards[:]:
-                        if laid_set.can_add_card(card):
-                            self.hit_on_player_set(player, other_player, set_index, card)
-                            break  # Only hit one card per player per turn
\ No newline at end of file
+        hit_sets = set()
+        for card, other_player, set_index in self.find_hits(player):
+            key = (id(other_player), set_index)
+            if key not in hit_sets and self.hit_on_player_set(player, other_player, set_index, card):
+                hit_sets.add(key)  # Only hit one card per set per turn
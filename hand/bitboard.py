@@ -0,0 +1,247 @@
+from card.card import COLORS
+from phase_validator.rules import compile_plan
+
+NUMBER_BITS = 12
+NUMBER_MASK = (1 << NUMBER_BITS) - 1
+_COLOR_INDEX = {color: index for index, color in enumerate(COLORS)}
+
+
+def _bits(mask):
+    """Yield the positions of the set bits of mask, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class BitboardHand:
+    """A hand encoded as fixed-width integers.
+
+    Each layer is a 48-bit integer holding one 12-bit mask per color (bit
+    ``color * 12 + number - 1``); layer k has a bit set when the hand holds
+    more than k copies of that card, so the first layer marks every card
+    held and the second layer the duplicates. Wilds and skips are counts.
+
+    Runs are found by shifting and AND-ing the mask of numbers held, and
+    sets by adding the layers' color rows column-wise with bit-sliced
+    adders, which yields "at least k cards of this number" as a 12-bit mask.
+    """
+    __slots__ = ('layers', 'wild_count', 'skip_count')
+
+    def __init__(self):
+        """Initialize an empty bitboard."""
+        self.layers = [0, 0]
+        self.wild_count = 0
+        self.skip_count = 0
+
+    @classmethod
+    def from_cards(cls, cards):
+        """Build a bitboard holding the given cards."""
+        board = cls()
+        for card in cards:
+            board.update(card, 1)
+        return board
+
+    @classmethod
+    def from_hand(cls, hand):
+        """Build a bitboard from a Hand's histogram."""
+        board = cls()
+        for color, row in enumerate(hand.counts):
+            for number, count in enumerate(row):
+                for layer in range(count):
+                    if layer == len(board.layers):
+                        board.layers.append(0)
+                    board.layers[layer] |= 1 << (color * NUMBER_BITS + number)
+        board.wild_count = hand.wild_count
+        board.skip_count = hand.skip_count
+        return board
+
+    def copy(self):
+        other = BitboardHand.__new__(BitboardHand)
+        other.layers = list(self.layers)
+        other.wild_count = self.wild_count
+        other.skip_count = self.skip_count
+        return other
+
+    def update(self, card, delta):
+        """Apply a card entering (+1) or leaving (-1) the hand; a Hand listener."""
+        if card.card_type == 'number':
+            bit = 1 << (_COLOR_INDEX[card.color] * NUMBER_BITS + card.number - 1)
+            layers = self.layers
+            if delta > 0:
+                for layer, mask in enumerate(layers):
+                    if not mask & bit:
+                        layers[layer] = mask | bit
+                        return
+                layers.append(bit)
+            else:
+                for layer in range(len(layers) - 1, -1, -1):
+                    if layers[layer] & bit:
+                        layers[layer] &= ~bit
+                        return
+        elif card.card_type == 'wild':
+            self.wild_count += delta
+        elif card.card_type == 'skip':
+            self.skip_count += delta
+
+    def held_numbers(self):
+        """Return a 12-bit mask of the numbers held in any color."""
+        first = self.layers[0]
+        return (first | first >> 12 | first >> 24 | first >> 36) & NUMBER_MASK
+
+    def color_count(self, color):
+        """Return how many number cards of a color (index into COLORS) are held."""
+        shift = color * NUMBER_BITS
+        return sum((layer >> shift & NUMBER_MASK).bit_count() for layer in self.layers)
+
+    def _count_planes(self):
+        """Add every color row of every layer column-wise.
+
+        Returns:
+            list[int]: Bit-sliced counts; bit n of planes[i] is bit i of the
+                       number of cards held with number n + 1.
+        """
+        planes = []
+        for layer in self.layers:
+            for shift in (0, 12, 24, 36):
+                carry = layer >> shift & NUMBER_MASK
+                for index, plane in enumerate(planes):
+                    if not carry:
+                        break
+                    planes[index], carry = plane ^ carry, plane & carry
+                if carry:
+                    planes.append(carry)
+        return planes
+
+    def numbers_with_at_least(self, count, planes=None):
+        """Return a 12-bit mask of the numbers held at least count times."""
+        if count <= 0:
+            return NUMBER_MASK
+        if planes is None:
+            planes = self._count_planes()
+        greater, equal = 0, NUMBER_MASK
+        for bit in range(max(len(planes), count.bit_length()) - 1, -1, -1):
+            plane = planes[bit] if bit < len(planes) else 0
+            if count >> bit & 1:
+                equal &= plane
+            else:
+                greater |= equal & plane
+                equal &= ~plane
+        return greater | equal
+
+    def run_starts(self, size):
+        """Return a mask with bit s set when numbers s+1 .. s+size are all held."""
+        if not 1 <= size <= NUMBER_BITS:
+            return 0
+        starts = self.held_numbers()
+        covered = 1
+        # Double the covered length while it fits, then close the remainder
+        while covered * 2 <= size:
+            starts &= starts >> covered
+            covered *= 2
+        if covered < size:
+            starts &= starts >> (size - covered)
+        return starts & ((1 << (NUMBER_BITS - size + 1)) - 1)
+
+    @staticmethod
+    def _run_fits(held, size, wilds):
+        """Check whether some window of size numbers has size - wilds of them held."""
+        if size > NUMBER_BITS:
+            return False
+        need = max(1, size - wilds)
+        window = (1 << size) - 1
+        return any(((held >> start) & window).bit_count() >= need
+                   for start in range(NUMBER_BITS - size + 1))
+
+    def _run_possible(self, size, wilds):
+        if wilds == 0:
+            return bool(self.run_starts(size))
+        return self._run_fits(self.held_numbers(), size, wilds)
+
+    def _set_and_run_possible(self, set_size, run_size, wilds):
+        planes = self._count_planes()
+        held = self.held_numbers()
+        for set_wilds in range(min(wilds, set_size - 1) + 1):
+            naturals = set_size - set_wilds
+            candidates = self.numbers_with_at_least(naturals, planes)
+            if not candidates:
+                continue
+            run_wilds = wilds - set_wilds
+            # A number with a card to spare stays available to the run
+            if self.numbers_with_at_least(naturals + 1, planes):
+                if self._run_fits(held, run_size, run_wilds):
+                    return True
+                continue
+            for number in _bits(candidates):
+                if self._run_fits(held & ~(1 << number), run_size, run_wilds):
+                    return True
+        return False
+
+    def _sets_possible(self, sizes, wilds):
+        planes = self._count_planes()
+        if len(sizes) == 1:
+            return bool(self.numbers_with_at_least(max(1, sizes[0] - wilds), planes))
+        large, small = sorted(sizes, reverse=True)
+        # Both sets from one number
+        if self.numbers_with_at_least(max(2, large + small - wilds), planes):
+            return True
+        # Two different numbers; try every split of the wilds
+        for large_wilds in range(min(wilds, large - 1) + 1):
+            first = self.numbers_with_at_least(large - large_wilds, planes)
+            second = self.numbers_with_at_least(max(1, small - (wilds - large_wilds)), planes)
+            if first and second and not (first == second and first.bit_count() == 1):
+                return True
+        return False
+
+    def can_complete(self, requirements):
+        """Check whether the hand can complete a requirement list or PhasePlan.
+
+        Single runs, single color groups, one or two sets, and a set plus a
+        run are decided with bit operations; other requirement lists go to the
+        PhaseSolver, which reads the same counts from this bitboard.
+        """
+        plan = compile_plan(requirements)
+        requirements = plan.requirements
+        wilds = self.wild_count
+        if len(requirements) == 1:
+            group_type, size = requirements[0]
+            if group_type == 'run':
+                return self._run_possible(size, wilds)
+            if group_type == 'color':
+                need = max(1, size - wilds)
+                return any(self.color_count(color) >= need for color in range(len(COLORS)))
+        if plan.types == {'set'} and len(requirements) <= 2:
+            return self._sets_possible([size for _, size in requirements], wilds)
+        if len(requirements) == 2 and plan.types == {'set', 'run'}:
+            sizes = dict(requirements)
+            return self._set_and_run_possible(sizes['set'], sizes['run'], wilds)
+
+        from phase_solver.phase_solver import PhaseSolver
+        return PhaseSolver.can_complete(self, plan)
+
+    # Count views, so the PhaseSolver and PhaseCache can read a bitboard like a Hand
+
+    @property
+    def counts(self):
+        rows = [[0] * NUMBER_BITS for _ in COLORS]
+        for layer in self.layers:
+            for bit in _bits(layer):
+                rows[bit // NUMBER_BITS][bit % NUMBER_BITS] += 1
+        return rows
+
+    @property
+    def number_counts(self):
+        planes = self._count_planes()
+        return [sum((plane >> number & 1) << index for index, plane in enumerate(planes))
+                for number in range(NUMBER_BITS)]
+
+    @property
+    def color_counts(self):
+        return [self.color_count(color) for color in range(len(COLORS))]
+
+    def __len__(self):
+        return sum(layer.bit_count() for layer in self.layers) + self.wild_count + self.skip_count
+
+    def __repr__(self):
+        return (f"BitboardHand(layers={[hex(layer) for layer in self.layers]}, "
+                f"wilds={self.wild_count}, skips={self.skip_count})")
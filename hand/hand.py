@@ -1,15 +1,58 @@
-from card.card import Card
+from card.card import Card, COLORS
+
+COLOR_INDEX = {color: index for index, color in enumerate(COLORS)}
+MAX_NUMBER = 12
+
 
 class Hand:
     def __init__(self):
         """Initialize an empty hand."""
         self.cards = []
+        # Histogram of the hand, kept in step with self.cards
+        self.counts = [[0] * MAX_NUMBER for _ in COLORS]  # counts[color][number - 1]
+        self.number_counts = [0] * MAX_NUMBER  # number_counts[number - 1]
+        self.color_counts = [0] * len(COLORS)
+        self.wild_count = 0
+        self.skip_count = 0
+        self._listeners = []
+        self.bitboard = None  # BitboardHand mirror, see use_bitboard
+
+    def use_bitboard(self):
+        """Keep a BitboardHand in step with this hand and search it in find_sets/find_runs."""
+        if self.bitboard is None:
+            from hand.bitboard import BitboardHand
+            self.bitboard = BitboardHand.from_hand(self)
+            self.add_listener(self.bitboard.update)
+        return self.bitboard
+
+    def add_listener(self, listener):
+        """Call listener(card, delta) after a card enters (+1) or leaves (-1) the hand."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """Stop calling a listener added with add_listener."""
+        self._listeners.remove(listener)
+
+    def _update_counts(self, card, delta):
+        """Apply a +1/-1 change for one card to the histogram."""
+        if card.card_type == 'number':
+            color = COLOR_INDEX[card.color]
+            self.counts[color][card.number - 1] += delta
+            self.number_counts[card.number - 1] += delta
+            self.color_counts[color] += delta
+        elif card.card_type == 'wild':
+            self.wild_count += delta
+        elif card.card_type == 'skip':
+            self.skip_count += delta
+        for listener in self._listeners:
+            listener(card, delta)
 
     def add(self, card):
         """Add a card to the hand."""
         if not isinstance(card, Card):
             raise ValueError("Only Card instances can be added to the hand.")
         self.cards.append(card)
+        self._update_counts(card, 1)
     
     def add_card(self, card):
         """Add a card to the hand (alias for add method)."""
@@ -19,14 +62,64 @@ class Hand:
         """Remove a specific card from the hand."""
         if card in self.cards:
             self.cards.remove(card)
+            self._update_counts(card, -1)
             return card
         return None
     
     def play(self, index):
         """Play a card from the hand by index."""
         if 0 <= index < len(self.cards):
-            return self.cards.pop(index)
+            card = self.cards.pop(index)
+            self._update_counts(card, -1)
+            return card
         return None
+
+    def clone(self):
+        """Return an independent copy of the hand sharing the (immutable) cards.
+
+        Listeners stay with the original hand; a bitboard mirror is copied.
+        """
+        other = Hand.__new__(Hand)
+        other.cards = list(self.cards)
+        other.counts = [list(row) for row in self.counts]
+        other.number_counts = list(self.number_counts)
+        other.color_counts = list(self.color_counts)
+        other.wild_count = self.wild_count
+        other.skip_count = self.skip_count
+        other._listeners = []
+        other.bitboard = None
+        if self.bitboard is not None:
+            other.bitboard = self.bitboard.copy()
+            other._listeners.append(other.bitboard.update)
+        return other
+
+    def count_number(self, number):
+        """Return how many number cards with the given number are in the hand."""
+        return self.number_counts[number - 1]
+
+    def count_color(self, color):
+        """Return how many number cards of the given color are in the hand."""
+        return self.color_counts[COLOR_INDEX[color]]
+
+    def count(self, color, number):
+        """Return how many copies of a specific number card are in the hand."""
+        return self.counts[COLOR_INDEX[color]][number - 1]
+
+    def longest_run(self, extra_number=None):
+        """Return the length of the longest stretch of consecutive numbers held.
+
+        Args:
+            extra_number (int, optional): A number to treat as held in addition
+                                          to the hand's cards.
+        """
+        longest = current = 0
+        for index, count in enumerate(self.number_counts):
+            if count or index + 1 == extra_number:
+                current += 1
+                longest = max(longest, current)
+            else:
+                current = 0
+        return longest
     
     def sort(self):
         """Sort the hand by color and number."""
@@ -45,50 +138,82 @@ class Hand:
             list[list[int]]: A list of lists, where each inner list contains card IDs 
                              that form a valid set of the specified size.
         """
-        from collections import defaultdict
-        from itertools import combinations
-        by_number = defaultdict(list)
-        results = []
-        
-        # Group cards by number (excluding wild and skip cards)
+        return list(self.iter_sets(size))
+
+    def iter_sets(self, size=3, limit=None, one_per_number=False):
+        """Lazily yield sets of card IDs, in the same order as find_sets.
+
+        Args:
+            size (int, optional): The size of sets to find. Defaults to 3.
+            limit (int, optional): Stop after yielding this many sets.
+            one_per_number (bool, optional): Yield only the first set of each
+                                             number instead of every combination.
+
+        Yields:
+            list[int]: Card IDs forming a set of the specified size.
+        """
+        from itertools import combinations, islice
+        if self.bitboard is not None:
+            from hand.bitboard import _bits
+            numbers = [index + 1 for index in _bits(self.bitboard.numbers_with_at_least(size))]
+        else:
+            numbers = [index + 1 for index, count in enumerate(self.number_counts) if count >= size]
+        if not numbers or limit == 0:
+            return
+
+        # Collect card IDs only for the numbers that can form a set
+        by_number = {number: [] for number in numbers}
         for card in self.cards:
-            if card.card_type == 'number' and card.number is not None:
+            if card.card_type == 'number' and card.number in by_number:
                 by_number[card.number].append(card.id)
-        
-        # For each group of same-numbered cards
+
+        produced = 0
         for card_ids in by_number.values():
-            if len(card_ids) >= size:
-                # Get all possible combinations of size cards
-                results.extend(list(combo) for combo in combinations(sorted(card_ids), size))
-        
-        return results
+            combos = combinations(sorted(card_ids), size)
+            if one_per_number:
+                combos = islice(combos, 1)
+            for combo in combos:
+                yield list(combo)
+                produced += 1
+                if limit is not None and produced >= limit:
+                    return
+
+    def count_sets(self, size=3, one_per_number=False):
+        """Return how many sets iter_sets would yield, without building them."""
+        from math import comb
+        if one_per_number:
+            return sum(1 for count in self.number_counts if count >= size)
+        return sum(comb(count, size) for count in self.number_counts if count >= size)
     
     def find_runs(self, size=4):
         """Find runs of cards in the hand of a given size.
-        Returns a list of lists containing card IDs that form runs."""
-        results = []
-        # Sort cards by number
-        numbered_cards = [(c.number, c.id) for c in self.cards if c.number is not None]
-        numbered_cards.sort()
-        
-        # No runs possible if we have fewer cards than size
-        if len(numbered_cards) < size:
+        Returns a list of lists containing card IDs that form runs.
+        Each run uses the lowest-ID card of every number it covers."""
+        if self.bitboard is not None:
+            from hand.bitboard import _bits
+            starts = list(_bits(self.bitboard.run_starts(size)))
+        else:
+            counts = self.number_counts
+            starts = [start for start in range(MAX_NUMBER - size + 1)
+                      if all(counts[start:start + size])]
+        # No runs possible if no window of numbers is fully covered
+        if not starts:
             return []
         
-        # Try to find runs starting from each card
-        for i in range(len(numbered_cards) - size + 1):
-            potential_run = numbered_cards[i:i + size]
-            # Check if numbers are sequential
-            is_run = True
-            for j in range(1, len(potential_run)):
-                if potential_run[j][0] != potential_run[j-1][0] + 1:
-                    is_run = False
-                    break
-            
-            if is_run:
-                results.append([card_id for _, card_id in potential_run])
+        lowest_ids = {}
+        for card in self.cards:
+            if card.card_type == 'number':
+                current = lowest_ids.get(card.number)
+                if current is None or card.id < current:
+                    lowest_ids[card.number] = card.id
         
-        return results
+        return [[lowest_ids[number] for number in range(start + 1, start + size + 1)]
+                for start in starts]
+
+    def get_cards(self, card_ids):
+        """Return the cards in the hand matching the given card IDs, in order."""
+        by_id = {card.id: card for card in self.cards}
+        return [by_id[card_id] for card_id in card_ids if card_id in by_id]
 
     def __len__(self):
         """Return the number of cards in the hand."""
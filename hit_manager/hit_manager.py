@@ -1,41 +1,42 @@
-from phase_validator.phase_validator import PhaseValidator
+import warnings
+
 
 class HitManager:
     @staticmethod
-    def try_hit(source_player, target_player, set_idx, card):
+    def try_hit(source_player, target_player, set_idx, card, game=None):
         """Attempt to hit a card on another player's laid down set.
-        
+
+        With a game, the hit is made by Game.hit_on_player_set, so shared
+        sets are copied before they change and the game's hit index stays
+        current. Calling without a game is deprecated: the set is then
+        changed in place, which is only safe for sets outside any game.
+
         Args:
             source_player (Player): Player attempting to hit
             target_player (Player): Player whose set is being hit on
             set_idx (int): Index of the set being hit on
             card (Card): Card being played
-            
+            game (Game): Game both players are playing
+
         Returns:
             bool: True if hit was successful, False otherwise
         """
         # Check if target has laid down any sets
-        if not target_player.has_laid_down or set_idx >= len(target_player.laid_down_sets):
+        if not target_player.has_laid_down_phase or set_idx >= len(target_player.laid_down_sets):
             return False
-            
+
         # Check if source player has the card
         if card not in source_player.hand.cards:
             return False
-        
-        target_set = target_player.laid_down_sets[set_idx].copy()
-        target_set.append(card)
-        
-        # First try to validate as a set
-        if PhaseValidator._validate_set(target_set):
-            source_player.hand.remove(card)
-            target_player.laid_down_sets[set_idx] = target_set
-            return True
-        
-        # Then try to validate as a run
-        if PhaseValidator._validate_run(target_set):
-            source_player.hand.remove(card)
-            target_player.laid_down_sets[set_idx] = target_set
-            return True
-        
-        # If we can't hit on this set, return False
-        return False
+
+        if game is not None:
+            return game.hit_on_player_set(source_player, target_player, set_idx, card)
+
+        warnings.warn("HitManager.try_hit without game= is deprecated; pass the game so the hit "
+                      "goes through Game.hit_on_player_set", DeprecationWarning, stacklevel=2)
+        target_set = target_player.laid_down_sets[set_idx]
+        if not target_set.can_add_card(card):
+            return False
+        source_player.hand.remove(card)
+        target_set.add_card(card)
+        return True
@@ -0,0 +1 @@
+from .journal import JournalReplay, JournalWriter, decode_state, encode_state
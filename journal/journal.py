@@ -0,0 +1,345 @@
+import struct
+
+from card.card import CARD_TABLE
+from game.game import Game
+from laiddownset.laiddownset import LaidDownSet
+from phase_validator.rules import get_rule_set
+from player.player import Player
+
+MAGIC = b'P10J'
+VERSION = 2
+
+# Record opcodes; every record is one opcode byte followed by its payload
+ROUND_START = 1   # round (H), per player: hand; discard top; deck order
+DRAW_DECK = 2     # player (B), card (B)
+DRAW_PILE = 3     # player (B), card (B)
+DISCARD = 4       # player (B), card (B)
+LAY_DOWN = 5      # player (B), group count (B), per group: type (B) + cards
+HIT = 6           # player (B), target (B), set index (B), card (B)
+RESHUFFLE = 7     # new deck order, drawn card last
+TURN_END = 8      # no payload
+ROUND_SCORED = 9  # no payload
+NEXT_ROUND = 10   # no payload
+CHECKPOINT = 11   # turn (I), encoded game state
+
+SET_TYPES = ('set', 'run', 'color')
+
+
+def _pack_cards(cards):
+    """Encode a card list as a length-prefixed run of table indices."""
+    return struct.pack('<H', len(cards)) + bytes(card.id for card in cards)
+
+
+def _unpack_cards(data, offset):
+    """Decode a card list written by _pack_cards; return (cards, new offset)."""
+    (count,) = struct.unpack_from('<H', data, offset)
+    offset += 2
+    return [CARD_TABLE[index] for index in data[offset:offset + count]], offset + count
+
+
+def _pack_text(text):
+    raw = text.encode('utf-8')
+    return struct.pack('<H', len(raw)) + raw
+
+
+def _unpack_text(data, offset):
+    (length,) = struct.unpack_from('<H', data, offset)
+    offset += 2
+    return data[offset:offset + length].decode('utf-8'), offset + length
+
+
+def encode_state(game):
+    """Encode the full state of a game as compact bytes.
+
+    Cards are stored as their CARD_TABLE indices, so only games dealt from
+    the canonical table can be encoded. The rule set is stored by name.
+    Player names are not included.
+    """
+    parts = [
+        _pack_text(game.rules.name),
+        struct.pack('<HBIB', game.round_number, game.current_player_index,
+                    game.turn_number, len(game.players)),
+        _pack_cards(game.deck.cards),
+        _pack_cards(game.deck.discard_pile),
+    ]
+    for player in game.players:
+        parts.append(struct.pack('<BBHI', player.current_phase, player.has_laid_down_phase,
+                                 player.round_score, player.total_score))
+        parts.append(_pack_cards(player.hand.cards))
+        parts.append(struct.pack('<B', len(player.laid_down_sets)))
+        for laid_set in player.laid_down_sets:
+            parts.append(struct.pack('<B', SET_TYPES.index(laid_set.set_type)))
+            parts.append(_pack_cards(laid_set.cards))
+    return b''.join(parts)
+
+
+def decode_state(data, players, offset=0, rules=None):
+    """Rebuild a Game from bytes written by encode_state.
+
+    Args:
+        data (bytes): Encoded state.
+        players: Player objects to seat, one per encoded player. Their hands,
+            phases and scores are overwritten.
+        offset (int): Where the state starts in data.
+        rules (RuleSet, optional): Rule set of the game. Defaults to the
+            registered rule set named in the state.
+    """
+    rules_name, offset = _unpack_text(data, offset)
+    round_number, current, turn_number, count = struct.unpack_from('<HBIB', data, offset)
+    offset += struct.calcsize('<HBIB')
+    if count != len(players):
+        raise ValueError(f"State has {count} players, got {len(players)}")
+    game = Game(players, rules=rules if rules is not None else get_rule_set(rules_name))
+    game.round_number = round_number
+    game.current_player_index = current
+    game.turn_number = turn_number
+    game.deck.cards, offset = _unpack_cards(data, offset)
+    game.deck.discard_pile, offset = _unpack_cards(data, offset)
+    for player in players:
+        phase, laid, round_score, total_score = struct.unpack_from('<BBHI', data, offset)
+        offset += struct.calcsize('<BBHI')
+        player.reset_for_new_round()
+        player.current_phase = phase
+        player.has_laid_down_phase = bool(laid)
+        player.round_score = round_score
+        player.total_score = total_score
+        cards, offset = _unpack_cards(data, offset)
+        for card in cards:
+            player.hand.add(card)
+        (set_count,) = struct.unpack_from('<B', data, offset)
+        offset += 1
+        for _ in range(set_count):
+            set_type = SET_TYPES[data[offset]]
+            cards, offset = _unpack_cards(data, offset + 1)
+            player.laid_down_sets.append(LaidDownSet(cards, set_type))
+    game.rebuild_hit_index()
+    return game
+
+
+class JournalWriter:
+    """Streams a game's actions to a binary journal as they happen.
+
+    The header holds the seed, the rule set name and the player names;
+    every round stores its deal and every turn its draw source, lay-down,
+    hits and discard. A checkpoint of the whole state is written every
+    checkpoint_interval turns so a replay can start close to any turn.
+    """
+
+    def __init__(self, game, stream, seed=None, checkpoint_interval=64):
+        """Attach a journal to the game and write the header.
+
+        Args:
+            game (Game): Game to record; its journal attribute is set.
+            stream: Binary file object the records are written to.
+            seed: Seed the game's RNG was created from, stored as text.
+            checkpoint_interval (int): Turns between state checkpoints;
+                0 disables checkpoints.
+        """
+        self.game = game
+        self.stream = stream
+        self.checkpoint_interval = checkpoint_interval
+        header = [MAGIC, struct.pack('<BB', VERSION, len(game.players)),
+                  _pack_text('' if seed is None else str(seed)), _pack_text(game.rules.name)]
+        header.extend(_pack_text(player.name) for player in game.players)
+        stream.write(b''.join(header))
+        game.journal = self
+
+    def _seat(self, player):
+        return self.game.players.index(player)
+
+    def record_deal(self):
+        game = self.game
+        parts = [struct.pack('<BH', ROUND_START, game.round_number)]
+        parts.extend(_pack_cards(player.hand.cards) for player in game.players)
+        parts.append(_pack_cards(game.deck.discard_pile))
+        parts.append(_pack_cards(game.deck.cards))
+        self.stream.write(b''.join(parts))
+
+    def record_draw(self, player, card, from_pile):
+        self.stream.write(struct.pack('<BBB', DRAW_PILE if from_pile else DRAW_DECK,
+                                      self._seat(player), card.id))
+
+    def record_reshuffle(self, deck_order):
+        self.stream.write(struct.pack('<B', RESHUFFLE) + _pack_cards(deck_order))
+
+    def record_discard(self, player, card):
+        self.stream.write(struct.pack('<BBB', DISCARD, self._seat(player), card.id))
+
+    def record_lay_down(self, player, laid_sets):
+        parts = [struct.pack('<BBB', LAY_DOWN, self._seat(player), len(laid_sets))]
+        for laid_set in laid_sets:
+            parts.append(struct.pack('<B', SET_TYPES.index(laid_set.set_type)))
+            parts.append(_pack_cards(laid_set.cards))
+        self.stream.write(b''.join(parts))
+
+    def record_hit(self, player, target, set_index, card):
+        self.stream.write(struct.pack('<BBBBB', HIT, self._seat(player), self._seat(target),
+                                      set_index, card.id))
+
+    def record_turn_end(self):
+        self.stream.write(struct.pack('<B', TURN_END))
+        turn = self.game.turn_number
+        if self.checkpoint_interval and turn % self.checkpoint_interval == 0:
+            state = encode_state(self.game)
+            self.stream.write(struct.pack('<BII', CHECKPOINT, turn, len(state)) + state)
+
+    def record_round_scored(self):
+        self.stream.write(struct.pack('<B', ROUND_SCORED))
+
+    def record_next_round(self):
+        self.stream.write(struct.pack('<B', NEXT_ROUND))
+
+    def close(self):
+        """Detach from the game and flush the stream."""
+        if self.game.journal is self:
+            self.game.journal = None
+        self.stream.flush()
+
+
+class JournalReplay:
+    """Rebuilds game states from a journal written by JournalWriter."""
+
+    def __init__(self, data, rules=None):
+        """Parse the header and index the turns and checkpoints.
+
+        Args:
+            data (bytes): The complete journal.
+            rules (RuleSet, optional): Rule set to replay with, for one that
+                is not registered. Defaults to the registered rule set named
+                in the header.
+        """
+        self.data = bytes(data)
+        if self.data[:4] != MAGIC:
+            raise ValueError("Not a Phase 10 journal")
+        version, count = struct.unpack_from('<BB', self.data, 4)
+        if version != VERSION:
+            raise ValueError(f"Unsupported journal version {version}")
+        offset = 6
+        self.seed, offset = _unpack_text(self.data, offset)
+        self.rules_name, offset = _unpack_text(self.data, offset)
+        self.rules = rules if rules is not None else get_rule_set(self.rules_name)
+        self.player_names = []
+        for _ in range(count):
+            name, offset = _unpack_text(self.data, offset)
+            self.player_names.append(name)
+        self.start = offset
+        # turn -> offset of the first record after that turn ended
+        self.turn_offsets = {0: offset}
+        self.checkpoints = {}  # turn -> offset of the encoded state
+        turn = 0
+        for opcode, payload, end in self._records(offset):
+            if opcode == TURN_END:
+                turn += 1
+                self.turn_offsets[turn] = end
+            elif opcode == CHECKPOINT:
+                self.checkpoints[struct.unpack_from('<I', self.data, payload)[0]] = payload + 8
+                self.turn_offsets[turn] = end
+        self.turns = turn
+
+    @classmethod
+    def from_file(cls, path):
+        """Load a journal from disk."""
+        with open(path, 'rb') as stream:
+            return cls(stream.read())
+
+    def _records(self, offset, stop=None):
+        """Yield (opcode, payload offset, end offset) for every record."""
+        data = self.data
+        stop = len(data) if stop is None else stop
+        while offset < stop:
+            opcode = data[offset]
+            payload = offset + 1
+            if opcode in (DRAW_DECK, DRAW_PILE, DISCARD):
+                end = payload + 2
+            elif opcode == HIT:
+                end = payload + 4
+            elif opcode in (TURN_END, ROUND_SCORED, NEXT_ROUND):
+                end = payload
+            elif opcode == RESHUFFLE:
+                end = _unpack_cards(data, payload)[1]
+            elif opcode == LAY_DOWN:
+                end = payload + 2
+                for _ in range(data[payload + 1]):
+                    end = _unpack_cards(data, end + 1)[1]
+            elif opcode == ROUND_START:
+                end = payload + 2
+                for _ in range(len(self.player_names) + 2):
+                    end = _unpack_cards(data, end)[1]
+            elif opcode == CHECKPOINT:
+                (length,) = struct.unpack_from('<I', data, payload + 4)
+                end = payload + 8 + length
+            else:
+                raise ValueError(f"Unknown journal opcode {opcode} at offset {offset}")
+            yield opcode, payload, end
+            offset = end
+
+    def game_at(self, turn):
+        """Return the game state after the given number of completed turns.
+
+        Replay starts from the latest checkpoint at or before the turn, so
+        only the turns since that checkpoint are re-applied.
+        """
+        if not 0 <= turn <= self.turns:
+            raise ValueError(f"Turn {turn} is outside the journal (0-{self.turns})")
+        players = [Player(name) for name in self.player_names]
+        base = max((t for t in self.checkpoints if t <= turn), default=None)
+        if base is None:
+            game = Game(players, rules=self.rules)
+            game.turn_number = 0
+            offset = self.start
+        else:
+            game = decode_state(self.data, players, self.checkpoints[base], self.rules)
+            offset = self.turn_offsets[base]
+        for opcode, payload, _ in self._records(offset, self.turn_offsets[turn]):
+            self._apply(game, opcode, payload)
+        return game
+
+    def _apply(self, game, opcode, payload):
+        """Re-apply one recorded action to the game."""
+        data = self.data
+        players = game.players
+        if opcode == ROUND_START:
+            (game.round_number,) = struct.unpack_from('<H', data, payload)
+            offset = payload + 2
+            for player in players:
+                player.reset_for_new_round()
+                cards, offset = _unpack_cards(data, offset)
+                for card in cards:
+                    player.draw_card(card)
+            game.rebuild_hit_index()
+            game.deck.discard_pile, offset = _unpack_cards(data, offset)
+            game.deck.cards, offset = _unpack_cards(data, offset)
+            game.current_player_index = 0
+        elif opcode == DRAW_DECK:
+            player, card = players[data[payload]], CARD_TABLE[data[payload + 1]]
+            if game.deck.cards.pop() is not card:
+                raise ValueError("Journal does not match the deck order")
+            player.draw_card(card)
+        elif opcode == DRAW_PILE:
+            game.take_from_discard(players[data[payload]])
+        elif opcode == DISCARD:
+            player, card = players[data[payload]], CARD_TABLE[data[payload + 1]]
+            game.discard_card(player, player.hand.cards.index(card))
+        elif opcode == LAY_DOWN:
+            player = players[data[payload]]
+            groups = []
+            offset = payload + 2
+            for _ in range(data[payload + 1]):
+                cards, offset = _unpack_cards(data, offset + 1)
+                groups.append(cards)
+            if not game.lay_down_phase(player, groups):
+                raise ValueError("Journal lay-down is not valid")
+        elif opcode == HIT:
+            player, target = players[data[payload]], players[data[payload + 1]]
+            card = CARD_TABLE[data[payload + 3]]
+            if not game.hit_on_player_set(player, target, data[payload + 2], card):
+                raise ValueError("Journal hit is not valid")
+        elif opcode == RESHUFFLE:
+            game.deck.cards = _unpack_cards(data, payload)[0]
+            game.deck.discard_pile = []
+        elif opcode == TURN_END:
+            game.end_turn()
+        elif opcode == ROUND_SCORED:
+            game.calculate_round_scores()
+        elif opcode == NEXT_ROUND:
+            game.reset_for_next_round()
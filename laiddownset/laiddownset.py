@@ -10,6 +10,12 @@ class LaidDownSet:
         """
         self.cards = cards  # list of Card objects
         self.set_type = set_type  # e.g., 'set', 'run', 'color'
+        # Summary state used to check hits without re-validating the cards
+        self.target_number = None  # sets
+        self.target_color = None  # color sets
+        self.low = self.high = None  # lowest/highest natural number in a run
+        self.run_mask = 0  # bit n set when a run holds a natural n
+        self.owner = None  # token of the Game allowed to modify the set in place
         self.validate()
     
     def validate(self):
@@ -37,19 +43,25 @@ class LaidDownSet:
             if card.number != target_number:
                 raise ValueError("All cards in a set must have the same number")
                 
+        self.target_number = target_number
         return True
     
     def _validate_run(self):
-        """Validate that cards form a consecutive sequence."""
+        """Validate that cards form a consecutive sequence, with wilds filling gaps."""
         number_cards = [c for c in self.cards if c.card_type == 'number']
         if not number_cards:
             raise ValueError("Run must contain at least one number card")
             
         numbers = sorted(card.number for card in number_cards)
-        for i in range(len(numbers) - 1):
-            if numbers[i] + 1 != numbers[i + 1]:
-                raise ValueError("Cards in a run must be consecutive")
+        if len(set(numbers)) != len(numbers):
+            raise ValueError("Cards in a run must be consecutive")
+        if len(self.cards) > 12 or numbers[-1] - numbers[0] + 1 > len(self.cards):
+            raise ValueError("Cards in a run must be consecutive")
                 
+        self.low, self.high = numbers[0], numbers[-1]
+        self.run_mask = 0
+        for number in numbers:
+            self.run_mask |= 1 << number
         return True
     
     def _validate_color(self):
@@ -63,16 +75,71 @@ class LaidDownSet:
             if card.color != target_color:
                 raise ValueError("All cards in a color set must have the same color")
                 
+        self.target_color = target_color
         return True
-    
+
+    def accepted_numbers(self):
+        """Return the numbers of the number cards this set currently accepts.
+
+        Color sets accept by color instead; see accepted_colors.
+        """
+        if self.set_type == 'set':
+            return {self.target_number}
+        if self.set_type == 'run':
+            length = len(self.cards)
+            if length >= 12:
+                return set()
+            # Wilds can slide along the run, so any number keeping the span
+            # within length + 1 fits
+            return {number for number in range(max(1, self.high - length), min(12, self.low + length) + 1)
+                    if not self.run_mask & (1 << number)}
+        return set()
+
+    def accepted_colors(self):
+        """Return the colors of the number cards this set currently accepts."""
+        if self.set_type == 'color':
+            return {self.target_color}
+        return set()
+
+    def accepts_wild(self):
+        """Check whether a wild card can still be added to this set."""
+        return self.set_type != 'run' or len(self.cards) < 12
+
+    def can_add_card(self, card):
+        """Check in O(1) whether adding the card would keep the set valid."""
+        if card.card_type == 'wild':
+            return self.accepts_wild()
+        if card.card_type != 'number':
+            return False
+        if self.set_type == 'set':
+            return card.number == self.target_number
+        if self.set_type == 'color':
+            return card.color == self.target_color
+        # Run: a new number whose span still fits with one more card
+        length = len(self.cards)
+        if length >= 12 or self.run_mask & (1 << card.number):
+            return False
+        return max(self.high, card.number) - min(self.low, card.number) <= length
+
     def add_card(self, card):
         """Add a card to the set if it maintains validity."""
-        test_cards = self.cards + [card]
-        test_set = LaidDownSet(test_cards, self.set_type)
-        # If validation passes, add the card
+        if not self.can_add_card(card):
+            raise ValueError(f"{card} cannot be added to this {self.set_type}")
         self.cards.append(card)
+        if self.set_type == 'run' and card.card_type == 'number':
+            self.low = min(self.low, card.number)
+            self.high = max(self.high, card.number)
+            self.run_mask |= 1 << card.number
         return True
     
+    def copy(self):
+        """Return a copy of the set without re-validating it."""
+        other = LaidDownSet.__new__(LaidDownSet)
+        other.__dict__.update(self.__dict__)
+        other.cards = list(self.cards)
+        other.owner = None
+        return other
+
     def remove_card(self, card):
         """Remove a card from the set if it exists."""
         if card in self.cards:
@@ -0,0 +1,3 @@
+from .move_generator import (DRAW_DECK, DRAW_PILE, DRAW_STAGE, PLAY_STAGE, apply_move, card_kind,
+                             discard_moves, generate_moves, hit_moves, kind_card, lay_down_move,
+                             lay_down_moves)
@@ -0,0 +1,195 @@
+from collections import Counter
+
+from card.card import CARD_TABLE, COLORS
+from hand.hand import COLOR_INDEX, MAX_NUMBER
+from phase_solver.phase_cache import phase_cache
+
+# A turn has two stages: one draw, then lay-downs and hits until a discard
+DRAW_STAGE, PLAY_STAGE = 'draw', 'play'
+
+# Moves are small tuples of ints and strings, so they hash, compare and
+# serialize cheaply:
+#   ('draw', 'deck'), ('draw', 'pile')
+#   ('lay', ((kind, ...), ...))        one sorted kind tuple per requirement
+#   ('hit', target_seat, set_index, kind)
+#   ('discard', kind)
+DRAW_DECK = ('draw', 'deck')
+DRAW_PILE = ('draw', 'pile')
+
+# Card kinds: number cards are color * 12 + number - 1, then skip and wild.
+# Cards of the same kind are interchangeable, so moves name kinds, not cards.
+SKIP_KIND = len(COLORS) * MAX_NUMBER
+WILD_KIND = SKIP_KIND + 1
+
+def card_kind(card):
+    """Return the small integer shared by all cards of the same type, color and number."""
+    if card.card_type == 'number':
+        return COLOR_INDEX[card.color] * MAX_NUMBER + card.number - 1
+    return SKIP_KIND if card.card_type == 'skip' else WILD_KIND
+
+
+# One table card per kind, for validating kind tuples
+_REPRESENTATIVES = {}
+for _card in CARD_TABLE:
+    _REPRESENTATIVES.setdefault(card_kind(_card), _card)
+
+
+def kind_card(kind):
+    """Return a representative table card of a kind."""
+    return _REPRESENTATIVES[kind]
+
+
+def _sub_multisets(counts, kinds, size, start=0):
+    """Yield every sorted tuple of size kinds drawn from counts (kind -> available)."""
+    if size == 0:
+        yield ()
+        return
+    for position in range(start, len(kinds)):
+        kind = kinds[position]
+        if counts[kind]:
+            counts[kind] -= 1
+            for rest in _sub_multisets(counts, kinds, size - 1, position):
+                yield (kind,) + rest
+            counts[kind] += 1
+
+
+def _canonical(requirements, groups):
+    """Order the groups of identical requirements so equivalent lay-downs share a key."""
+    groups = list(groups)
+    for requirement in set(requirements):
+        positions = [i for i, other in enumerate(requirements) if other == requirement]
+        if len(positions) > 1:
+            for position, group in zip(positions, sorted(groups[i] for i in positions)):
+                groups[position] = group
+    return tuple(groups)
+
+
+def lay_down_move(requirements, groups):
+    """Encode a lay-down given as card groups, in requirement order, as a move."""
+    requirements = [tuple(requirement) for requirement in requirements]
+    keys = [tuple(sorted(card_kind(card) for card in group)) for group in groups]
+    return ('lay', _canonical(requirements, keys))
+
+
+def lay_down_moves(player):
+    """List every distinct way the player can lay down their current phase.
+
+    Lay-downs that use the same kinds of cards in each group are one move;
+    so are lay-downs that only swap the groups of two identical requirements.
+    """
+    plan = player.phase_plan()
+    if (player.has_laid_down_phase or plan is None
+            or not phase_cache.can_complete(player.hand, plan)):
+        return []
+    requirements = plan.requirements
+    counts = Counter(card_kind(card) for card in player.hand.cards)
+    kinds = sorted(counts)
+    moves = []
+    seen = set()
+    chosen = []
+
+    def extend(index):
+        if index == len(requirements):
+            key = _canonical(requirements, chosen)
+            if key not in seen:
+                seen.add(key)
+                moves.append(('lay', key))
+            return
+        size = requirements[index][1]
+        check = plan.checks[index]
+        for group in list(_sub_multisets(counts, kinds, size)):
+            # Kinds are sorted with wild last: a group without a number card
+            # cannot be laid down, whatever the requirement
+            if group[0] >= SKIP_KIND:
+                continue
+            if check([kind_card(kind) for kind in group]):
+                for kind in group:
+                    counts[kind] -= 1
+                chosen.append(group)
+                extend(index + 1)
+                chosen.pop()
+                for kind in group:
+                    counts[kind] += 1
+
+    extend(0)
+    return moves
+
+
+def generate_moves(game, player, stage):
+    """Yield every distinct legal move of the player at a stage of their turn.
+
+    Args:
+        game (Game): Game being played.
+        player (Player): Player whose turn it is.
+        stage: DRAW_STAGE before the draw, PLAY_STAGE after it. In the play
+            stage, lay-downs and hits may be followed by more moves; a
+            discard ends the turn.
+    """
+    if stage == DRAW_STAGE:
+        if game.deck.cards or game.deck.discard_pile:
+            yield DRAW_DECK
+        if game.deck.discard_pile:
+            yield DRAW_PILE
+        return
+    if stage != PLAY_STAGE:
+        raise ValueError(f"Unknown stage {stage!r}")
+
+    yield from lay_down_moves(player)
+    yield from hit_moves(game, player)
+    yield from discard_moves(player)
+
+
+def hit_moves(game, player):
+    """List every distinct legal hit of the player, on any laid-down set including their own."""
+    if not player.has_laid_down_phase:
+        return []
+    moves = []
+    seen = set()
+    for card, target, set_index in game.find_hits(player, include_own=True):
+        move = ('hit', game.players.index(target), set_index, card_kind(card))
+        if move not in seen:
+            seen.add(move)
+            moves.append(move)
+    return moves
+
+
+def discard_moves(player):
+    """List one discard move per kind of card in the player's hand."""
+    moves = []
+    seen = set()
+    for card in player.hand.cards:
+        kind = card_kind(card)
+        if kind not in seen:
+            seen.add(kind)
+            moves.append(('discard', kind))
+    return moves
+
+
+def _take(hand_cards, kind, used):
+    """Return the first card of a kind in the hand that is not yet used."""
+    for card in hand_cards:
+        if id(card) not in used and card_kind(card) == kind:
+            used.add(id(card))
+            return card
+    raise ValueError(f"No card of kind {kind} in hand")
+
+
+def apply_move(game, player, move):
+    """Carry out a move through the Game API and return whether it succeeded."""
+    action = move[0]
+    if action == 'draw':
+        if move[1] == 'pile':
+            return game.take_from_discard(player) is not None
+        return game.draw_from_deck(player) is not None
+    if action == 'lay':
+        used = set()
+        groups = [[_take(player.hand.cards, kind, used) for kind in group] for group in move[1]]
+        return game.lay_down_phase(player, groups)
+    if action == 'hit':
+        _, target, set_index, kind = move
+        card = _take(player.hand.cards, kind, set())
+        return game.hit_on_player_set(player, game.players[target], set_index, card)
+    if action == 'discard':
+        card = _take(player.hand.cards, move[1], set())
+        return game.discard_card(player, player.hand.cards.index(card)) is not None
+    raise ValueError(f"Unknown move {move!r}")
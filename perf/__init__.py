@@ -0,0 +1 @@
+from .perf import PerfStats, SCOPES, TARGETS, activate, deactivate, is_active
@@ -0,0 +1,199 @@
+import contextvars
+import functools
+import importlib
+import json
+import time
+
+# Instrumented operations: (stat name, module, class, attribute). While any
+# PerfStats is active these attributes are replaced by timing wrappers; when
+# none is, the originals are put back, so disabled instrumentation adds no
+# work at all to the hot paths. Times are inclusive: a wrapped call made by
+# another wrapped call counts towards both.
+TARGETS = [
+    ('validator.validate_phase', 'phase_validator.phase_validator', 'PhaseValidator', 'validate_phase'),
+    ('validator.can_complete_phase', 'phase_validator.phase_validator', 'PhaseValidator', 'can_complete_phase'),
+    ('validator.plan_validate', 'phase_validator.rules', 'PhasePlan', 'validate'),
+    ('validator.solve', 'phase_solver.phase_solver', 'PhaseSolver', 'solve'),
+    ('validator.can_complete', 'phase_solver.phase_solver', 'PhaseSolver', 'can_complete'),
+    ('validator.cached_can_complete', 'phase_solver.phase_cache', 'PhaseCache', 'can_complete'),
+    ('hand.find_sets', 'hand.hand', 'Hand', 'find_sets'),
+    ('hand.count_sets', 'hand.hand', 'Hand', 'count_sets'),
+    ('hand.find_runs', 'hand.hand', 'Hand', 'find_runs'),
+    ('hand.longest_run', 'hand.hand', 'Hand', 'longest_run'),
+    ('hit.can_add_card', 'laiddownset.laiddownset', 'LaidDownSet', 'can_add_card'),
+    ('hit.try_hit', 'hit_manager.hit_manager', 'HitManager', 'try_hit'),
+    ('hit.find_hits', 'game.game', 'Game', 'find_hits'),
+    ('hit.hit_on_player_set', 'game.game', 'Game', 'hit_on_player_set'),
+    ('deck.reshuffle_discard', 'deck.deck', 'Deck', 'reshuffle_discard'),
+    ('deck.recycle_discard_pile', 'deck.deck', 'Deck', 'recycle_discard_pile'),
+]
+
+# Calls that run on behalf of one game: (module, class, attribute, position of
+# the game among the arguments). While one runs, the instrumented operations
+# record into that game's stats. A game without stats, such as a lookahead
+# clone, leaves the stats of the call it is nested in recording.
+SCOPES = [
+    ('game.game', 'Game', 'start_new_round', 0),
+    ('game.game', 'Game', 'play_turn', 0),
+    ('game.game', 'Game', 'draw_from_deck', 0),
+    ('game.game', 'Game', 'take_from_discard', 0),
+    ('game.game', 'Game', 'discard_card', 0),
+    ('game.game', 'Game', 'lay_down_phase', 0),
+    ('game.game', 'Game', 'hit_on_player_set', 0),
+    ('game.game', 'Game', 'find_hits', 0),
+    ('game.game', 'Game', 'end_turn', 0),
+    ('game.game', 'Game', 'calculate_round_scores', 0),
+    ('bot.bot', 'BotPlayer', 'play_turn', 1),
+    ('bot.ismcts_bot', 'ISMCTSBot', 'play_turn', 1),
+]
+
+_active = []  # PerfStats currently recording
+_originals = {}  # (class, attribute) -> original class attribute, while installed
+_current = contextvars.ContextVar('perf_current', default=None)  # stats the running calls record into
+
+
+class PerfStats:
+    """Call counts and wall time of the instrumented operations.
+
+    Totals cover everything recorded since the stats were created; the
+    round buckets cover one round each, closed by end_round(). Used as a
+    context manager, the stats record the calls made inside the block that
+    no game with its own stats claims.
+    """
+    def __init__(self):
+        """Initialize empty stats."""
+        self.totals = {}  # name -> [calls, seconds]
+        self.current = {}  # the same, for the round in progress
+        self.rounds = []  # closed rounds, see end_round
+        self.active = False
+        self._tokens = []  # context tokens of the enclosing with blocks
+
+    def record(self, name, seconds):
+        """Add one call of an operation that took the given time."""
+        for table in (self.totals, self.current):
+            entry = table.get(name)
+            if entry is None:
+                table[name] = [1, seconds]
+            else:
+                entry[0] += 1
+                entry[1] += seconds
+
+    def end_round(self, round_number):
+        """Close the current round's bucket and start a new one."""
+        self.rounds.append({'round': round_number, 'stats': _report(self.current)})
+        self.current = {}
+
+    def report(self):
+        """Return the totals, closed rounds and current round as plain dicts.
+
+        Each operation maps to its 'calls', total 'seconds' and 'mean' seconds.
+        """
+        return {
+            'totals': _report(self.totals),
+            'rounds': list(self.rounds),
+            'current_round': _report(self.current),
+        }
+
+    def export_rounds(self, stream):
+        """Write one JSON line per closed round to a text stream."""
+        for entry in self.rounds:
+            stream.write(json.dumps(entry, sort_keys=True) + "\n")
+
+    def __enter__(self):
+        activate(self)
+        self._tokens.append(_current.set(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        _current.reset(self._tokens.pop())
+        deactivate(self)
+
+
+def _report(table):
+    return {name: {'calls': calls, 'seconds': seconds, 'mean': seconds / calls}
+            for name, (calls, seconds) in sorted(table.items())}
+
+
+def _timed(name, function, clock):
+    @functools.wraps(function)
+    def timed(*args, **kwargs):
+        start = clock()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            stats = _current.get()
+            if stats is not None and stats.active:
+                stats.record(name, clock() - start)
+    return timed
+
+
+def _scoped(function, position):
+    @functools.wraps(function)
+    def scoped(*args, **kwargs):
+        game = args[position] if len(args) > position else kwargs.get('game')
+        stats = getattr(game, 'perf', None)
+        if stats is None:
+            return function(*args, **kwargs)
+        token = _current.set(stats)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _current.reset(token)
+    return scoped
+
+
+def _wrap(owner, attribute, make_wrapper):
+    attribute_value = owner.__dict__[attribute]
+    _originals.setdefault((owner, attribute), attribute_value)
+    if isinstance(attribute_value, (staticmethod, classmethod)):
+        wrapper = type(attribute_value)(make_wrapper(attribute_value.__func__))
+    else:
+        wrapper = make_wrapper(attribute_value)
+    setattr(owner, attribute, wrapper)
+
+
+def _install():
+    clock = time.perf_counter
+    for name, module, class_name, attribute in TARGETS:
+        owner = getattr(importlib.import_module(module), class_name)
+        _wrap(owner, attribute, lambda function: _timed(name, function, clock))
+    # Scopes go outside the timing wrappers, so a game's own timed methods
+    # record into that game
+    for module, class_name, attribute, position in SCOPES:
+        owner = getattr(importlib.import_module(module), class_name)
+        _wrap(owner, attribute, lambda function: _scoped(function, position))
+
+
+def _uninstall():
+    for (owner, attribute), original in _originals.items():
+        setattr(owner, attribute, original)
+    _originals.clear()
+
+
+def activate(stats):
+    """Let stats record, wrapping the instrumented operations if needed.
+
+    The wrappers stay installed while any stats are active, but each call
+    is recorded only into the stats of the game it runs for (see SCOPES),
+    or of the enclosing with block.
+    """
+    if stats.active:
+        return
+    if not _active:
+        _install()
+    _active.append(stats)
+    stats.active = True
+
+
+def deactivate(stats):
+    """Stop recording into stats; the originals return once nothing records."""
+    if stats.active:
+        stats.active = False
+        _active.remove(stats)
+        if not _active:
+            _uninstall()
+
+
+def is_active():
+    """Check whether the instrumented operations are currently wrapped."""
+    return bool(_active)
@@ -0,0 +1,2 @@
+from .phase_solver import PhaseSolver, PhaseSolution
+from .phase_cache import PhaseCache, phase_cache
@@ -0,0 +1,113 @@
+from collections import OrderedDict
+
+from phase_solver.phase_solver import PhaseSolver
+from phase_validator.phase_validator import PhaseValidator
+from phase_validator.rules import compile_plan
+
+
+class PhaseCache:
+    """Bounded LRU cache of phase feasibility answers.
+
+    Entries are keyed by the phase's requirements plus a canonical signature
+    of the hand that keeps only what those requirements can see:
+
+    - sets only: the sorted multiset of number counts (which number a set
+      uses never matters),
+    - runs, or sets with runs: the per-number counts,
+    - color groups only: the sorted multiset of color counts,
+    - anything else: the full color-by-number histogram.
+
+    Counts are capped at the most a phase could use and wilds at the most
+    it could place, so hands that differ only in irrelevant cards share an
+    entry.
+    """
+
+    def __init__(self, maxsize=4096):
+        """Initialize an empty cache holding at most maxsize entries."""
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def signature(hand, requirements):
+        """Return the canonical signature of a hand for the given requirements."""
+        plan = compile_plan(requirements)
+        types = plan.types
+        total = plan.total_cards
+        wilds = min(hand.wild_count, plan.wild_cap)
+
+        if types == {'set'}:
+            counts = sorted((min(count, total) for count in hand.number_counts if count), reverse=True)
+            return ('set', wilds, tuple(counts))
+        if 'color' not in types:
+            cap = plan.number_cap
+            return ('number', wilds, tuple(min(count, cap) for count in hand.number_counts))
+        if types == {'color'}:
+            counts = sorted((min(count, total) for count in hand.color_counts if count), reverse=True)
+            return ('color', wilds, tuple(counts))
+        return ('full', wilds, tuple(tuple(row) for row in hand.counts))
+
+    def can_complete(self, hand, requirements):
+        """Check whether the hand can complete the requirements, using the cache.
+
+        Args:
+            hand (Hand): Hand to check.
+            requirements: List of (type, size) pairs, a compiled PhasePlan,
+                or a phase number of PhaseValidator.PHASE_REQUIREMENTS.
+        """
+        if isinstance(requirements, int):
+            requirements = PhaseValidator.PHASE_REQUIREMENTS[requirements]
+        plan = compile_plan(requirements)
+        key = (plan.requirements, self.signature(hand, plan))
+
+        entries = self._entries
+        result = entries.get(key)
+        if result is not None:
+            try:
+                entries.move_to_end(key)
+            except KeyError:
+                pass  # evicted by a bot thread in the meantime
+            self.hits += 1
+            return result
+
+        self.misses += 1
+        result = PhaseSolver.can_complete(hand, plan)
+        entries[key] = result
+        if len(entries) > self.maxsize:
+            try:
+                entries.popitem(last=False)
+            except KeyError:
+                pass
+            self.evictions += 1
+        return result
+
+    def resize(self, maxsize):
+        """Change the capacity, evicting the least recently used entries."""
+        self.maxsize = maxsize
+        while len(self._entries) > maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        self._entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def info(self):
+        """Return the cache counters and current size."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+        }
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Shared cache used by the bots and the automated Game turns
+phase_cache = PhaseCache()
@@ -0,0 +1,253 @@
+from itertools import combinations
+
+from card.card import COLORS, card_points, number_points
+from hand.hand import MAX_NUMBER
+from phase_validator.rules import compile_plan
+
+WILD_POINTS = 25
+# Penalty points of a number card, indexed by number - 1
+NUMBER_POINTS = [number_points(number) for number in range(1, MAX_NUMBER + 1)]
+
+
+class PhaseSolution:
+    """One way of completing a phase: a card group per requirement."""
+    __slots__ = ('groups', 'penalty', 'wilds_used')
+
+    def __init__(self, groups, penalty, wilds_used):
+        """Initialize a solution.
+
+        Args:
+            groups: List of card lists, in requirement order.
+            penalty (int): Penalty points of the cards left in hand.
+            wilds_used (int): Number of wild cards placed in the groups.
+        """
+        self.groups = groups
+        self.penalty = penalty
+        self.wilds_used = wilds_used
+
+    def __repr__(self):
+        return f"PhaseSolution(groups={self.groups!r}, penalty={self.penalty}, wilds_used={self.wilds_used})"
+
+
+class PhaseSolver:
+    """Decides and solves phases from a hand's count vectors.
+
+    The search runs over the hand's histogram (number counts, color-by-number
+    counts and the wild count) rather than over card combinations. Every
+    group needs at least one natural card; wilds fill the rest. Among all
+    ways to complete a phase, the solver returns the one leaving the fewest
+    penalty points in hand.
+
+    Requirement lists that mix color groups with set or run groups pick the
+    cards of color groups greedily (highest points first); all other lists,
+    including the ten standard phases, are solved exactly.
+    """
+
+    @classmethod
+    def solve(cls, hand, requirements):
+        """Return the best PhaseSolution for the requirements, or None.
+
+        Args:
+            hand (Hand): Hand to lay down from.
+            requirements: List of (type, size) pairs, e.g. an entry of
+                PhaseValidator.PHASE_REQUIREMENTS, or their compiled PhasePlan.
+        """
+        phase_plan = compile_plan(requirements)
+        plan = cls._search(hand, phase_plan, first_only=False)
+        if plan is None:
+            return None
+        return cls._materialize(hand, phase_plan, plan)
+
+    @classmethod
+    def can_complete(cls, hand, requirements):
+        """Check whether the hand can complete the requirements."""
+        return cls._search(hand, compile_plan(requirements), first_only=True) is not None
+
+    @classmethod
+    def _search(cls, hand, phase_plan, first_only):
+        """Find the best count-level plan: one shape per requirement.
+
+        Every group but the last is enumerated depth-first, in the phase
+        plan's search order (color groups first, runs last); the last group
+        has a closed-form best shape given the cards that are left.
+        """
+        requirements = phase_plan.requirements
+        if not requirements:
+            return []
+        order = phase_plan.search_order
+        needs_colors = any(requirements[i][0] == 'color' for i in order)
+        numbers = list(hand.number_counts)
+        colors = [list(row) for row in hand.counts] if needs_colors else None
+        shapes = [None] * len(requirements)
+        best = {'value': -1, 'plan': None}
+
+        def visit(position, wilds, value):
+            index = order[position]
+            group_type, size = requirements[index]
+            if position == len(order) - 1:
+                found = cls._best_last_shape(group_type, size, numbers, colors, wilds)
+                if found is not None and value + found[0] > best['value']:
+                    shapes[index] = found[1]
+                    best['value'] = value + found[0]
+                    best['plan'] = list(shapes)
+                return found is not None and first_only
+            for gain, shape, used_wilds in cls._shapes(group_type, size, numbers, colors, wilds):
+                cls._apply(shape, numbers, colors, -1)
+                shapes[index] = shape
+                done = visit(position + 1, wilds - used_wilds, value + gain)
+                cls._apply(shape, numbers, colors, 1)
+                if done:
+                    return True
+            return False
+
+        visit(0, hand.wild_count, 0)
+        return best['plan']
+
+    @staticmethod
+    def _apply(shape, numbers, colors, delta):
+        """Take (delta=-1) or give back (delta=1) the natural cards of a shape."""
+        if shape[0] == 'set':
+            _, number, natural_colors = shape
+            numbers[number] += delta * len(natural_colors)
+            if colors is not None:
+                for color in natural_colors:
+                    colors[color][number] += delta
+        elif shape[0] == 'run':
+            for number, color in shape[2]:
+                numbers[number] += delta
+                if colors is not None:
+                    colors[color][number] += delta
+        else:
+            _, color, natural_numbers = shape
+            for number in natural_numbers:
+                numbers[number] += delta
+                colors[color][number] += delta
+
+    @staticmethod
+    def _pick_colors(number, count, colors):
+        """Choose colors for count natural cards of a number."""
+        if colors is None:
+            return (None,) * count
+        picked = []
+        for color, row in enumerate(colors):
+            picked.extend([color] * min(row[number], count - len(picked)))
+            if len(picked) == count:
+                break
+        return tuple(picked)
+
+    @staticmethod
+    def _top_numbers(row, count):
+        """Return the count highest-point numbers held in one color's row."""
+        picked = []
+        for number in range(MAX_NUMBER - 1, -1, -1):
+            picked.extend([number] * min(row[number], count - len(picked)))
+            if len(picked) == count:
+                break
+        return tuple(picked)
+
+    @classmethod
+    def _shapes(cls, group_type, size, numbers, colors, wilds):
+        """Yield (gain, shape, wilds used) for every way to build one group."""
+        min_naturals = max(1, size - wilds)
+        if group_type == 'set':
+            for number in range(MAX_NUMBER):
+                for count in range(min_naturals, min(numbers[number], size) + 1):
+                    gain = count * NUMBER_POINTS[number] + (size - count) * WILD_POINTS
+                    shape = ('set', number, cls._pick_colors(number, count, colors))
+                    yield gain, shape, size - count
+        elif group_type == 'run':
+            for start in range(MAX_NUMBER - size + 1):
+                held = [number for number in range(start, start + size) if numbers[number]]
+                for count in range(min_naturals, len(held) + 1):
+                    for chosen in combinations(held, count):
+                        gain = sum(NUMBER_POINTS[n] for n in chosen) + (size - count) * WILD_POINTS
+                        naturals = tuple((n, cls._pick_colors(n, 1, colors)[0]) for n in chosen)
+                        yield gain, ('run', start, naturals), size - count
+        elif group_type == 'color':
+            for color, row in enumerate(colors):
+                for count in range(min_naturals, min(sum(row), size) + 1):
+                    chosen = cls._top_numbers(row, count)
+                    gain = sum(NUMBER_POINTS[n] for n in chosen) + (size - count) * WILD_POINTS
+                    yield gain, ('color', color, chosen), size - count
+
+    @classmethod
+    def _best_last_shape(cls, group_type, size, numbers, colors, wilds):
+        """Return (gain, shape) of the best final group, or None.
+
+        A wild always scores more than any natural it replaces, so the best
+        final group uses as few naturals as the wilds allow.
+        """
+        count = max(1, size - wilds)
+        best = None
+        if group_type == 'set':
+            for number in range(MAX_NUMBER):
+                if numbers[number] >= count and count <= size:
+                    gain = count * NUMBER_POINTS[number] + (size - count) * WILD_POINTS
+                    if best is None or gain > best[0]:
+                        best = (gain, ('set', number, cls._pick_colors(number, count, colors)))
+        elif group_type == 'run':
+            for start in range(MAX_NUMBER - size + 1):
+                held = [number for number in range(start, start + size) if numbers[number]]
+                if len(held) < count:
+                    continue
+                # Keep the highest-point naturals in the run
+                chosen = sorted(held, key=lambda n: NUMBER_POINTS[n], reverse=True)[:count]
+                gain = sum(NUMBER_POINTS[n] for n in chosen) + (size - count) * WILD_POINTS
+                if best is None or gain > best[0]:
+                    naturals = tuple((n, cls._pick_colors(n, 1, colors)[0]) for n in sorted(chosen))
+                    best = (gain, ('run', start, naturals))
+        elif group_type == 'color':
+            for color, row in enumerate(colors):
+                if sum(row) >= count and count <= size:
+                    chosen = cls._top_numbers(row, count)
+                    gain = sum(NUMBER_POINTS[n] for n in chosen) + (size - count) * WILD_POINTS
+                    if best is None or gain > best[0]:
+                        best = (gain, ('color', color, chosen))
+        return best
+
+    @classmethod
+    def _materialize(cls, hand, phase_plan, plan):
+        """Turn a count-level plan into groups of the hand's actual cards."""
+        pool = {}
+        wild_cards = []
+        for card in hand.cards:
+            if card.card_type == 'number':
+                pool.setdefault((COLORS.index(card.color), card.number - 1), []).append(card)
+                pool.setdefault((None, card.number - 1), []).append(card)
+            elif card.card_type == 'wild':
+                wild_cards.append(card)
+        taken = set()
+
+        def take(color, number):
+            for card in pool[(color, number)]:
+                if id(card) not in taken:
+                    taken.add(id(card))
+                    return card
+            raise ValueError("Phase plan does not match the hand")
+
+        def take_wild():
+            card = wild_cards.pop()
+            taken.add(id(card))
+            return card
+
+        requirements = phase_plan.requirements
+        order = phase_plan.search_order
+        groups = [None] * len(requirements)
+        wilds_used = 0
+        for index in order:
+            size = requirements[index][1]
+            shape = plan[index]
+            if shape[0] == 'set':
+                group = [take(color, shape[1]) for color in shape[2]]
+            elif shape[0] == 'run':
+                by_number = dict(shape[2])
+                group = [take(by_number[number], number) if number in by_number else None
+                         for number in range(shape[1], shape[1] + size)]
+            else:
+                group = [take(shape[1], number) for number in shape[2]]
+            group.extend([None] * (size - len(group)))
+            wilds_used += group.count(None)
+            groups[index] = [card if card is not None else take_wild() for card in group]
+
+        penalty = sum(card_points(card) for card in hand.cards if id(card) not in taken)
+        return PhaseSolution(groups, penalty, wilds_used)
@@ -1 +1,3 @@
 from .phase_validator import PhaseValidator
+from .rules import (PhasePlan, RuleSet, STANDARD_RULES, compile_plan, get_rule_set, register_rule_set,
+                    rule_set_names)
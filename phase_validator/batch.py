@@ -0,0 +1,97 @@
+import numpy as np
+
+from card.card import CARD_TABLE, COLORS
+from phase_validator.rules import compile_plan
+
+# Vectorized validation: candidates are 2-D arrays of CARD_TABLE indices, one
+# row per candidate, and every check answers exactly like the matching
+# PhaseValidator method. This module needs NumPy; the rest of the package
+# does not import it.
+
+# Per-card lookup arrays, indexed by table index
+NUMBER = np.array([card.number or 0 for card in CARD_TABLE], dtype=np.int8)
+COLOR = np.array([COLORS.index(card.color) if card.color else -1 for card in CARD_TABLE], dtype=np.int8)
+IS_NUMBER = np.array([card.card_type == 'number' for card in CARD_TABLE])
+IS_WILD = np.array([card.card_type == 'wild' for card in CARD_TABLE])
+
+
+def encode_groups(groups):
+    """Turn equal-sized lists of table cards into a 2-D index array."""
+    return np.array([[card.id for card in group] for group in groups], dtype=np.intp).reshape(len(groups), -1)
+
+
+def _lookups(indices):
+    indices = np.asarray(indices, dtype=np.intp)
+    if indices.ndim != 2:
+        raise ValueError("Candidates must be a 2-D array of card indices")
+    is_number = IS_NUMBER[indices]
+    only_numbers_and_wilds = (is_number | IS_WILD[indices]).all(axis=1)
+    return indices, is_number, only_numbers_and_wilds
+
+
+def validate_sets(indices):
+    """Return which rows are sets: number cards of one number, plus wilds."""
+    indices, is_number, valid = _lookups(indices)
+    numbers = NUMBER[indices]
+    high = np.where(is_number, numbers, 0).max(axis=1)
+    low = np.where(is_number, numbers, 13).min(axis=1)
+    # An all-wild row has low > high: it has no number and is not a set
+    return valid & (low == high)
+
+
+def validate_runs(indices):
+    """Return which rows are runs: distinct numbers spanning at most the row length, plus wilds."""
+    indices, is_number, valid = _lookups(indices)
+    size = indices.shape[1]
+    numbers = NUMBER[indices].astype(np.int16)
+    high = np.where(is_number, numbers, 0).max(axis=1)
+    low = np.where(is_number, numbers, 13).min(axis=1)
+    # Non-number slots get distinct sentinels so only repeated numbers collide
+    keyed = np.where(is_number, numbers, 100 + np.arange(size, dtype=np.int16))
+    keyed.sort(axis=1)
+    distinct = (np.diff(keyed, axis=1) != 0).all(axis=1)
+    return valid & is_number.any(axis=1) & distinct & (high - low + 1 <= size) & (size <= 12)
+
+
+def validate_color_groups(indices):
+    """Return which rows are color groups: number cards of one color, plus wilds."""
+    indices, is_number, valid = _lookups(indices)
+    colors = COLOR[indices]
+    high = np.where(is_number, colors, -1).max(axis=1)
+    low = np.where(is_number, colors, len(COLORS)).min(axis=1)
+    return valid & is_number.any(axis=1) & (low == high)
+
+
+_CHECKS = {'set': validate_sets, 'run': validate_runs, 'color': validate_color_groups}
+
+
+def validate_groups(group_type, indices):
+    """Validate rows of one group type ('set', 'run' or 'color')."""
+    try:
+        check = _CHECKS[group_type]
+    except KeyError:
+        raise ValueError(f"Unknown group type {group_type!r}") from None
+    return check(indices)
+
+
+def validate_phase_batch(requirements, indices):
+    """Validate candidate lay-downs for a phase.
+
+    Args:
+        requirements: List of (type, size) pairs or a compiled PhasePlan.
+        indices: 2-D array with one candidate per row: the groups' card
+            indices concatenated in requirement order.
+
+    Returns:
+        numpy.ndarray: One bool per candidate.
+    """
+    plan = compile_plan(requirements)
+    indices = np.asarray(indices, dtype=np.intp)
+    if indices.ndim != 2 or indices.shape[1] != plan.total_cards:
+        raise ValueError(f"Candidates must have {plan.total_cards} card indices per row")
+    valid = np.ones(len(indices), dtype=bool)
+    start = 0
+    for group_type, size in plan.requirements:
+        valid &= _CHECKS[group_type](indices[:, start:start + size])
+        start += size
+    return valid
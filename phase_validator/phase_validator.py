@@ -1,40 +1,35 @@
+from phase_validator.rules import STANDARD_PHASES, STANDARD_RULES
+
+
 class PhaseValidator:
-    PHASE_REQUIREMENTS = {
-        1: [('set', 3), ('set', 3)],               # Two sets of 3
-        2: [('set', 3), ('run', 4)],               # One set of 3 + one run of 4
-        3: [('set', 4), ('run', 4)],               # One set of 4 + one run of 4
-        4: [('run', 7)],                           # Run of 7
-        5: [('run', 8)],                           # Run of 8
-        6: [('run', 9)],                           # Run of 9
-        7: [('set', 4), ('set', 4)],               # Two sets of 4
-        8: [('color', 7)],                         # 7 cards of one color
-        9: [('set', 5), ('set', 2)],               # One set of 5 + one set of 2
-        10: [('set', 5), ('set', 3)]               # One set of 5 + one set of 3
-    }
+    PHASE_REQUIREMENTS = STANDARD_PHASES  # The standard rule set's phases
 
     @classmethod
-    def validate_phase(cls, phase_num, groups):
-        """Validate if the groups satisfy the requirements for the given phase."""
-        requirements = cls.PHASE_REQUIREMENTS[phase_num]
-        
-        if len(groups) != len(requirements):
-            return False
+    def validate_phase(cls, phase_num, groups, rules=None):
+        """Validate if the groups satisfy the requirements for the given phase.
 
-        for group, (req_type, req_size) in zip(groups, requirements):
-            if len(group) != req_size:
-                return False
+        Args:
+            phase_num (int): Phase to check.
+            groups: Card groups, one per requirement, in requirement order.
+            rules (RuleSet, optional): Rule set the phase belongs to.
+                Defaults to the standard phases.
+        """
+        return (rules or STANDARD_RULES).plans[phase_num].validate(groups)
 
-            if req_type == 'set':
-                if not cls._validate_set(group):
-                    return False
-            elif req_type == 'run':
-                if not cls._validate_run(group):
-                    return False
-            elif req_type == 'color':
-                if not cls._validate_color_set(group):
-                    return False
+    @classmethod
+    def can_complete_phase(cls, phase_num, hand, rules=None):
+        """Check whether a hand holds the cards to complete the given phase.
 
-        return True
+        Args:
+            phase_num (int): Phase to check.
+            hand: A Hand, whose bitboard mirror is used if it has one, or a
+                BitboardHand.
+            rules (RuleSet, optional): Defaults to the standard phases.
+        """
+        from hand.bitboard import BitboardHand
+        if not isinstance(hand, BitboardHand):
+            hand = hand.bitboard or BitboardHand.from_hand(hand)
+        return hand.can_complete((rules or STANDARD_RULES).plans[phase_num])
 
     @staticmethod
     def _validate_set(cards):
@@ -42,7 +37,8 @@ class PhaseValidator:
         number_cards = [c for c in cards if c.card_type == 'number']
         wild_count = sum(1 for c in cards if c.card_type == 'wild')
 
-        if not number_cards and wild_count == 0:
+        # Wilds need a natural card to take their number from
+        if not number_cards:
             return False
 
         # Count occurrences of each number
@@ -58,23 +54,24 @@ class PhaseValidator:
 
     @staticmethod
     def _validate_run(cards):
-        """Validate that cards form a run (consecutive numbers)."""
+        """Validate that cards form a run (consecutive numbers, allowing wild cards)."""
         number_cards = [c for c in cards if c.card_type == 'number']
-        wilds = [c for c in cards if c.card_type == 'wild']
+        wild_count = sum(1 for c in cards if c.card_type == 'wild')
         
-        if not number_cards:
+        if not number_cards or len(number_cards) + wild_count != len(cards):
             return False
 
         numbers = sorted(c.number for c in number_cards)
-        wild_count = len(wilds)
-        gaps = 0
+        # A run holds each number at most once
+        if len(set(numbers)) != len(numbers):
+            return False
 
-        for i in range(len(numbers) - 1):            gaps += numbers[i + 1] - numbers[i] - 1
-        return gaps <= wild_count
+        # Wild cards fill the gaps; the run must still fit within 1-12
+        return len(cards) <= 12 and numbers[-1] - numbers[0] + 1 <= len(cards)
 
     @staticmethod
     def _validate_color_set(cards):
-        """Validate that cards are all the same color."""
+        """Validate that cards are all the same color (allowing wild cards)."""
         number_cards = [c for c in cards if c.card_type == 'number']
         if not number_cards:
             return False
@@ -82,4 +79,4 @@ class PhaseValidator:
         wilds = sum(1 for c in cards if c.card_type == 'wild')
         different_colors = len(set(c.color for c in number_cards))
         
-        return different_colors + wilds == 1
+        return different_colors == 1 and len(number_cards) + wilds == len(cards)
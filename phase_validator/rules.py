@@ -0,0 +1,229 @@
+STANDARD_PHASES = {
+    1: [('set', 3), ('set', 3)],               # Two sets of 3
+    2: [('set', 3), ('run', 4)],               # One set of 3 + one run of 4
+    3: [('set', 4), ('run', 4)],               # One set of 4 + one run of 4
+    4: [('run', 7)],                           # Run of 7
+    5: [('run', 8)],                           # Run of 8
+    6: [('run', 9)],                           # Run of 9
+    7: [('set', 4), ('set', 4)],               # Two sets of 4
+    8: [('color', 7)],                         # 7 cards of one color
+    9: [('set', 5), ('set', 2)],               # One set of 5 + one set of 2
+    10: [('set', 5), ('set', 3)]               # One set of 5 + one set of 3
+}
+
+GROUP_TYPES = ('set', 'run', 'color')
+# The solver places color groups first and runs last
+_SEARCH_ORDER = {'color': 0, 'set': 1, 'run': 2}
+
+
+def _set_checker(size):
+    """Build a check for a set: number cards of one number, plus wilds."""
+    def check(cards):
+        if len(cards) != size:
+            return False
+        number = None
+        for card in cards:
+            card_type = card.card_type
+            if card_type == 'number':
+                if number is None:
+                    number = card.number
+                elif card.number != number:
+                    return False
+            elif card_type != 'wild':
+                return False
+        return number is not None
+    return check
+
+
+def _run_checker(size):
+    """Build a check for a run: distinct numbers spanning at most size, plus wilds."""
+    def check(cards):
+        if len(cards) != size or size > 12:
+            return False
+        seen = 0
+        low, high = 13, 0
+        for card in cards:
+            card_type = card.card_type
+            if card_type == 'number':
+                bit = 1 << card.number
+                if seen & bit:
+                    return False
+                seen |= bit
+                low = min(low, card.number)
+                high = max(high, card.number)
+            elif card_type != 'wild':
+                return False
+        return bool(seen) and high - low + 1 <= size
+    return check
+
+
+def _color_checker(size):
+    """Build a check for a color group: number cards of one color, plus wilds."""
+    def check(cards):
+        if len(cards) != size:
+            return False
+        color = None
+        for card in cards:
+            card_type = card.card_type
+            if card_type == 'number':
+                if color is None:
+                    color = card.color
+                elif card.color != color:
+                    return False
+            elif card_type != 'wild':
+                return False
+        return color is not None
+    return check
+
+
+_CHECKER_BUILDERS = {'set': _set_checker, 'run': _run_checker, 'color': _color_checker}
+
+
+def describe(requirements):
+    """Describe a requirement list, e.g. "1 set of 3 + 1 run of 4"."""
+    parts = []
+    for group_type, size in requirements:
+        if parts and parts[-1][0] == (group_type, size):
+            parts[-1][1] += 1
+        else:
+            parts.append([(group_type, size), 1])
+    words = []
+    for (group_type, size), count in parts:
+        if group_type == 'color':
+            words.append(f"{size} cards of one color" if count == 1
+                         else f"{count} groups of {size} cards of one color")
+        else:
+            words.append(f"{count} {group_type}{'s' if count > 1 else ''} of {size}")
+    return " + ".join(words)
+
+
+class PhasePlan:
+    """A requirement list compiled once for validation and solving.
+
+    Every requirement gets a checker specialised for its type and size, so
+    validating a lay-down does not dispatch on the type strings. The plan
+    also carries the solver's group order and the facts the feasibility
+    cache keys on.
+    """
+    __slots__ = ('requirements', 'checks', 'description', 'search_order', 'types',
+                 'total_cards', 'wild_cap', 'number_cap')
+
+    def __init__(self, requirements):
+        """Compile a list of (type, size) pairs.
+
+        Raises:
+            ValueError: If a requirement has an unknown type or a size below 1.
+        """
+        requirements = tuple((group_type, size) for group_type, size in requirements)
+        for group_type, size in requirements:
+            if group_type not in _CHECKER_BUILDERS:
+                raise ValueError(f"Unknown group type {group_type!r}")
+            if size < 1:
+                raise ValueError(f"Group size must be at least 1, got {size}")
+        self.requirements = requirements
+        self.checks = tuple(_CHECKER_BUILDERS[group_type](size) for group_type, size in requirements)
+        self.description = describe(requirements)
+        self.search_order = tuple(sorted(range(len(requirements)),
+                                         key=lambda i: _SEARCH_ORDER[requirements[i][0]]))
+        self.types = frozenset(group_type for group_type, _ in requirements)
+        self.total_cards = sum(size for _, size in requirements)
+        # Every group needs a natural card, so at most this many wilds are placed
+        self.wild_cap = self.total_cards - len(requirements)
+        # The most cards of one number that sets and runs can use together
+        self.number_cap = (sum(size for group_type, size in requirements if group_type == 'set')
+                           + sum(1 for group_type, _ in requirements if group_type == 'run'))
+
+    def validate(self, groups):
+        """Check that the groups, in requirement order, complete the plan."""
+        if len(groups) != len(self.checks):
+            return False
+        for check, group in zip(self.checks, groups):
+            if not check(group):
+                return False
+        return True
+
+    def __len__(self):
+        return len(self.requirements)
+
+    def __repr__(self):
+        return f"PhasePlan({list(self.requirements)!r})"
+
+
+_plans = {}
+
+
+def compile_plan(requirements):
+    """Return the shared compiled plan for a requirement list (or a PhasePlan)."""
+    if isinstance(requirements, PhasePlan):
+        return requirements
+    key = tuple((group_type, size) for group_type, size in requirements)
+    plan = _plans.get(key)
+    if plan is None:
+        plan = _plans[key] = PhasePlan(key)
+    return plan
+
+
+class RuleSet:
+    """A named list of phases, each compiled to a PhasePlan."""
+
+    def __init__(self, name, phases):
+        """Compile a rule set.
+
+        Args:
+            name (str): Name the rule set is registered under.
+            phases (dict): Phase number -> list of (type, size) pairs.
+                Phases must be numbered 1, 2, ... without gaps.
+        """
+        if sorted(phases) != list(range(1, len(phases) + 1)):
+            raise ValueError("Phases must be numbered 1, 2, ... without gaps")
+        self.name = name
+        self.phases = {phase: list(requirements) for phase, requirements in phases.items()}
+        self.plans = {phase: compile_plan(requirements) for phase, requirements in phases.items()}
+        self.last_phase = len(phases)
+
+    def plan(self, phase):
+        """Return the compiled plan of a phase, or None past the last phase."""
+        return self.plans.get(phase)
+
+    def requirements(self, phase):
+        """Return the (type, size) list of a phase, or None past the last phase."""
+        return self.phases.get(phase)
+
+    def describe(self, phase):
+        """Return a short description of a phase, e.g. "2 sets of 3"."""
+        plan = self.plans.get(phase)
+        return plan.description if plan is not None else "Unknown phase"
+
+    def __repr__(self):
+        return f"RuleSet({self.name!r}, {self.last_phase} phases)"
+
+
+_rule_sets = {}
+
+
+def register_rule_set(name, phases, replace=False):
+    """Compile and register a rule set, e.g. a house-rule phase list.
+
+    Raises:
+        ValueError: If the name is taken and replace is False.
+    """
+    if name in _rule_sets and not replace:
+        raise ValueError(f"Rule set {name!r} is already registered")
+    rule_set = _rule_sets[name] = RuleSet(name, phases)
+    return rule_set
+
+
+def get_rule_set(name='standard'):
+    """Return a registered rule set by name."""
+    try:
+        return _rule_sets[name]
+    except KeyError:
+        raise ValueError(f"Unknown rule set {name!r}") from None
+
+
+def rule_set_names():
+    """Return the names of every registered rule set."""
+    return sorted(_rule_sets)
+
+
+STANDARD_RULES = register_rule_set('standard', STANDARD_PHASES)
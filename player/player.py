@@ -1,5 +1,7 @@
+from card.card import card_points
 from hand.hand import Hand
 from laiddownset.laiddownset import LaidDownSet
+from phase_validator.rules import STANDARD_RULES
 
 
 class Player:
@@ -11,6 +13,19 @@ class Player:
         self.has_laid_down_phase = False
         self.round_score = 0
         self.total_score = 0
+        self.rules = STANDARD_RULES  # RuleSet the player's phases come from
+
+    def clone(self):
+        """Return a copy of the player for game cloning.
+
+        The hand is copied; the laid-down set objects are shared and must be
+        copied before they are modified (see Game.clone).
+        """
+        other = self.__class__.__new__(self.__class__)
+        other.__dict__.update(self.__dict__)
+        other.hand = self.hand.clone()
+        other.laid_down_sets = list(self.laid_down_sets)
+        return other
 
     def draw_card(self, card):
         """Add a card to the player's hand."""
@@ -18,29 +33,37 @@ class Player:
 
     def discard_card(self, card_index):
         """Remove and return a card from the player's hand."""
-        if 0 <= card_index < len(self.hand.cards):
-            return self.hand.cards.pop(card_index)
-        return None
+        return self.hand.play(card_index)
 
     def lay_down(self, sets):
-        """Lay down sets for the current phase."""
+        """Lay down sets for the current phase.
+
+        Args:
+            sets: List of card groups (lists of Card objects), one per
+                requirement of the current phase, in requirement order.
+        """
         if self.has_laid_down_phase:
             return False
         
         # Validate the sets meet phase requirements
-        from phase_validator.phase_validator import PhaseValidator
-        validator = PhaseValidator()
+        plan = self.phase_plan()
+        if plan is None:
+            return False
+
+        # Every card must come from this hand and be used only once
+        used = [card for card_set in sets for card in card_set]
+        if len(set(map(id, used))) != len(used) or any(card not in self.hand.cards for card in used):
+            return False
         
-        if validator.is_valid_phase(self.current_phase, sets):
+        if plan.validate(sets):
             # Remove cards from hand and create laid down sets
-            for card_set in sets:
+            for card_set, (set_type, _) in zip(sets, plan.requirements):
                 # Remove cards from hand
                 for card in card_set:
-                    if card in self.hand.cards:
-                        self.hand.cards.remove(card)
+                    self.hand.remove(card)
                 
                 # Create laid down set
-                laid_down_set = LaidDownSet(card_set)
+                laid_down_set = LaidDownSet(list(card_set), set_type)
                 self.laid_down_sets.append(laid_down_set)
             
             self.has_laid_down_phase = True
@@ -48,32 +71,9 @@ class Player:
         
         return False
 
-    def hit_on_set(self, card, set_index):
-        """Add a card to an existing laid down set."""
-        if set_index < len(self.laid_down_sets):
-            set_to_hit = self.laid_down_sets[set_index]
-            if set_to_hit.can_add_card(card):
-                set_to_hit.add_card(card)
-                # Remove card from hand
-                if card in self.hand.cards:
-                    self.hand.cards.remove(card)
-                return True
-        return False
-
     def calculate_hand_score(self):
         """Calculate the score of remaining cards in hand."""
-        score = 0
-        for card in self.hand.cards:
-            if card.card_type == 'number':
-                if card.number <= 9:
-                    score += 5
-                else:  # 10, 11, 12
-                    score += 10
-            elif card.card_type == 'skip':
-                score += 15
-            elif card.card_type == 'wild':
-                score += 25
-        return score
+        return sum(card_points(card) for card in self.hand.cards)
 
     def reset_for_new_round(self):
         """Reset player state for a new round."""
@@ -91,19 +91,11 @@ class Player:
 
     def get_phase_requirements(self):
         """Get the requirements for the current phase."""
-        phase_requirements = {
-            1: "2 sets of 3",
-            2: "1 set of 3 + 1 run of 4",
-            3: "1 set of 4 + 1 run of 4",
-            4: "1 run of 7",
-            5: "1 run of 8",
-            6: "1 run of 9",
-            7: "2 sets of 4",
-            8: "7 cards of one color",
-            9: "1 set of 5 + 1 set of 2",
-            10: "1 set of 5 + 1 set of 3"
-        }
-        return phase_requirements.get(self.current_phase, "Unknown phase")
+        return self.rules.describe(self.current_phase)
+
+    def phase_plan(self):
+        """Return the compiled PhasePlan of the current phase, or None past the last phase."""
+        return self.rules.plan(self.current_phase)
 
     def __str__(self):
         return f"{self.name} (Phase {self.current_phase}, Score: {self.total_score})"
\ No newline at end of file
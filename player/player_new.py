@@ -1,3 +1,4 @@
+from events.events import INFO, WARNING, NULL_SINK
 from hand.hand import Hand
 
 class Player:
@@ -7,6 +8,7 @@ class Player:
         self.current_phase = 1
         self.has_laid_down = False
         self.laid_down_sets = []
+        self.events = NULL_SINK  # EventSink receiving this player's messages
 
     def draw_card(self, deck):
         card = deck.draw()
@@ -26,7 +28,8 @@ class Player:
         groups: list of lists of Card objects.
         """
         if self.has_laid_down:
-            print(f"{self.name} has already laid down this round.")
+            self.events.emit(WARNING, 'already_laid_down', "{player} has already laid down this round.",
+                             player=self.name)
             return False
 
         if self.validate_phase(groups):
@@ -35,10 +38,12 @@ class Player:
                     self.hand.remove(card)
                 self.laid_down_sets.append(group)
             self.has_laid_down = True
-            print(f"{self.name} laid down Phase {self.current_phase}!")
+            self.events.emit(INFO, 'phase_laid_down', "{player} laid down Phase {phase}!",
+                             player=self.name, phase=self.current_phase)
             return True
 
-        print(f"{self.name} attempted to lay down an invalid phase.")
+        self.events.emit(WARNING, 'invalid_phase', "{player} attempted to lay down an invalid phase.",
+                         player=self.name)
         return False
     
     def validate_phase(self, groups):
@@ -0,0 +1,2 @@
+from .server import GameServer, Table, decode_move, encode_message, player_view
+from .state_feed import Delta, StateFeed, apply_ops
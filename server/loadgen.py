@@ -0,0 +1,129 @@
+import argparse
+import asyncio
+import json
+import time
+
+from server.server import DEFAULT_HOST, DEFAULT_PORT, GameServer, encode_message
+from simulation.simulation import percentile
+
+
+def choose_move(moves):
+    """Pick a move the way a hurried player would: lay down, then hit, else draw or discard."""
+    for action in ('lay', 'hit'):
+        for move in moves:
+            if move[0] == action:
+                return move
+    return moves[0] if moves[0][0] == 'draw' else moves[-1]
+
+
+async def play_table(host, port, seats, max_rounds, latencies):
+    """Create a table, play its human seat to the end and return the game_over message.
+
+    Appends the seconds between sending each action and receiving its
+    result to latencies.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(encode_message({'type': 'create', 'name': 'Load', 'seats': seats,
+                                     'max_rounds': max_rounds}))
+        await writer.drain()
+        sent = None
+        while True:
+            line = await reader.readline()
+            if not line:
+                raise ConnectionError("Server closed the connection")
+            message = json.loads(line)
+            kind = message['type']
+            if kind == 'turn':
+                move = choose_move(message['moves'])
+                sent = time.perf_counter()
+                writer.write(encode_message({'type': 'action', 'move': move}))
+                await writer.drain()
+            elif kind == 'result' and sent is not None:
+                latencies.append(time.perf_counter() - sent)
+                sent = None
+            elif kind == 'game_over':
+                return message
+            elif kind == 'error':
+                raise ValueError(message['message'])
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, tables=10, concurrency=10, seats=('human', 'BotPlayer', 'BotPlayer'),
+                   max_rounds=3):
+    """Play tables against a server, at most concurrency at a time.
+
+    Returns:
+        dict: Tables served and completed, actions sent, wall time, tables
+              per second and the p50/p95/p99/max action latency in seconds.
+    """
+    latencies = []
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one_table():
+        async with limit:
+            return await play_table(host, port, list(seats), max_rounds, latencies)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(one_table() for _ in range(tables)), return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    served = [result for result in results if isinstance(result, dict)]
+    latencies.sort()
+    report = {
+        'tables': tables,
+        'tables_served': len(served),
+        'completed_games': sum(1 for result in served if result['completed']),
+        'failures': [repr(result) for result in results if not isinstance(result, dict)],
+        'actions': len(latencies),
+        'elapsed': elapsed,
+        'tables_per_sec': len(served) / elapsed if elapsed > 0 else 0.0,
+        'latency_max': latencies[-1] if latencies else 0.0,
+    }
+    for q in (50, 95, 99):
+        report[f'latency_p{q}'] = percentile(latencies, q)
+    return report
+
+
+async def run_with_server(tables, concurrency, seats, max_rounds, bot_workers=4):
+    """Start a server on a free local port, load it and shut it down."""
+    server = await GameServer(port=0, bot_workers=bot_workers).start()
+    try:
+        report = await run_load(server.host, server.port, tables, concurrency, seats, max_rounds)
+        report['server'] = dict(server.stats)
+        return report
+    finally:
+        await server.close()
+
+
+def main(argv=None):
+    """Command line entry point: python -m server.loadgen."""
+    parser = argparse.ArgumentParser(prog="python -m server.loadgen",
+                                     description="Play many tables against a Phase 10 server.")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--spawn', action='store_true', help="start a server in this process")
+    parser.add_argument('-n', '--tables', type=int, default=20)
+    parser.add_argument('-c', '--concurrency', type=int, default=10)
+    parser.add_argument('--seats', default='human,BotPlayer,BotPlayer',
+                        help="comma-separated seat kinds, one of them 'human'")
+    parser.add_argument('--max-rounds', type=int, default=3)
+    args = parser.parse_args(argv)
+    seats = args.seats.split(',')
+    if args.spawn:
+        report = asyncio.run(run_with_server(args.tables, args.concurrency, seats, args.max_rounds))
+    else:
+        report = asyncio.run(run_load(args.host, args.port, args.tables, args.concurrency,
+                                      seats, args.max_rounds))
+    print(f"{report['tables_served']}/{report['tables']} tables served "
+          f"({report['completed_games']} games completed) in {report['elapsed']:.2f}s, "
+          f"{report['tables_per_sec']:.2f} tables/s, {report['actions']} actions")
+    print("action latency: " + ", ".join(f"p{q} {report[f'latency_p{q}'] * 1000:.2f}ms" for q in (50, 95, 99))
+          + f", max {report['latency_max'] * 1000:.2f}ms")
+    for failure in report['failures']:
+        print(f"failed: {failure}")
+    return 1 if report['failures'] else 0
+
+
+if __name__ == "__main__":
+    main()
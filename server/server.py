@@ -0,0 +1,466 @@
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from bot.bot import BotPlayer
+from bot.ismcts_bot import ISMCTSBot
+from game.game import Game
+from move_generator.move_generator import (DRAW_STAGE, PLAY_STAGE, apply_move, card_kind,
+                                           generate_moves)
+from player.player import Player
+from server.state_feed import StateFeed, encode_message
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 7510
+HUMAN = 'human'
+# Seat kinds a table can be created with, besides HUMAN
+BOT_CLASSES = {'BotPlayer': BotPlayer, 'ISMCTSBot': ISMCTSBot}
+
+# Protocol: one JSON object per line in each direction.
+#
+# Client -> server
+#   {"type": "create", "name": str, "seats": ["human", "BotPlayer", ...],
+#    "max_rounds": int (optional)}  the creator takes the first human seat,
+#                                   or watches a table of bots only
+#   {"type": "join", "table": int, "name": str}  takes the next open human seat
+#   {"type": "watch", "table": int}  follow a table as a spectator
+#   {"type": "action", "move": [...]}  one of the moves last offered
+#   {"type": "resync", "version": int (optional)}  deltas since version, or a
+#                                                  snapshot if they are gone
+#
+# Server -> client
+#   created / joined / watching   {"table", "seat"}; the table starts once
+#                                 every human seat is taken
+#   snapshot           {"v", "state"}: the full state at version v
+#   delta              {"v", "ops"}: changes from version v - 1 (see state_feed)
+#   turn               {"stage", "moves", "view"}: the client must answer
+#                      with one of the moves (see move_generator)
+#   result             {"ok", "move"} for each action
+#   round_over         {"round", "players"}
+#   game_over          {"completed", "winner", "players"}
+#   error              {"message"}; a table that fails sends one to every
+#                      viewer, then an uncompleted game_over
+
+
+def decode_move(data):
+    """Turn a move read from JSON (nested lists) back into move tuples.
+
+    Raises:
+        ValueError: If the move holds anything but lists, strings and
+            integers, so every decoded move can be compared with the legal ones.
+    """
+    if isinstance(data, list):
+        return tuple(decode_move(item) for item in data)
+    if isinstance(data, str) or (isinstance(data, int) and not isinstance(data, bool)):
+        return data
+    raise ValueError(f"Malformed move element {data!r}")
+
+
+def card_label(card):
+    """Return a short display name without the card id, e.g. "Red 5"."""
+    if card.card_type == 'number':
+        return f"{card.color.capitalize()} {card.number}"
+    return card.card_type.capitalize()
+
+
+def player_view(game, seat):
+    """Describe the table as seen from a seat: its own hand, everyone's public state."""
+    player = game.players[seat]
+    discard_pile = game.deck.discard_pile
+    return {
+        'round': game.round_number,
+        'phase': player.current_phase,
+        'requirements': player.get_phase_requirements(),
+        'hand': [card_kind(card) for card in player.hand.cards],
+        'cards': [card_label(card) for card in player.hand.cards],
+        'discard_top': card_label(discard_pile[-1]) if discard_pile else None,
+        'deck_cards': len(game.deck.cards),
+        'players': [
+            {
+                'name': other.name,
+                'phase': other.current_phase,
+                'hand_size': len(other.hand.cards),
+                'total_score': other.total_score,
+                'laid_down': [[card_label(card) for card in laid_set.cards]
+                              for laid_set in other.laid_down_sets],
+            }
+            for other in game.players
+        ],
+    }
+
+
+def _standings(game):
+    return [{'name': player.name, 'phase': player.current_phase,
+             'round_score': player.round_score, 'total_score': player.total_score}
+            for player in game.players]
+
+
+class Connection:
+    """One client socket; actions it sends are queued for its table."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.actions = asyncio.Queue()
+        self.closed = False
+        self.table = None
+        self.seat = None  # None when watching
+
+    async def send(self, message):
+        """Write a message, ignoring clients that have gone away."""
+        await self.send_bytes(encode_message(message))
+
+    async def send_bytes(self, data):
+        """Write an already encoded message line."""
+        if self.closed:
+            return
+        try:
+            self.writer.write(data)
+            await self.writer.drain()
+        except (ConnectionError, RuntimeError):
+            self.closed = True
+
+
+class Table:
+    """One game and the clients seated at it.
+
+    Human seats wait for their client's actions; bot turns run in the
+    server's executor, so a slow bot never blocks the event loop. A human
+    seat whose client disconnects or times out plays default moves: draw
+    from the deck, lay down or hit nothing, discard its first card.
+
+    Seated clients and spectators follow the game through a StateFeed:
+    a snapshot when the game starts (or on request), then a delta after
+    every action, each redacted for its viewer.
+    """
+
+    def __init__(self, table_id, seats, names, server, max_rounds=None):
+        """Create the game.
+
+        Args:
+            table_id (int): Id clients join the table by.
+            seats (list[str]): HUMAN or a BOT_CLASSES name per seat.
+            names (list[str]): Player name per seat.
+            server (GameServer): Server running the table.
+            max_rounds (int, optional): Rounds after which an unfinished
+                game ends. Defaults to the server's setting.
+        """
+        self.table_id = table_id
+        self.seats = list(seats)
+        self.server = server
+        self.max_rounds = max_rounds if max_rounds is not None else server.max_rounds
+        players = [Player(name) if kind == HUMAN else BOT_CLASSES[kind](name)
+                   for kind, name in zip(seats, names)]
+        self.game = Game(players, rng=random.Random(f"{server.base_seed}:{table_id}"))
+        self.connections = {}  # seat -> Connection
+        self.spectators = []
+        self.feed = None  # StateFeed, once the game has started
+        self.rounds = 0  # rounds started
+        self.ready = asyncio.Event()
+        self.task = None
+
+    def open_seats(self):
+        """Return the human seats nobody has taken yet."""
+        return [seat for seat, kind in enumerate(self.seats)
+                if kind == HUMAN and seat not in self.connections]
+
+    def seat(self, connection, name):
+        """Give the connection the next open human seat and return it."""
+        seat = self.open_seats()[0]
+        self.connections[seat] = connection
+        self.game.players[seat].name = name
+        connection.table = self
+        connection.seat = seat
+        if not self.open_seats():
+            self.ready.set()
+        return seat
+
+    async def watch(self, connection):
+        """Add a spectator; it gets a snapshot now if the game has started."""
+        self.spectators.append(connection)
+        connection.table = self
+        if self.feed is not None:
+            await connection.send(self.feed.snapshot())
+
+    async def broadcast(self, message):
+        data = encode_message(message)
+        await asyncio.gather(*(connection.send_bytes(data) for connection in self._viewers()))
+
+    def _viewers(self):
+        return list(self.connections.values()) + self.spectators
+
+    async def publish(self):
+        """Send the changes since the last publish to every viewer."""
+        delta = self.feed.publish()
+        if delta is not None:
+            # Spectators and seats without private changes share one encoding
+            await asyncio.gather(*(connection.send_bytes(delta.encode(connection.seat))
+                                   for connection in self._viewers()))
+
+    async def resync(self, connection, version=None):
+        """Send a client the deltas it missed since version, or a snapshot."""
+        if self.feed is None:
+            raise ValueError("The game has not started")
+        lines = None if version is None else self.feed.since(version, connection.seat)
+        if lines is None:
+            await connection.send(self.feed.snapshot(connection.seat))
+        else:
+            for data in lines:
+                await connection.send_bytes(data)
+
+    async def run(self):
+        """Wait for every human, play the game and report the result.
+
+        If the game fails, every viewer gets an error and then the game_over
+        of the unfinished game, rather than waiting for turns that never come.
+        """
+        await self.ready.wait()
+        failed = False
+        try:
+            await self._play()
+        except Exception as error:
+            failed = True
+            await self.broadcast({'type': 'error', 'table': self.table_id,
+                                  'message': f"Table failed: {error}"})
+        game = self.game
+        completed = game.is_game_over() and not failed
+        ranking = sorted(game.players, key=lambda p: (-p.current_phase, p.total_score))
+        await self.broadcast({'type': 'game_over', 'table': self.table_id, 'completed': completed,
+                              'winner': ranking[0].name if completed else None,
+                              'rounds': self.rounds, 'players': _standings(game)})
+
+    async def _play(self):
+        """Play rounds until the game is over or the round limit is reached."""
+        game = self.game
+        self.feed = StateFeed(game, self.table_id)
+        await asyncio.gather(*(connection.send(self.feed.snapshot(connection.seat))
+                               for connection in self._viewers()))
+        while self.rounds < self.max_rounds:
+            game.start_new_round()
+            await self.publish()
+            self.rounds += 1
+            turns = 0
+            while not game.is_round_over() and turns < self.server.max_turns_per_round:
+                seat = game.current_player_index
+                if self.seats[seat] == HUMAN:
+                    await self._human_turn(seat)
+                else:
+                    await self._bot_turn(game.players[seat])
+                turns += 1
+                game.end_turn()
+                await self.publish()
+            game.calculate_round_scores()
+            await self.publish()
+            await self.broadcast({'type': 'round_over', 'table': self.table_id,
+                                  'round': game.round_number, 'players': _standings(game)})
+            if game.is_game_over():
+                break
+            game.reset_for_next_round()
+
+    async def _bot_turn(self, player):
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        await loop.run_in_executor(self.server.executor,
+                                   partial(player.play_turn, self.game, self.server.bot_time_budget))
+        self.server.stats['bot_turns'] += 1
+        self.server.stats['bot_seconds'] += time.perf_counter() - start
+
+    async def _human_turn(self, seat):
+        game = self.game
+        player = game.players[seat]
+        connection = self.connections[seat]
+        stage = DRAW_STAGE
+        while True:
+            moves = list(generate_moves(game, player, stage))
+            if not moves:
+                if stage == DRAW_STAGE:
+                    stage = PLAY_STAGE
+                    continue
+                return  # went out with nothing left to discard
+            move = await self._ask(connection, stage, moves, seat)
+            ok = apply_move(game, player, move)
+            self.server.stats['human_actions'] += 1
+            await self.publish()
+            await connection.send({'type': 'result', 'table': self.table_id, 'ok': ok, 'move': move})
+            if move[0] == 'draw':
+                stage = PLAY_STAGE
+            elif move[0] == 'discard' or not player.hand.cards:
+                return
+
+    async def _ask(self, connection, stage, moves, seat):
+        """Offer the moves to the client and return its legal choice (or a default)."""
+        default = moves[0] if stage == DRAW_STAGE else next(move for move in moves if move[0] == 'discard')
+        if connection.closed:
+            return default
+        await connection.send({'type': 'turn', 'table': self.table_id, 'seat': seat, 'stage': stage,
+                               'moves': moves, 'view': player_view(self.game, seat)})
+        legal = set(moves)
+        while True:
+            try:
+                move = await asyncio.wait_for(connection.actions.get(), self.server.turn_timeout)
+            except asyncio.TimeoutError:
+                return default
+            if move is None:  # disconnected
+                return default
+            if move in legal:
+                return move
+            await connection.send({'type': 'error', 'message': f"Illegal move {list(move)!r}"})
+
+
+class GameServer:
+    """Hosts many tables in one process over line-delimited JSON on TCP."""
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, bot_workers=4, base_seed=0,
+                 turn_timeout=60.0, bot_time_budget=None, max_rounds=100, max_turns_per_round=500):
+        """Configure the server.
+
+        Args:
+            host (str): Address to listen on; localhost by default.
+            port (int): Port to listen on; 0 picks a free one.
+            bot_workers (int): Threads running bot turns.
+            base_seed: Seed every table's random stream is derived from.
+            turn_timeout (float): Seconds a human seat may take per action
+                before a default move is played for it.
+            bot_time_budget (float, optional): time_budget for bot turns.
+            max_rounds (int): Default round limit of a table.
+            max_turns_per_round (int): Turns after which a round is scored.
+        """
+        self.host = host
+        self.port = port
+        self.base_seed = base_seed
+        self.turn_timeout = turn_timeout
+        self.bot_time_budget = bot_time_budget
+        self.max_rounds = max_rounds
+        self.max_turns_per_round = max_turns_per_round
+        self.executor = ThreadPoolExecutor(max_workers=bot_workers, thread_name_prefix='bot')
+        self.tables = {}
+        self.stats = {'tables_created': 0, 'tables_finished': 0, 'human_actions': 0,
+                      'bot_turns': 0, 'bot_seconds': 0.0}
+        self._table_ids = itertools.count(1)
+        self._server = None
+
+    async def start(self):
+        """Start listening; the bound port is stored in self.port."""
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def close(self):
+        """Stop listening, cancel unfinished tables and stop the bot threads."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for table in list(self.tables.values()):
+            if table.task is not None:
+                table.task.cancel()
+        self.executor.shutdown(wait=False)
+
+    def create_table(self, seats, names, max_rounds=None):
+        """Create a table and schedule its game; it starts once its humans have joined."""
+        for kind in seats:
+            if kind != HUMAN and kind not in BOT_CLASSES:
+                raise ValueError(f"Unknown seat kind {kind!r}")
+        if not 2 <= len(seats) <= 6:
+            raise ValueError("A table needs 2 to 6 seats")
+        table = Table(next(self._table_ids), seats, names, self, max_rounds)
+        self.tables[table.table_id] = table
+        self.stats['tables_created'] += 1
+        if not table.open_seats():
+            table.ready.set()
+        table.task = asyncio.get_running_loop().create_task(self._run_table(table))
+        return table
+
+    async def _run_table(self, table):
+        try:
+            await table.run()
+        finally:
+            self.tables.pop(table.table_id, None)
+            self.stats['tables_finished'] += 1
+
+    async def _serve(self, reader, writer):
+        connection = Connection(reader, writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                    await self._dispatch(connection, message)
+                except (ValueError, KeyError, TypeError) as error:
+                    await connection.send({'type': 'error', 'message': str(error)})
+        except ConnectionError:
+            pass
+        finally:
+            connection.closed = True
+            connection.actions.put_nowait(None)
+            writer.close()
+
+    async def _dispatch(self, connection, message):
+        kind = message['type']
+        if kind == 'action':
+            connection.actions.put_nowait(decode_move(message['move']))
+        elif kind == 'resync':
+            if connection.table is None:
+                raise ValueError("Not at a table")
+            await connection.table.resync(connection, message.get('version'))
+        elif connection.table is not None:
+            raise ValueError("Already seated at a table")
+        elif kind == 'create':
+            seats = message['seats']
+            names = [f"{seat_kind.replace('Player', '')} {seat + 1}" for seat, seat_kind in enumerate(seats)]
+            table = self.create_table(seats, names, message.get('max_rounds'))
+            if HUMAN in seats:
+                seat = table.seat(connection, message.get('name', 'Player'))
+            else:
+                seat = None  # a bot-only table; the creator watches
+                await table.watch(connection)
+            await connection.send({'type': 'created', 'table': table.table_id, 'seat': seat})
+        elif kind == 'watch':
+            table = self.tables.get(message['table'])
+            if table is None:
+                raise ValueError(f"No table {message['table']!r}")
+            await table.watch(connection)
+            await connection.send({'type': 'watching', 'table': table.table_id})
+        elif kind == 'join':
+            table = self.tables.get(message['table'])
+            if table is None or not table.open_seats():
+                raise ValueError(f"No open seat at table {message['table']!r}")
+            seat = table.seat(connection, message.get('name', 'Player'))
+            await connection.send({'type': 'joined', 'table': table.table_id, 'seat': seat})
+        else:
+            raise ValueError(f"Unknown message type {kind!r}")
+
+
+def main(argv=None):
+    """Command line entry point: python -m server."""
+    parser = argparse.ArgumentParser(prog="python -m server", description="Host Phase 10 tables over TCP.")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--bot-workers', type=int, default=4)
+    parser.add_argument('--seed', default=0)
+    parser.add_argument('--turn-timeout', type=float, default=60.0)
+    args = parser.parse_args(argv)
+
+    async def serve():
+        server = await GameServer(args.host, args.port, args.bot_workers, args.seed,
+                                  args.turn_timeout).start()
+        print(f"Serving Phase 10 tables on {server.host}:{server.port}")
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
@@ -0,0 +1,242 @@
+import json
+from collections import Counter, deque
+
+from card.card import CARD_TABLE, DECK_SIZE
+from move_generator.move_generator import card_kind
+
+# Delta operations are short JSON arrays naming a field of the state model
+# and its new value; 'hand' is private to its seat, everything else public.
+#   ["round", round_number]
+#   ["turn", seat]
+#   ["deck", cards_left]
+#   ["discard", top_kind_or_null, pile_size]
+#   ["hand_size", seat, size]
+#   ["hand", seat, added_kinds, removed_kinds]          private
+#   ["phase", seat, phase]
+#   ["score", seat, total_score]
+#   ["laid", seat, [[kinds], ...]]                     sets laid down (or cleared)
+#   ["set", seat, set_index, added_kinds]              a laid set was extended
+
+
+# Card kind by table index
+_KINDS = tuple(card_kind(card) for card in CARD_TABLE)
+
+
+def _kind(card):
+    # Ad-hoc cards have IDs past the table and are looked up the slow way
+    return _KINDS[card.id] if card.id < DECK_SIZE else card_kind(card)
+
+
+class _PlayerState:
+    __slots__ = ('name', 'phase', 'score', 'hand', 'laid')
+
+    def __init__(self, player):
+        self.name = player.name
+        self.phase = player.current_phase
+        self.score = player.total_score
+        self.hand = sorted([_kind(card) for card in player.hand.cards])
+        self.laid = [sorted([_kind(card) for card in laid_set.cards]) for laid_set in player.laid_down_sets]
+
+
+class _TableState:
+    """The state model deltas are computed against: kinds and counts only."""
+    __slots__ = ('round', 'turn', 'deck', 'discard', 'players')
+
+    def __init__(self, game):
+        pile = game.deck.discard_pile
+        self.round = game.round_number
+        self.turn = game.current_player_index
+        self.deck = len(game.deck.cards)
+        self.discard = (_kind(pile[-1]) if pile else None, len(pile))
+        self.players = [_PlayerState(player) for player in game.players]
+
+
+def _difference(new, old):
+    """Return the kinds in new but not in old, counting repeats; both lists are sorted."""
+    result = []
+    position, size = 0, len(old)
+    for kind in new:
+        while position < size and old[position] < kind:
+            position += 1
+        if position < size and old[position] == kind:
+            position += 1
+        else:
+            result.append(kind)
+    return result
+
+
+def diff_states(old, new):
+    """Compute the public ops and the private ops per seat that turn old into new."""
+    public = []
+    private = {}
+    if new.round != old.round:
+        public.append(['round', new.round])
+    if new.turn != old.turn:
+        public.append(['turn', new.turn])
+    if new.deck != old.deck:
+        public.append(['deck', new.deck])
+    if new.discard != old.discard:
+        public.append(['discard', *new.discard])
+    for seat, (before, after) in enumerate(zip(old.players, new.players)):
+        if after.hand != before.hand:
+            if len(after.hand) != len(before.hand):
+                public.append(['hand_size', seat, len(after.hand)])
+            private[seat] = [['hand', seat, _difference(after.hand, before.hand),
+                              _difference(before.hand, after.hand)]]
+        if after.phase != before.phase:
+            public.append(['phase', seat, after.phase])
+        if after.score != before.score:
+            public.append(['score', seat, after.score])
+        if after.laid != before.laid:
+            extended = (len(after.laid) == len(before.laid)
+                        and all(not _difference(b, a) for b, a in zip(before.laid, after.laid)))
+            if extended:
+                for set_index, (b, a) in enumerate(zip(before.laid, after.laid)):
+                    if a != b:
+                        public.append(['set', seat, set_index, _difference(a, b)])
+            else:
+                public.append(['laid', seat, after.laid])
+    return public, private
+
+
+_encoder = json.JSONEncoder(separators=(',', ':'))
+
+
+def encode_message(message):
+    """Serialize a message as one line of compact JSON."""
+    return _encoder.encode(message).encode() + b'\n'
+
+
+class Delta:
+    """One version step: public ops plus private ops for some seats.
+
+    Each distinct message is serialized once: every spectator, and every
+    seat without private ops, gets the same bytes object.
+    """
+    __slots__ = ('table', 'version', 'public', 'private', '_encoded')
+
+    def __init__(self, table, version, public, private):
+        self.table = table
+        self.version = version
+        self.public = public
+        self.private = private
+        self._encoded = {}
+
+    def ops(self, viewer=None):
+        """Return the ops a viewer (a seat, or None for spectators) may see."""
+        if viewer in self.private:
+            return self.public + self.private[viewer]
+        return self.public
+
+    def encode(self, viewer=None):
+        """Return the delta message for a viewer as one line of JSON bytes."""
+        key = viewer if viewer in self.private else None
+        data = self._encoded.get(key)
+        if data is None:
+            data = self._encoded[key] = encode_message(
+                {'type': 'delta', 'table': self.table, 'v': self.version, 'ops': self.ops(key)})
+        return data
+
+
+class StateFeed:
+    """Versioned state of one game, published as compact deltas.
+
+    Call publish() after anything changed the game; the state is compared
+    with the previous version and the changes become a Delta. Recent deltas
+    are kept so a client that missed some can catch up; one that fell
+    further behind gets a snapshot instead.
+    """
+
+    def __init__(self, game, table=None, history=256):
+        """Start following a game at version 0.
+
+        Args:
+            game (Game): Game to follow.
+            table: Table id put in every message.
+            history (int): Deltas kept for catching up.
+        """
+        self.game = game
+        self.table = table
+        self.version = 0
+        self._state = _TableState(game)
+        self._history = deque(maxlen=history)
+
+    def publish(self):
+        """Record the changes since the last version; returns the Delta, or None if nothing changed."""
+        state = _TableState(self.game)
+        public, private = diff_states(self._state, state)
+        self._state = state
+        if not public and not private:
+            return None
+        self.version += 1
+        delta = Delta(self.table, self.version, public, private)
+        self._history.append(delta)
+        return delta
+
+    def snapshot(self, viewer=None):
+        """Return the full state at the current version, with only the viewer's hand.
+
+        Args:
+            viewer (int, optional): Seat of the viewer; None for spectators,
+                who see no hands.
+        """
+        state = self._state
+        return {
+            'type': 'snapshot',
+            'table': self.table,
+            'v': self.version,
+            'state': {
+                'round': state.round,
+                'turn': state.turn,
+                'deck': state.deck,
+                'discard': list(state.discard),
+                'players': [
+                    {
+                        'name': player.name,
+                        'phase': player.phase,
+                        'score': player.score,
+                        'hand_size': len(player.hand),
+                        'hand': list(player.hand) if seat == viewer else None,
+                        'laid': [list(laid) for laid in player.laid],
+                    }
+                    for seat, player in enumerate(state.players)
+                ],
+            },
+        }
+
+    def since(self, version, viewer=None):
+        """Return the delta lines a client at version needs, or None if it must resync."""
+        if version == self.version:
+            return []
+        if not self._history or version < self._history[0].version - 1 or version > self.version:
+            return None
+        return [delta.encode(viewer) for delta in self._history if delta.version > version]
+
+
+def apply_ops(state, ops):
+    """Apply delta ops to a snapshot's 'state' dict in place (client side)."""
+    for op in ops:
+        name = op[0]
+        if name in ('round', 'turn', 'deck'):
+            state[name] = op[1]
+        elif name == 'discard':
+            state['discard'] = [op[1], op[2]]
+        else:
+            player = state['players'][op[1]]
+            if name == 'hand_size':
+                player['hand_size'] = op[2]
+            elif name == 'hand':
+                hand = Counter(player['hand'] or ()) + Counter(op[2])
+                hand.subtract(op[3])
+                player['hand'] = sorted(hand.elements())
+            elif name == 'phase':
+                player['phase'] = op[2]
+            elif name == 'score':
+                player['score'] = op[2]
+            elif name == 'laid':
+                player['laid'] = [list(laid) for laid in op[2]]
+            elif name == 'set':
+                player['laid'][op[2]] = sorted(player['laid'][op[2]] + op[3])
+            else:
+                raise ValueError(f"Unknown delta op {name!r}")
+    return state
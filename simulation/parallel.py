@@ -0,0 +1,95 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from simulation.simulation import HeadlessSimulation, LatencyHistogram, summarize
+
+
+def shard_ranges(num_games, num_shards):
+    """Split game indices [0, num_games) into contiguous, near-equal ranges."""
+    num_shards = max(1, min(num_shards, num_games))
+    base, extra = divmod(num_games, num_shards)
+    ranges = []
+    start = 0
+    for shard in range(num_shards):
+        stop = start + base + (1 if shard < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def _run_shard(settings, start, stop):
+    """Worker entry point: play one seed range and return its results."""
+    shard_start = time.perf_counter()
+    simulation = HeadlessSimulation(**settings)
+    results = simulation.play_games(start, stop)
+    return {
+        'start': start,
+        'stop': stop,
+        'elapsed': time.perf_counter() - shard_start,
+        'results': results,
+        'turn_times': simulation.turn_times,
+    }
+
+
+class ParallelSimulation:
+    """Runs a headless simulation job across a process pool.
+
+    Game ``i`` always uses the random stream derived from ``(base_seed, i)``,
+    so the merged results are identical for any number of workers.
+    """
+
+    def __init__(self, lineup=None, base_seed=0, workers=None,
+                 max_rounds=100, max_turns_per_round=500, turn_budget=None):
+        """Initialize the runner.
+
+        Args:
+            lineup: List of (player_class, name) pairs; classes must be
+                importable by the worker processes.
+            base_seed: Seed from which every game's random stream is derived.
+            workers (int, optional): Number of worker processes. Defaults to
+                the CPU count.
+            max_rounds (int): Passed through to HeadlessSimulation.
+            max_turns_per_round (int): Passed through to HeadlessSimulation.
+            turn_budget (float, optional): Passed through to HeadlessSimulation.
+        """
+        self.settings = {
+            'lineup': lineup,
+            'base_seed': base_seed,
+            'max_rounds': max_rounds,
+            'max_turns_per_round': max_turns_per_round,
+            'turn_budget': turn_budget,
+        }
+        self.workers = workers or os.cpu_count() or 1
+
+    def run(self, num_games):
+        """Play num_games games and merge the per-worker statistics.
+
+        Returns:
+            dict: The same summary as HeadlessSimulation.run, plus the
+                  worker count and per-shard timings.
+        """
+        start = time.perf_counter()
+        ranges = shard_ranges(num_games, self.workers)
+        if len(ranges) <= 1:
+            shards = [_run_shard(self.settings, lo, hi) for lo, hi in ranges]
+        else:
+            with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+                futures = [executor.submit(_run_shard, self.settings, lo, hi) for lo, hi in ranges]
+                shards = [future.result() for future in futures]
+        elapsed = time.perf_counter() - start
+
+        # Merge in game order so aggregates never depend on the sharding
+        shards.sort(key=lambda shard: shard['start'])
+        results = [result for shard in shards for result in shard['results']]
+        turn_times = {}
+        for shard in shards:
+            for name, latencies in shard['turn_times'].items():
+                turn_times.setdefault(name, LatencyHistogram()).merge(latencies)
+        summary = summarize(results, elapsed, turn_times)
+        summary['workers'] = len(ranges)
+        summary['shards'] = [
+            {'start': shard['start'], 'stop': shard['stop'], 'elapsed': shard['elapsed']}
+            for shard in shards
+        ]
+        return summary
@@ -0,0 +1,184 @@
+import argparse
+import cProfile
+import json
+import os
+import pstats
+import time
+import tracemalloc
+
+from simulation.simulation import HeadlessSimulation
+
+# Modules the report always lists, even when they used no time or memory
+MODULES = ('card', 'deck', 'hand', 'phase_validator', 'laiddownset', 'hit_manager', 'bot', 'game')
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def module_of(filename):
+    """Map a source file to its top-level project package, or 'other'."""
+    if filename.startswith(('<', '~')):
+        return 'other'  # built-ins and generated code
+    path = os.path.abspath(filename)
+    if not path.startswith(PROJECT_ROOT + os.sep):
+        return 'other'
+    parts = os.path.relpath(path, PROJECT_ROOT).split(os.sep)
+    if len(parts) == 1:
+        return os.path.splitext(parts[0])[0]
+    return parts[0]
+
+
+def _take_snapshot():
+    # Leave out the memory of earlier samples held by tracemalloc itself
+    return tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+
+
+def _empty_row():
+    return {'seconds': 0.0, 'calls': 0, 'bytes': 0, 'blocks': 0}
+
+
+def group_profile(stats, table, top=5):
+    """Add each function's own time and calls to its module's row.
+
+    Returns:
+        dict: Module -> its top functions by own time, as "file:line(name)"
+              with seconds and calls.
+    """
+    functions = {}
+    for (filename, line, name), (_, calls, own_time, _, _) in stats.stats.items():
+        row = table.setdefault(module_of(filename), _empty_row())
+        row['seconds'] += own_time
+        row['calls'] += calls
+        functions.setdefault(module_of(filename), []).append(
+            (own_time, calls, f"{os.path.basename(filename)}:{line}({name})"))
+    return {module: [{'function': label, 'seconds': seconds, 'calls': calls}
+                     for seconds, calls, label in sorted(entries, reverse=True)[:top]]
+            for module, entries in functions.items()}
+
+
+def group_snapshot(snapshot, table):
+    """Add the live memory of a tracemalloc snapshot to each module's row."""
+    for stat in snapshot.statistics('filename'):
+        row = table.setdefault(module_of(stat.traceback[0].filename), _empty_row())
+        row['bytes'] += stat.size
+        row['blocks'] += stat.count
+
+
+class ProfiledSimulation(HeadlessSimulation):
+    """A headless simulation run under cProfile and tracemalloc.
+
+    Memory is sampled with a tracemalloc snapshot after every
+    snapshot_every-th round, while the game's objects are still live; the
+    sample holding the most memory is the one grouped in the report.
+    """
+
+    def __init__(self, *args, snapshot_every=1, **kwargs):
+        """Initialize the simulation; arguments are those of HeadlessSimulation.
+
+        Args:
+            snapshot_every (int): Rounds between memory samples.
+        """
+        super().__init__(*args, **kwargs)
+        self.snapshot_every = snapshot_every
+        self.rounds_played = 0
+        self.peak_snapshot = None
+        self._peak_size = -1
+        self._profiler = None
+
+    def _play_round(self, game):
+        turns = super()._play_round(game)
+        self.rounds_played += 1
+        if tracemalloc.is_tracing() and self.rounds_played % self.snapshot_every == 0:
+            size, _ = tracemalloc.get_traced_memory()
+            if size > self._peak_size:
+                # Keep the sampling itself out of the time profile
+                if self._profiler is not None:
+                    self._profiler.disable()
+                self.peak_snapshot, self._peak_size = _take_snapshot(), size
+                if self._profiler is not None:
+                    self._profiler.enable()
+        return turns
+
+    def profile(self, num_games, output_dir, top=5):
+        """Play games under the profilers and write the report and raw data.
+
+        Files written to output_dir:
+            profile.pstats: cProfile statistics (load with pstats.Stats).
+            memory_peak.snapshot, memory_end.snapshot: tracemalloc
+                snapshots (load with tracemalloc.Snapshot.load), for
+                diffing against a later run's.
+            report.json: The returned report.
+
+        Returns:
+            dict: Per module (see MODULES) its own time, calls, and live
+                  bytes and blocks in the peak sample; the top functions of
+                  each module; traced peak memory and the run summary.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        self.rounds_played = 0
+        self.peak_snapshot, self._peak_size = None, -1
+        profiler = self._profiler = cProfile.Profile()
+        tracemalloc.start()
+        try:
+            start = time.perf_counter()
+            profiler.enable()
+            try:
+                results = self.play_games(0, num_games)
+            finally:
+                profiler.disable()
+            elapsed = time.perf_counter() - start
+            end_snapshot = _take_snapshot()
+            _, peak_bytes = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+            self._profiler = None
+
+        profiler.dump_stats(os.path.join(output_dir, 'profile.pstats'))
+        peak_snapshot = self.peak_snapshot or end_snapshot
+        peak_snapshot.dump(os.path.join(output_dir, 'memory_peak.snapshot'))
+        end_snapshot.dump(os.path.join(output_dir, 'memory_end.snapshot'))
+
+        table = {module: _empty_row() for module in MODULES}
+        top_functions = group_profile(pstats.Stats(profiler), table, top)
+        group_snapshot(peak_snapshot, table)
+        report = {
+            'games': len(results),
+            'rounds': self.rounds_played,
+            'turns': sum(result['turns'] for result in results),
+            'elapsed': elapsed,
+            'traced_peak_bytes': peak_bytes,
+            'modules': table,
+            'top_functions': top_functions,
+        }
+        with open(os.path.join(output_dir, 'report.json'), 'w') as stream:
+            json.dump(report, stream, indent=2, sort_keys=True)
+        return report
+
+
+def format_report(report):
+    """Render a profiling report as a text table, slowest module first."""
+    lines = [f"{report['games']} games, {report['rounds']} rounds, {report['turns']} turns "
+             f"in {report['elapsed']:.2f}s (profiled); traced peak {report['traced_peak_bytes'] / 1024:.0f} KiB",
+             f"{'module':<16} {'own time':>10} {'calls':>10} {'live KiB':>10} {'blocks':>8}"]
+    rows = sorted(report['modules'].items(), key=lambda item: -item[1]['seconds'])
+    for module, row in rows:
+        lines.append(f"{module:<16} {row['seconds']:>9.3f}s {row['calls']:>10} "
+                     f"{row['bytes'] / 1024:>10.1f} {row['blocks']:>8}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """Command line entry point: python -m simulation.profiling."""
+    parser = argparse.ArgumentParser(prog="python -m simulation.profiling",
+                                     description="Profile headless games with cProfile and tracemalloc.")
+    parser.add_argument('-n', '--games', type=int, default=3)
+    parser.add_argument('-o', '--output-dir', default='profile_output')
+    parser.add_argument('--seed', default=0)
+    parser.add_argument('--snapshot-every', type=int, default=1,
+                        help="rounds between memory samples (default 1)")
+    args = parser.parse_args(argv)
+    simulation = ProfiledSimulation(base_seed=args.seed, snapshot_every=args.snapshot_every)
+    print(format_report(simulation.profile(args.games, args.output_dir)))
+    return 0
+
+
+if __name__ == "__main__":
+    main()
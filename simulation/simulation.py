@@ -0,0 +1,269 @@
+import math
+import os
+import random
+import time
+
+from bot.bot import BotPlayer
+from game.game import Game
+from journal.journal import JournalWriter
+
+
+DEFAULT_LINEUP = [
+    (BotPlayer, "Bot 1"),
+    (BotPlayer, "Bot 2"),
+    (BotPlayer, "Bot 3"),
+    (BotPlayer, "Bot 4"),
+]
+
+
+def game_rng(base_seed, game_index):
+    """Return the random stream for one game of a seeded run.
+
+    The stream depends only on the base seed and the game's index, so a game
+    plays out identically no matter which process or batch it runs in.
+    """
+    return random.Random(f"{base_seed}:{game_index}")
+
+
+class LatencyHistogram:
+    """Turn latencies in logarithmic buckets, for percentiles in bounded memory.
+
+    Each bucket spans a factor of GROWTH, so a percentile is reported as its
+    bucket's upper bound, at most 1% above the exact value. Count, total and
+    maximum are exact. Histograms of different runs or processes merge by
+    adding their buckets.
+    """
+    GROWTH = 1.01
+    FLOOR = 1e-9  # shorter latencies share the lowest bucket
+
+    def __init__(self):
+        """Initialize an empty histogram."""
+        self.buckets = {}  # bucket index -> latencies in it
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        """Record one latency."""
+        index = math.ceil(math.log(max(seconds, self.FLOOR), self.GROWTH))
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other):
+        """Add another histogram's latencies to this one."""
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, q):
+        """Return the nearest-rank q-th percentile (0.0 if empty)."""
+        if not self.count:
+            return 0.0
+        rank = max(1, -(-q * self.count // 100))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(self.GROWTH ** index, self.max)
+        return self.max
+
+    def __len__(self):
+        return self.count
+
+
+class HeadlessSimulation:
+    """Plays complete bot-only games without prompts or console output."""
+
+    def __init__(self, lineup=None, base_seed=0, max_rounds=100, max_turns_per_round=500,
+                 journal_dir=None, turn_budget=None):
+        """Initialize the simulation.
+
+        Args:
+            lineup: List of (player_class, name) pairs, one per seat.
+                Defaults to four BotPlayers.
+            base_seed: Seed from which every game's random stream is derived.
+            max_rounds (int): Rounds after which an unfinished game is abandoned.
+            max_turns_per_round (int): Turns after which a round is scored
+                even if nobody has gone out.
+            journal_dir (str, optional): If given, every game streams its
+                action journal to game_<index>.p10j in this directory.
+            turn_budget (float, optional): Seconds each bot turn may take,
+                passed to play_turn as its time_budget.
+        """
+        self.lineup = list(lineup or DEFAULT_LINEUP)
+        self.base_seed = base_seed
+        self.max_rounds = max_rounds
+        self.max_turns_per_round = max_turns_per_round
+        self.journal_dir = journal_dir
+        self.turn_budget = turn_budget
+        # Player class name -> LatencyHistogram of its play_turn calls,
+        # for the games of the latest play_games (or run) call
+        self.turn_times = {}
+
+    def create_game(self, game_index=0):
+        """Create a fresh game with one player per lineup seat."""
+        players = [player_class(name) for player_class, name in self.lineup]
+        return Game(players, rng=game_rng(self.base_seed, game_index))
+
+    def play_game(self, game_index=0):
+        """Play a single game to completion and return its result."""
+        game = self.create_game(game_index)
+        if self.journal_dir is None:
+            return self._play_rounds(game, game_index)
+        path = os.path.join(self.journal_dir, f"game_{game_index}.p10j")
+        with open(path, 'wb') as stream:
+            journal = JournalWriter(game, stream, seed=f"{self.base_seed}:{game_index}")
+            try:
+                return self._play_rounds(game, game_index)
+            finally:
+                journal.close()
+
+    def _play_rounds(self, game, game_index):
+        """Play rounds until the game is over or abandoned and return its result."""
+        turns = 0
+        rounds = 0
+        while rounds < self.max_rounds:
+            game.start_new_round()
+            rounds += 1
+            turns += self._play_round(game)
+            game.calculate_round_scores()
+            if game.is_game_over():
+                break
+            game.reset_for_next_round()
+        return self._build_result(game, game_index, rounds, turns)
+
+    def _play_round(self, game):
+        """Play turns until the round is over and return the number of turns."""
+        turns = 0
+        clock = time.perf_counter
+        while not game.is_round_over() and turns < self.max_turns_per_round:
+            player = game.get_current_player()
+            start = clock()
+            if self.turn_budget is None:
+                player.play_turn(game)
+            else:
+                player.play_turn(game, time_budget=self.turn_budget)
+            elapsed = clock() - start
+            times = self.turn_times.get(type(player).__name__)
+            if times is None:
+                times = self.turn_times[type(player).__name__] = LatencyHistogram()
+            times.add(elapsed)
+            turns += 1
+            game.end_turn()
+        return turns
+
+    def _build_result(self, game, game_index, rounds, turns):
+        """Summarize a finished (or abandoned) game."""
+        completed = game.is_game_over()
+        # Highest phase wins; ties go to the lowest total score
+        ranking = sorted(game.players, key=lambda p: (-p.current_phase, p.total_score))
+        return {
+            'game': game_index,
+            'completed': completed,
+            'winner': ranking[0].name if completed else None,
+            'rounds': rounds,
+            'turns': turns,
+            'players': [
+                {
+                    'name': player.name,
+                    'bot': type(player).__name__,
+                    'phase': player.current_phase,
+                    'total_score': player.total_score,
+                }
+                for player in game.players
+            ],
+        }
+
+    def play_games(self, start, stop):
+        """Play the games with indices in [start, stop) and return their results.
+
+        Starts a new turn_times, covering only these games.
+        """
+        self.turn_times = {}
+        return [self.play_game(game_index) for game_index in range(start, stop)]
+
+    def run(self, num_games):
+        """Play several games and report per-game results and throughput.
+
+        Args:
+            num_games (int): Number of complete games to play.
+
+        Returns:
+            dict: Per-game results, games/sec and turns/sec, and per player
+                  class win rates and decision speed (see bot_stats).
+        """
+        start = time.perf_counter()
+        results = self.play_games(0, num_games)
+        elapsed = time.perf_counter() - start
+        return summarize(results, elapsed, self.turn_times)
+
+
+def bot_stats(results, turn_times):
+    """Compare player classes by strength and by the time their turns take.
+
+    Args:
+        results: Per-game results as built by HeadlessSimulation.
+        turn_times: Player class name -> LatencyHistogram of its play_turn calls.
+
+    Returns:
+        dict: Per class: seats played, wins, win rate per seat, turns, the
+              time spent deciding, decisions (turns) per second and the
+              p50/p95/p99 turn latency in seconds.
+    """
+    stats = {}
+    for result in results:
+        for player in result['players']:
+            entry = stats.setdefault(player['bot'], {'seats': 0, 'wins': 0})
+            entry['seats'] += 1
+            if player['name'] == result['winner']:
+                entry['wins'] += 1
+    for name, entry in stats.items():
+        latencies = turn_times.get(name) or LatencyHistogram()
+        seconds = latencies.total
+        entry['win_rate'] = entry['wins'] / entry['seats']
+        entry['turns'] = latencies.count
+        entry['decision_time'] = seconds
+        entry['decisions_per_sec'] = latencies.count / seconds if seconds > 0 else 0.0
+        for q in (50, 95, 99):
+            entry[f'latency_p{q}'] = latencies.percentile(q)
+    return stats
+
+
+def percentile(sorted_values, q):
+    """Return the nearest-rank q-th percentile of sorted values (0.0 if empty)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-q * len(sorted_values) // 100))
+    return sorted_values[rank - 1]
+
+
+def summarize(results, elapsed, turn_times=None):
+    """Build a run summary from per-game results and the wall time they took.
+
+    Args:
+        results: Per-game results as built by HeadlessSimulation.
+        elapsed (float): Wall time of the run in seconds.
+        turn_times (dict, optional): Per player class LatencyHistograms, as
+            collected in HeadlessSimulation.turn_times.
+    """
+    total_turns = sum(result['turns'] for result in results)
+    wins = {}
+    for result in results:
+        if result['winner'] is not None:
+            wins[result['winner']] = wins.get(result['winner'], 0) + 1
+    return {
+        'games': len(results),
+        'completed_games': sum(1 for result in results if result['completed']),
+        'turns': total_turns,
+        'wins': wins,
+        'elapsed': elapsed,
+        'games_per_sec': len(results) / elapsed if elapsed > 0 else 0.0,
+        'turns_per_sec': total_turns / elapsed if elapsed > 0 else 0.0,
+        'bots': bot_stats(results, turn_times or {}),
+        'results': results,
+    }
@@ -4,6 +4,7 @@ Single Player Mode for Phase 10 Card Game
 Human player vs 3 bot players
 """
 
+from events.events import INFO, ConsoleSink
 from game.game import Game
 from player.player import Player
 from bot.bot import BotPlayer
@@ -34,7 +35,7 @@ class SinglePlayerGame:
         players = [self.human_player, bot1, bot2, bot3]
         
         # Create and start game
-        self.game = Game(players)
+        self.game = Game(players, events=ConsoleSink())
         
         print(f"\nStarting game with {len(players)} players:")
         for i, player in enumerate(players, 1):
@@ -72,9 +73,8 @@ class SinglePlayerGame:
         while not self.game.is_round_over():
             current_player = self.game.get_current_player()
             
-            print(f"\n{'-'*40}")
-            print(f"{current_player.name}'s turn")
-            print(f"{'-'*40}")
+            self.game.events.emit(INFO, 'turn_started', "\n{rule}\n{player}'s turn\n{rule}",
+                                  player=current_player.name, rule='-' * 40)
             
             if current_player == self.human_player:
                 self.play_human_turn()
@@ -180,7 +180,7 @@ class SinglePlayerGame:
         selected_groups = self.select_groups_for_phase(all_groups, player.current_phase)
         
         if selected_groups:
-            success = player.lay_down(selected_groups)
+            success = self.game.lay_down_phase(player, selected_groups)
             if success:
                 return True
             else:
@@ -190,23 +190,11 @@ class SinglePlayerGame:
     
     def select_groups_for_phase(self, all_groups, phase):
         """Let player select card groups for their phase."""
-        phase_requirements = {
-            1: 2,  # 2 sets of 3
-            2: 2,  # 1 set of 3 + 1 run of 4
-            3: 2,  # 1 set of 4 + 1 run of 4
-            4: 1,  # 1 run of 7
-            5: 1,  # 1 run of 8
-            6: 1,  # 1 run of 9
-            7: 2,  # 2 sets of 4
-            8: 1,  # 7 cards of one color
-            9: 2,  # 1 set of 5 + 1 set of 2
-            10: 2  # 1 set of 5 + 1 set of 3
-        }
-        
-        required_groups = phase_requirements.get(phase, 1)
+        plan = self.game.rules.plan(phase)
+        required_groups = len(plan) if plan is not None else 1
         selected = []
         
-        print(f"\nSelect {required_groups} group(s) for Phase {phase}:")
+        print(f"\nSelect {required_groups} group(s) for Phase {phase} ({self.game.rules.describe(phase)}):")
         
         for _ in range(required_groups):
             if not all_groups:
@@ -321,17 +309,19 @@ class SinglePlayerGame:
     
     def play_bot_turn(self, bot_player):
         """Handle bot player's turn."""
-        print(f"{bot_player.name} is thinking...")
+        events = self.game.events
+        events.emit(INFO, 'bot_thinking', "{player} is thinking...", player=bot_player.name)
         
         # Bot plays automatically
         bot_player.play_turn(self.game)
         
         # Show what the bot did
-        print(f"{bot_player.name} completed their turn.")
-        print(f"Cards in hand: {len(bot_player.hand.cards)}")
+        events.emit(INFO, 'bot_turn_done', "{player} completed their turn.\nCards in hand: {hand_size}",
+                    player=bot_player.name, hand_size=len(bot_player.hand.cards))
         
         if bot_player.has_laid_down_phase:
-            print(f"✓ {bot_player.name} has laid down Phase {bot_player.current_phase}")
+            events.emit(INFO, 'bot_has_laid_down', "✓ {player} has laid down Phase {phase}",
+                        player=bot_player.name, phase=bot_player.current_phase)
     
     def show_game_state(self):
         """Show current game state."""
@@ -4,7 +4,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 import pytest
 from board.board import GameBoard
-from card.card import Card
+from card.card import Card, DECK_SIZE
 from deck.deck import Deck
 from game.game import Game
 from hand.hand import Hand
@@ -19,35 +19,51 @@ class TestCard:
         assert card.card_type == 'number'
         assert card.color == 'red'
         assert card.number == 5
-        assert card.id == 0
+        assert card.id == DECK_SIZE, "Ad-hoc IDs must not collide with table cards"
 
 class TestHand:
     def test_sets(self):
         Card.reset_id_counter()
         hand = Hand()
+        a, b, c, d, e, f, g = range(DECK_SIZE, DECK_SIZE + 7)
         
         # Test basic set of 3
-        hand.add(Card('number', 'red', 5))       # ID: 0
-        hand.add(Card('number', 'blue', 5))      # ID: 1
-        hand.add(Card('number', 'green', 5))     # ID: 2
+        hand.add(Card('number', 'red', 5))       # ID: a
+        hand.add(Card('number', 'blue', 5))      # ID: b
+        hand.add(Card('number', 'green', 5))     # ID: c
         sets = hand.find_sets(size=3)
-        assert sets == [[0, 1, 2]], "Basic set of 3 test failed"
+        assert sets == [[a, b, c]], "Basic set of 3 test failed"
         
         # Test set of 4 generating all possible sets of 3
-        hand.add(Card('number', 'yellow', 5))    # ID: 3
+        hand.add(Card('number', 'yellow', 5))    # ID: d
         sets = hand.find_sets(size=3)
-        expected = [[0, 1, 2], [0, 1, 3], [0, 2, 3], [1, 2, 3]]
+        expected = [[a, b, c], [a, b, d], [a, c, d], [b, c, d]]
         assert len(sets) == 4, "Set of 4 should generate 4 possible sets of 3"
         assert all(s in expected for s in sets), "All possible combinations should be present"
         
         # Test multiple sets of different numbers
-        hand.add(Card('number', 'red', 7))       # ID: 4
-        hand.add(Card('number', 'blue', 7))      # ID: 5
-        hand.add(Card('number', 'green', 7))     # ID: 6
+        hand.add(Card('number', 'red', 7))       # ID: e
+        hand.add(Card('number', 'blue', 7))      # ID: f
+        hand.add(Card('number', 'green', 7))     # ID: g
         sets = hand.find_sets(size=3)
         assert len(sets) == 5, "Should find sets from both 5s and 7s"
-        assert [4, 5, 6] in sets, "Should find the set of 7s"
+        assert [e, f, g] in sets, "Should find the set of 7s"
     
+    def test_lazy_sets(self):
+        Card.reset_id_counter()
+        first = DECK_SIZE
+        hand = Hand()
+        for color in ('red', 'blue', 'green', 'yellow', 'red'):
+            hand.add(Card('number', color, 8))   # IDs first to first + 4
+        for color in ('red', 'blue'):
+            hand.add(Card('number', color, 2))   # IDs first + 5, first + 6
+        assert hand.count_sets(size=2) == 10 + 1
+        assert hand.count_sets(size=2, one_per_number=True) == 2
+        assert list(hand.iter_sets(size=2, limit=3)) == hand.find_sets(size=2)[:3]
+        assert list(hand.iter_sets(size=2, one_per_number=True)) == [[first + 5, first + 6], [first, first + 1]]
+        assert hand.count_sets(size=6) == 0
+        assert list(hand.iter_sets(size=6)) == []
+
     def test_runs(self):
         Card.reset_id_counter()
         hand = Hand()
@@ -58,7 +74,34 @@ class TestHand:
         hand.add(Card('number', 'green', 5))
         hand.add(Card('number', 'yellow', 6))
         runs = hand.find_runs(size=4)
-        assert runs == [[0, 1, 2, 3]], "Basic run test failed"
+        assert runs == [[DECK_SIZE + i for i in range(4)]], "Basic run test failed"
+
+    def test_runs_with_duplicate_numbers(self):
+        Card.reset_id_counter()
+        hand = Hand()
+        for color, number in [('red', 3), ('blue', 3), ('red', 4), ('green', 5), ('blue', 6)]:
+            hand.add(Card('number', color, number))
+        assert hand.find_runs(size=4) == [[DECK_SIZE + i for i in (0, 2, 3, 4)]], "Duplicates must not break a run"
+
+    def test_histogram_tracks_changes(self):
+        Card.reset_id_counter()
+        hand = Hand()
+        red_five = Card('number', 'red', 5)
+        hand.add(red_five)
+        hand.add(Card('number', 'blue', 5))
+        hand.add(Card('wild'))
+        hand.add(Card('skip'))
+        assert hand.count_number(5) == 2
+        assert hand.count('red', 5) == 1
+        assert hand.count_color('blue') == 1
+        assert (hand.wild_count, hand.skip_count) == (1, 1)
+
+        hand.remove(red_five)
+        hand.play(len(hand) - 1)  # the skip
+        assert hand.count_number(5) == 1
+        assert hand.count('red', 5) == 0
+        assert hand.count_color('red') == 0
+        assert hand.skip_count == 0
 
 class TestGame:
     def test_game_initialization(self):
@@ -74,4 +117,1066 @@ class TestPhaseValidator:
             Card('number', 'blue', 5),
             Card('wild', None, None)
         ]
-        assert PhaseValidator._validate_set(set_with_wild), "Should accept set with wild card"
\ No newline at end of file
+        assert PhaseValidator._validate_set(set_with_wild), "Should accept set with wild card"
+
+    def test_all_wild_set_is_rejected(self):
+        from phase_validator.rules import STANDARD_RULES
+        wilds = [Card('wild') for _ in range(3)]
+        threes = [Card('number', color, 3) for color in ('red', 'blue', 'green')]
+        assert not PhaseValidator._validate_set(wilds), "A set needs a natural card"
+        assert not STANDARD_RULES.plans[1].checks[0](wilds)
+        assert not PhaseValidator.validate_phase(1, [threes, wilds])
+
+    def test_run_validation(self):
+        def cards(*numbers):
+            return [Card('wild') if n is None else Card('number', 'red', n) for n in numbers]
+        assert PhaseValidator._validate_run(cards(3, None, 5, 6))
+        assert not PhaseValidator._validate_run(cards(3, 3, 4, 5)), "Duplicates cannot form a run"
+        assert not PhaseValidator._validate_run(cards(3, 4, 5) + [Card('skip')])
+
+    def test_color_validation_with_wild(self):
+        group = [Card('number', 'green', n) for n in range(1, 7)] + [Card('wild')]
+        assert PhaseValidator._validate_color_set(group)
+
+class TestHeadlessSimulation:
+    def test_runs_games_silently(self, capsys):
+        from simulation.simulation import HeadlessSimulation
+        simulation = HeadlessSimulation(max_rounds=2, max_turns_per_round=40)
+        summary = simulation.run(2)
+        assert capsys.readouterr().out == "", "Headless games must not print"
+        assert summary['games'] == 2
+        assert len(summary['results']) == 2
+        assert summary['turns'] == sum(r['turns'] for r in summary['results'])
+        assert summary['turns_per_sec'] > 0
+        assert all(len(r['players']) == 4 for r in summary['results'])
+
+    def test_seeded_games_are_reproducible(self):
+        from simulation.simulation import HeadlessSimulation
+        first = HeadlessSimulation(base_seed=7, max_rounds=2, max_turns_per_round=40).run(2)
+        second = HeadlessSimulation(base_seed=7, max_rounds=2, max_turns_per_round=40).run(2)
+        assert first['results'] == second['results']
+
+    def test_journal_file_closed_when_game_fails(self, tmp_path, monkeypatch):
+        from journal.journal import JournalWriter
+        from simulation.simulation import HeadlessSimulation
+
+        class FailingSimulation(HeadlessSimulation):
+            def _play_round(self, game):
+                raise RuntimeError("bot crashed")
+
+        streams = []
+
+        class RecordingWriter(JournalWriter):
+            def __init__(self, game, stream, **kwargs):
+                streams.append(stream)
+                super().__init__(game, stream, **kwargs)
+
+        monkeypatch.setattr('simulation.simulation.JournalWriter', RecordingWriter)
+        with pytest.raises(RuntimeError):
+            FailingSimulation(journal_dir=str(tmp_path)).play_game(0)
+        assert len(streams) == 1 and streams[0].closed
+
+
+class TestParallelSimulation:
+    def test_shard_ranges_cover_all_games(self):
+        from simulation.parallel import shard_ranges
+        assert shard_ranges(10, 3) == [(0, 4), (4, 7), (7, 10)]
+        assert shard_ranges(2, 8) == [(0, 1), (1, 2)]
+
+    def test_results_independent_of_worker_count(self):
+        from simulation.parallel import ParallelSimulation
+        settings = dict(base_seed=3, max_rounds=2, max_turns_per_round=30)
+        single = ParallelSimulation(workers=1, **settings).run(4)
+        pooled = ParallelSimulation(workers=2, **settings).run(4)
+        assert single['results'] == pooled['results']
+        assert single['wins'] == pooled['wins']
+        assert pooled['workers'] == 2
+
+
+class TestCardTable:
+    def test_table_layout(self):
+        from card.card import CARD_TABLE, card_from_index, card_index
+        assert len(CARD_TABLE) == 108
+        assert all(card.id == index for index, card in enumerate(CARD_TABLE))
+        assert sum(1 for c in CARD_TABLE if c.card_type == 'wild') == 8
+        assert sum(1 for c in CARD_TABLE if c.card_type == 'skip') == 4
+        red_five = card_from_index(card_index('red', 5, copy=1))
+        assert (red_five.color, red_five.number) == ('red', 5)
+
+    def test_cards_are_immutable_flyweights(self):
+        import pickle
+        from card.card import CARD_TABLE
+        card = CARD_TABLE[10]
+        with pytest.raises(AttributeError):
+            card.number = 3
+        assert pickle.loads(pickle.dumps(card)) is card
+
+    def test_decks_share_table_cards(self):
+        from card.card import CARD_TABLE
+        Card.reset_id_counter()
+        deck = Deck()
+        assert Card._id_counter == DECK_SIZE, "Building a deck must not allocate cards"
+        assert sorted(card.id for card in deck.cards) == list(range(108))
+        assert all(CARD_TABLE[card.id] is card for card in deck.cards)
+
+
+def _hand_of(*specs):
+    """Build a hand from (color, number) pairs and 'wild'/'skip' strings."""
+    hand = Hand()
+    for spec in specs:
+        if isinstance(spec, str):
+            hand.add(Card(spec))
+        else:
+            hand.add(Card('number', spec[0], spec[1]))
+    return hand
+
+
+class TestPhaseSolver:
+    def test_sets_with_wilds(self):
+        from phase_solver.phase_solver import PhaseSolver
+        hand = _hand_of(('red', 5), ('blue', 5), ('green', 7), ('red', 7), 'wild', 'wild', ('red', 1))
+        solution = PhaseSolver.solve(hand, PhaseValidator.PHASE_REQUIREMENTS[1])
+        assert solution is not None
+        assert PhaseValidator.validate_phase(1, solution.groups)
+        assert solution.wilds_used == 2
+        assert solution.penalty == 5  # only the red 1 is left
+
+    def test_run_with_duplicates_and_gap(self):
+        from phase_solver.phase_solver import PhaseSolver
+        hand = _hand_of(('red', 3), ('blue', 3), ('red', 4), ('green', 6), ('blue', 7),
+                        ('red', 8), ('yellow', 9), 'wild')
+        solution = PhaseSolver.solve(hand, PhaseValidator.PHASE_REQUIREMENTS[4])
+        assert solution is not None
+        assert PhaseValidator.validate_phase(4, solution.groups)
+        assert not PhaseSolver.can_complete(hand, PhaseValidator.PHASE_REQUIREMENTS[5])
+
+    def test_color_phase_with_wild(self):
+        from phase_solver.phase_solver import PhaseSolver
+        hand = _hand_of(*[('blue', n) for n in (1, 2, 4, 4, 9, 11)], 'wild', ('red', 2))
+        solution = PhaseSolver.solve(hand, PhaseValidator.PHASE_REQUIREMENTS[8])
+        assert solution is not None
+        assert PhaseValidator.validate_phase(8, solution.groups)
+
+    def test_groups_never_share_cards(self):
+        from phase_solver.phase_solver import PhaseSolver
+        hand = _hand_of(('red', 5), ('blue', 5), ('green', 5), ('red', 6), ('red', 7), ('red', 8))
+        assert not PhaseSolver.can_complete(hand, PhaseValidator.PHASE_REQUIREMENTS[2])
+        hand.add(Card('number', 'yellow', 5))
+        solution = PhaseSolver.solve(hand, PhaseValidator.PHASE_REQUIREMENTS[2])
+        assert PhaseValidator.validate_phase(2, solution.groups)
+
+
+class TestPhaseCache:
+    def test_equivalent_hands_share_an_entry(self):
+        from phase_solver.phase_cache import PhaseCache
+        cache = PhaseCache(maxsize=8)
+        fives = _hand_of(('red', 5), ('blue', 5), ('green', 5), ('red', 9), ('blue', 9), 'wild')
+        twos = _hand_of(('red', 2), ('red', 2), ('yellow', 2), ('green', 11), ('blue', 11), 'wild')
+        assert cache.can_complete(fives, 1)
+        assert cache.can_complete(twos, 1)
+        assert cache.info()['hits'] == 1 and cache.info()['misses'] == 1
+
+    def test_lru_eviction(self):
+        from phase_solver.phase_cache import PhaseCache
+        cache = PhaseCache(maxsize=2)
+        hand = _hand_of(('red', 1), ('red', 2), ('red', 3), ('red', 4))
+        for phase in (4, 8, 2):
+            assert not cache.can_complete(hand, phase)
+        assert len(cache) == 2
+        assert cache.info()['evictions'] == 1
+        cache.can_complete(hand, 8)  # still cached
+        assert cache.info()['hits'] == 1
+
+
+class TestHitIndex:
+    def test_index_tracks_lay_downs_and_hits(self):
+        Card.reset_id_counter()
+        alice, bob = Player("Alice"), Player("Bob")
+        game = Game([alice, bob])
+        for number in (3, 4, 5, 6):
+            alice.hand.add(Card('number', 'red', number))
+        for color in ('red', 'blue', 'green'):
+            alice.hand.add(Card('number', color, 9))
+        alice.hand.add(Card('number', 'yellow', 1))
+        alice.current_phase = 2
+        run = [c for c in alice.hand.cards if c.number in (3, 4, 5, 6)]
+        nines = [c for c in alice.hand.cards if c.number == 9]
+        assert game.lay_down_phase(alice, [nines, run])
+
+        seven = Card('number', 'blue', 7)
+        nine = Card('number', 'yellow', 9)
+        bob.hand.add(seven)
+        bob.hand.add(nine)
+        bob.hand.add(Card('number', 'blue', 12))
+        hits = {(card.id, set_index) for card, target, set_index in game.find_hits(bob)}
+        assert hits == {(seven.id, 1), (nine.id, 0)}
+        assert game.find_hits(alice) == [], "Players do not hit on their own sets here"
+
+        assert game.hit_on_player_set(bob, alice, 1, seven)
+        assert game.hit_index.by_number[8] == {(0, 1)}, "Run end moves up after a hit"
+        assert (0, 1) not in game.hit_index.by_number.get(7, set())
+
+
+class TestLaidDownSet:
+    def test_run_hits_with_wild_slack(self):
+        from laiddownset.laiddownset import LaidDownSet
+        run = LaidDownSet([Card('number', 'red', n) for n in (4, 5, 7)] + [Card('wild')], 'run')
+        assert run.can_add_card(Card('number', 'blue', 3))
+        assert run.can_add_card(Card('number', 'blue', 8))
+        assert not run.can_add_card(Card('number', 'blue', 5)), "Duplicate number"
+        assert not run.can_add_card(Card('number', 'blue', 9))
+        assert not run.can_add_card(Card('skip'))
+        run.add_card(Card('number', 'green', 8))
+        assert (run.low, run.high) == (4, 8)
+        assert run.accepted_numbers() == {3, 6, 9}, "The wild can slide out of the gap at 6"
+        with pytest.raises(ValueError):
+            run.add_card(Card('number', 'green', 1))
+
+    def test_set_and_color_hits(self):
+        from laiddownset.laiddownset import LaidDownSet
+        fives = LaidDownSet([Card('number', c, 5) for c in ('red', 'blue', 'green')], 'set')
+        assert fives.can_add_card(Card('number', 'yellow', 5))
+        assert not fives.can_add_card(Card('number', 'yellow', 6))
+        greens = LaidDownSet([Card('number', 'green', n) for n in range(1, 8)], 'color')
+        assert greens.can_add_card(Card('number', 'green', 12))
+        assert not greens.can_add_card(Card('number', 'red', 12))
+        assert greens.can_add_card(Card('wild'))
+
+
+class TestHitManager:
+    def test_try_hit_goes_through_game(self):
+        from laiddownset.laiddownset import LaidDownSet
+        source, target = Player("Source"), Player("Target")
+        game = Game([source, target])
+        laid = LaidDownSet([Card('number', c, 9) for c in ('red', 'blue', 'green')], 'set')
+        target.laid_down_sets = [laid]
+        target.has_laid_down_phase = True
+        game.rebuild_hit_index()
+        nine, ten = Card('number', 'yellow', 9), Card('number', 'yellow', 10)
+        source.hand.add(nine)
+        source.hand.add(ten)
+        clone = game.clone()
+        assert not HitManager.try_hit(source, target, 0, ten, game=game)
+        assert HitManager.try_hit(source, target, 0, nine, game=game)
+        assert len(target.laid_down_sets[0]) == 4
+        assert source.hand.count_number(9) == 0
+        # The set was shared with the clone, so it was copied before the hit
+        assert len(clone.players[1].laid_down_sets[0]) == 3
+
+    def test_try_hit_without_game_is_deprecated(self):
+        from laiddownset.laiddownset import LaidDownSet
+        source, target = Player("Source"), Player("Target")
+        laid = LaidDownSet([Card('number', c, 9) for c in ('red', 'blue', 'green')], 'set')
+        target.laid_down_sets = [laid]
+        target.has_laid_down_phase = True
+        nine = Card('number', 'yellow', 9)
+        source.hand.add(nine)
+        with pytest.warns(DeprecationWarning):
+            assert HitManager.try_hit(source, target, 0, nine)
+        assert len(laid) == 4 and source.hand.count_number(9) == 0
+
+
+class TestEvents:
+    def test_game_is_silent_by_default(self, capsys):
+        game = Game([Player("A"), Player("B")])
+        game.start_new_round()
+        assert capsys.readouterr().out == ""
+
+    def test_buffered_sink_records_structured_events(self):
+        from events.events import BufferedSink, INFO
+        sink = BufferedSink(level=INFO)
+        players = [Player("A"), Player("B")]
+        game = Game(players, events=sink)
+        game.start_new_round()
+        game.draw_from_deck(players[0])  # DEBUG event, below the sink's level
+        assert sink.records() == [{'level': INFO, 'kind': 'round_started', 'round': 1}]
+        assert sink.messages() == ["\nStarting Round 1"]
+
+    def test_console_sink_filters_by_level(self, capsys):
+        from events.events import ConsoleSink, DEBUG, INFO
+        sink = ConsoleSink(level=INFO)
+        sink.emit(DEBUG, 'noise', "hidden {value}", value=1)
+        sink.emit(INFO, 'note', "shown {value}", value=2)
+        assert capsys.readouterr().out == "shown 2\n"
+        assert not sink.enabled(DEBUG)
+
+
+class TestJournal:
+    def _record(self, checkpoint_interval):
+        import io
+        from journal.journal import JournalWriter, encode_state
+        from simulation.simulation import HeadlessSimulation
+        game = HeadlessSimulation(base_seed=5).create_game(0)
+        stream = io.BytesIO()
+        JournalWriter(game, stream, seed="5:0", checkpoint_interval=checkpoint_interval)
+        states = {}
+        for _ in range(2):
+            game.start_new_round()
+            while not game.is_round_over() and game.turn_number < 200:
+                game.get_current_player().play_turn(game)
+                game.end_turn()
+                states[game.turn_number] = encode_state(game)
+            game.calculate_round_scores()
+            game.reset_for_next_round()
+        return stream.getvalue(), states
+
+    def test_replay_matches_recorded_states(self):
+        from journal.journal import JournalReplay, encode_state
+        data, states = self._record(checkpoint_interval=10)
+        replay = JournalReplay(data)
+        assert replay.seed == "5:0"
+        assert replay.player_names == ["Bot 1", "Bot 2", "Bot 3", "Bot 4"]
+        assert replay.turns == max(states)
+        assert replay.checkpoints, "Checkpoints should be written every 10 turns"
+        for turn in (1, 10, 17, replay.turns):
+            assert encode_state(replay.game_at(turn)) == states[turn]
+
+    def test_checkpoints_do_not_change_replay(self):
+        from journal.journal import JournalReplay, encode_state
+        with_checkpoints, _ = self._record(checkpoint_interval=4)
+        without_checkpoints, _ = self._record(checkpoint_interval=0)
+        assert len(without_checkpoints) < len(with_checkpoints)
+        fast, slow = JournalReplay(with_checkpoints), JournalReplay(without_checkpoints)
+        turn = slow.turns - 1
+        assert encode_state(fast.game_at(turn)) == encode_state(slow.game_at(turn))
+
+    def test_replay_keeps_custom_rules(self):
+        import io
+        import random
+        from bot.bot import BotPlayer
+        from bot.parallel_mcts import _search_shard
+        from journal.journal import JournalReplay, JournalWriter, encode_state
+        from phase_validator.rules import register_rule_set
+        rules = register_rule_set('pairs', {1: [('set', 2), ('set', 2)], 2: [('run', 3)]}, replace=True)
+        game = Game([BotPlayer("A"), BotPlayer("B"), BotPlayer("C")], rng=random.Random(2), rules=rules)
+        stream = io.BytesIO()
+        JournalWriter(game, stream, checkpoint_interval=5)
+        game.start_new_round()
+        while not game.is_round_over():
+            game.get_current_player().play_turn(game)
+            game.end_turn()
+        assert any(player.has_laid_down_phase for player in game.players)
+        replay = JournalReplay(stream.getvalue())
+        assert replay.rules is rules
+        assert encode_state(replay.game_at(replay.turns)) == encode_state(game)
+        # Workers rebuild a rule set they have not registered from its phases
+        stats = _search_shard(encode_state(game), 0, 3, 'draw', 4, 4, 0.7, 1,
+                              rule_set=('unregistered', rules.phases))
+        assert sum(visits for visits, _ in stats.values()) == 4
+
+
+class TestGameClone:
+    def _game_with_phases(self):
+        from simulation.simulation import HeadlessSimulation
+        game = HeadlessSimulation(base_seed=3).create_game(0)
+        game.start_new_round()
+        while not all(player.has_laid_down_phase for player in game.players[:2]):
+            game.get_current_player().play_turn(game)
+            game.end_turn()
+        return game
+
+    def test_clone_is_independent(self):
+        from journal.journal import encode_state
+        game = self._game_with_phases()
+        before = encode_state(game)
+        clone = game.clone()
+        assert encode_state(clone) == before
+        for _ in range(8):
+            clone.get_current_player().play_turn(clone)
+            clone.end_turn()
+        assert encode_state(game) == before
+        assert clone.journal is None
+
+    def test_clone_replays_same_shuffles(self):
+        from journal.journal import encode_state
+        game = self._game_with_phases()
+        clone = game.clone()
+        for copy in (game, clone):
+            copy.deck.cards.clear()
+            copy.draw_from_deck(copy.get_current_player())
+        assert encode_state(game) == encode_state(clone)
+
+    def test_laid_sets_are_copied_on_write(self):
+        game = self._game_with_phases()
+        clone = game.clone()
+        target = next(player for player in clone.players if player.laid_down_sets)
+        original_set = target.laid_down_sets[0]
+        original_cards = list(original_set.cards)
+        original_index = game.hit_index
+        assert game.players[clone.players.index(target)].laid_down_sets[0] is original_set
+        assert clone.hit_index is original_index
+
+        from card.card import CARD_TABLE
+        card = next(card for card in CARD_TABLE if original_set.can_add_card(card))
+        hitter = next(player for player in clone.players if player is not target)
+        hitter.hand.add(card)
+        assert clone.hit_on_player_set(hitter, target, 0, card)
+
+        assert target.laid_down_sets[0] is not original_set
+        assert original_set.cards == original_cards
+        assert clone.hit_index is not original_index
+        assert game.hit_index is original_index
+
+
+class TestISMCTSBot:
+    def _game(self):
+        from bot.bot import BotPlayer
+        from bot.ismcts_bot import ISMCTSBot
+        from simulation.simulation import HeadlessSimulation
+        lineup = [(ISMCTSBot, "Search"), (BotPlayer, "Bot 2"), (BotPlayer, "Bot 3")]
+        game = HeadlessSimulation(lineup=lineup, base_seed=2).create_game(0)
+        game.start_new_round()
+        return game
+
+    def test_determinization_keeps_visible_cards(self):
+        import random
+        from bot.ismcts_bot import determinize
+        game = self._game()
+        searcher = game.players[0]
+        world = determinize(game, searcher, random.Random(1))
+        assert world.players[0].hand.cards == searcher.hand.cards
+        assert world.deck.discard_pile == game.deck.discard_pile
+        assert [len(p.hand.cards) for p in world.players] == [len(p.hand.cards) for p in game.players]
+        hidden = lambda g: sorted(c.id for p in g.players[1:] for c in p.hand.cards) + sorted(c.id for c in g.deck.cards)
+        assert sorted(hidden(world)) == sorted(hidden(game))
+        assert world.players[1].hand.count_number(1) == sum(
+            1 for c in world.players[1].hand.cards if c.number == 1)
+
+    def test_search_plays_legal_turns(self):
+        game = self._game()
+        searcher = game.players[0]
+        searcher.iterations = 8
+        before = len(searcher.hand.cards)
+        searcher.play_turn(game)
+        assert searcher.decisions >= 1
+        assert len(searcher.hand.cards) <= before
+        assert len(game.deck.cards) + len(game.deck.discard_pile) + sum(
+            len(p.hand.cards) + sum(len(s.cards) for s in p.laid_down_sets) for p in game.players) == 108
+
+    def test_harness_reports_bot_stats(self):
+        from bot.bot import BotPlayer
+        from bot.ismcts_bot import ISMCTSBot
+        from simulation.simulation import HeadlessSimulation
+        lineup = [(ISMCTSBot, "Search"), (BotPlayer, "Bot")]
+        summary = HeadlessSimulation(lineup=lineup, max_rounds=1, max_turns_per_round=6).run(1)
+        assert set(summary['bots']) == {'ISMCTSBot', 'BotPlayer'}
+        for stats in summary['bots'].values():
+            assert stats['seats'] == 1
+            assert stats['turns'] == 3
+            assert 0.0 <= stats['win_rate'] <= 1.0
+            assert stats['decisions_per_sec'] > 0
+
+
+class TestRootParallelMCTS:
+    def test_merge_root_stats(self):
+        from bot.parallel_mcts import merge_root_stats
+        merged = merge_root_stats([{('draw', 'deck'): [3, 1.5]},
+                                   {('draw', 'deck'): [1, 0.5], ('draw', 'pile'): [4, 3.0]}])
+        assert merged == {('draw', 'deck'): [4, 2.0], ('draw', 'pile'): [4, 3.0]}
+
+    def test_workers_search_from_encoded_state(self):
+        from bot.bot import BotPlayer
+        from bot.ismcts_bot import legal_actions
+        from bot.parallel_mcts import RootParallelISMCTSBot, shutdown_pools
+        from simulation.simulation import HeadlessSimulation
+        lineup = [(RootParallelISMCTSBot, "Search"), (BotPlayer, "Bot")]
+        game = HeadlessSimulation(lineup=lineup, base_seed=4).create_game(0)
+        game.start_new_round()
+        searcher = game.players[0]
+        searcher.workers, searcher.iterations = 2, 8
+        try:
+            action = searcher.search(game, 'draw')
+        finally:
+            shutdown_pools()
+        assert action in legal_actions(game, searcher, 'draw')
+        assert searcher.iterations_run == 8
+
+
+class TestTimeBudgets:
+    @staticmethod
+    def _ticking_clock():
+        """A fake clock that advances one second per reading."""
+        ticks = iter(range(10 ** 6))
+        return lambda: float(next(ticks))
+
+    def _game(self, searcher_class):
+        from bot.bot import BotPlayer
+        from simulation.simulation import HeadlessSimulation
+        lineup = [(searcher_class, "Timed"), (BotPlayer, "Bot")]
+        game = HeadlessSimulation(lineup=lineup, base_seed=6).create_game(0)
+        game.start_new_round()
+        return game
+
+    def test_bot_discards_even_without_time(self):
+        from bot.bot import BotPlayer
+        game = self._game(BotPlayer)
+        bot = game.players[0]
+        bot.play_turn(game, time_budget=0.0, clock=self._ticking_clock())
+        assert len(bot.hand.cards) == 10
+        assert bot.last_decision_stats['timed_out']
+        assert bot.last_decision_stats['candidates'] >= 1
+
+    def test_late_draw_skips_the_discard_pile(self):
+        from bot.bot import BotPlayer
+        game = self._game(BotPlayer)
+        bot = game.players[0]
+        wild = next(card for card in game.deck.cards if card.card_type == 'wild')
+        game.deck.cards.remove(wild)
+        game.deck.discard_pile.append(wild)
+        bot.play_turn(game, time_budget=0.0, clock=self._ticking_clock())
+        assert game.deck.discard_pile[-2] is wild, "Out of time, the bot draws from the deck"
+        bot.play_turn(game, time_budget=None)
+        assert bot.last_decision_stats['timed_out'] is False
+
+    def test_search_stops_at_deadline(self):
+        from bot.ismcts_bot import ISMCTSBot
+        game = self._game(ISMCTSBot)
+        searcher = game.players[0]
+        searcher.play_turn(game, time_budget=6.0, clock=self._ticking_clock())
+        stats = searcher.last_decision_stats
+        assert stats['timed_out']
+        assert 1 <= stats['candidates'] < searcher.iterations
+        assert len(searcher.hand.cards) == 10
+
+    def test_harness_reports_latency_percentiles(self):
+        from simulation.simulation import HeadlessSimulation, percentile
+        assert percentile([1, 2, 3, 4], 50) == 2
+        assert percentile([1, 2, 3, 4], 99) == 4
+        assert percentile([], 95) == 0.0
+        simulation = HeadlessSimulation(max_rounds=1, max_turns_per_round=20, turn_budget=0.05)
+        summary = simulation.run(1)
+        stats = summary['bots']['BotPlayer']
+        assert 0 < stats['latency_p50'] <= stats['latency_p95'] <= stats['latency_p99']
+        # Every run starts new histograms
+        assert simulation.run(1)['bots']['BotPlayer']['turns'] == stats['turns']
+
+    def test_latency_histogram_is_bounded_and_mergeable(self):
+        import random
+        from simulation.simulation import LatencyHistogram, percentile
+        rng = random.Random(5)
+        latencies = [rng.lognormvariate(-7, 1) for _ in range(20000)]
+        first, second = LatencyHistogram(), LatencyHistogram()
+        for index, seconds in enumerate(latencies):
+            (first if index % 2 else second).add(seconds)
+        first.merge(second)
+        latencies.sort()
+        assert len(first) == len(latencies) and first.max == latencies[-1]
+        assert len(first.buckets) < 2000
+        for q in (50, 95, 99, 100):
+            exact = percentile(latencies, q)
+            assert exact <= first.percentile(q) <= exact * LatencyHistogram.GROWTH
+        assert LatencyHistogram().percentile(50) == 0.0
+
+
+class TestUsefulnessScores:
+    def test_scores_follow_hand_changes(self):
+        from bot.usefulness import UsefulnessScores
+        hand = _hand_of(('red', 7), ('blue', 7), ('green', 8), ('red', 12), 'skip', 'wild')
+        scores = UsefulnessScores(hand)
+        red_seven, _, green_eight, red_twelve, skip, wild = hand.cards
+        assert scores.score(red_seven) == 10 + 5
+        assert scores.score(green_eight) == 5 * 2
+        assert scores.score(red_twelve) == 0
+        assert (scores.score(skip), scores.score(wild)) == (50, 100)
+        assert hand.cards[scores.worst_index()] is red_twelve
+        assert scores.last_candidates == 3, "The live top of the heap, the skip and the wild"
+
+        hand.remove(red_twelve)
+        hand.add(Card('number', 'yellow', 9))
+        assert scores.score(green_eight) == 5 * 3
+        hand.remove(skip)
+        worst = hand.cards[scores.worst_index()]
+        assert (worst.color, worst.number) == ('yellow', 9)
+        assert scores.last_candidates == 3, "A stale entry, the live top and the wild"
+
+    def test_bot_rescores_new_hands(self):
+        from bot.bot import BotPlayer
+        bot = BotPlayer("Bot")
+        bot.draw_card(Card('number', 'red', 3))
+        first = bot._usefulness()
+        bot.reset_for_new_round()
+        bot.draw_card(Card('number', 'red', 5))
+        assert bot._usefulness() is not first
+        assert bot._score_card_usefulness(bot.hand.cards[0]) == 5
+
+
+class TestMoveGenerator:
+    def _player(self, phase, *specs):
+        player = Player("P")
+        player.current_phase = phase
+        player.hand = _hand_of(*specs)
+        return player
+
+    def test_lay_downs_are_distinct_and_valid(self):
+        from move_generator import kind_card, lay_down_moves
+        player = self._player(1, ('red', 3), ('blue', 3), ('green', 3), ('red', 5), ('blue', 5),
+                              ('green', 5), ('yellow', 5), ('red', 9))
+        moves = lay_down_moves(player)
+        assert len(moves) == len(set(moves))
+        for _, groups in moves:
+            cards = [[kind_card(kind) for kind in group] for group in groups]
+            assert PhaseValidator.validate_phase(1, cards)
+        # Three 3s with any three of the four 5s; swapping the two sets is the same move
+        assert len(moves) == 4
+
+    def test_moves_by_stage(self):
+        from move_generator import DRAW_DECK, DRAW_PILE, DRAW_STAGE, PLAY_STAGE, generate_moves
+        game = Game([Player("A"), Player("B")])
+        game.start_new_round()
+        player = game.players[0]
+        assert list(generate_moves(game, player, DRAW_STAGE)) == [DRAW_DECK, DRAW_PILE]
+        player.hand = _hand_of(('red', 4), ('red', 4), ('blue', 7), 'wild')
+        moves = list(generate_moves(game, player, PLAY_STAGE))
+        assert [move for move in moves if move[0] == 'discard'] == [
+            ('discard', 3), ('discard', 2 * 12 + 6), ('discard', 49)]
+        with pytest.raises(ValueError):
+            list(generate_moves(game, player, 'bogus'))
+
+    def test_apply_moves(self):
+        from move_generator import PLAY_STAGE, apply_move, generate_moves, lay_down_moves
+        game = Game([Player("A"), Player("B")])
+        game.start_new_round()
+        first, second = game.players
+        first.hand = _hand_of(('red', 3), ('blue', 3), ('green', 3), ('red', 5), ('blue', 5),
+                              ('green', 5), ('yellow', 3), ('red', 8))
+        move = lay_down_moves(first)[0]
+        assert apply_move(game, first, move)
+        assert first.has_laid_down_phase and len(first.hand.cards) == 2
+
+        second.current_phase = 2
+        second.has_laid_down_phase = True
+        second.hand = _hand_of(('yellow', 5), ('red', 8))
+        hits = [m for m in generate_moves(game, second, PLAY_STAGE) if m[0] == 'hit']
+        assert hits and all(m[1] == 0 for m in hits)
+        assert apply_move(game, second, hits[0])
+        assert apply_move(game, second, ('discard', 7))
+        assert second.hand.cards == []
+
+    def test_hits_on_own_sets(self):
+        from move_generator import PLAY_STAGE, apply_move, generate_moves, lay_down_moves
+        game = Game([Player("A"), Player("B")])
+        game.start_new_round()
+        player = game.players[0]
+        player.hand = _hand_of(('red', 3), ('blue', 3), ('green', 3), ('red', 5), ('blue', 5),
+                               ('green', 5), ('yellow', 5), ('red', 8))
+        assert apply_move(game, player, lay_down_moves(player)[0])
+        hits = [move for move in generate_moves(game, player, PLAY_STAGE) if move[0] == 'hit']
+        # Nobody else has laid down: the only hits are on the player's own sets
+        assert hits and all(move[1] == 0 for move in hits)
+        assert apply_move(game, player, hits[0])
+
+    def test_every_move_applies_to_wild_heavy_hands(self):
+        from move_generator import PLAY_STAGE, apply_move, generate_moves
+        game = Game([Player("A"), Player("B")])
+        game.start_new_round()
+        for phase in (1, 2, 7, 9):
+            player = game.players[0]
+            player.current_phase = phase
+            player.hand = _hand_of(('red', 4), ('blue', 4), ('red', 7), ('yellow', 9),
+                                   'wild', 'wild', 'wild', 'wild', 'wild')
+            moves = list(generate_moves(game, player, PLAY_STAGE))
+            assert any(move[0] == 'lay' for move in moves)
+            for move in moves:
+                clone = game.clone()
+                assert apply_move(clone, clone.players[0], move), move
+
+
+class TestRuleSets:
+    def test_standard_rules_describe_phases(self):
+        from phase_validator.rules import STANDARD_RULES, get_rule_set
+        assert get_rule_set() is STANDARD_RULES
+        assert STANDARD_RULES.last_phase == 10
+        assert STANDARD_RULES.describe(1) == "2 sets of 3"
+        assert STANDARD_RULES.describe(2) == "1 set of 3 + 1 run of 4"
+        assert STANDARD_RULES.describe(8) == "7 cards of one color"
+        assert Player("P").get_phase_requirements() == "2 sets of 3"
+
+    def test_compiled_checks_match_validators(self):
+        import random
+        from card.card import CARD_TABLE
+        from phase_validator.rules import compile_plan
+        scalar = {'set': PhaseValidator._validate_set, 'run': PhaseValidator._validate_run,
+                  'color': PhaseValidator._validate_color_set}
+        rng = random.Random(3)
+        for _ in range(3000):
+            group_type, size = rng.choice(list(scalar)), rng.randint(2, 8)
+            cards = rng.sample(CARD_TABLE[:24] + CARD_TABLE[96:], size)
+            check = compile_plan([(group_type, size)]).checks[0]
+            assert check(cards) == scalar[group_type](cards), (group_type, cards)
+
+    def test_custom_rule_set_drives_game(self):
+        from phase_validator.rules import register_rule_set, rule_set_names
+        rules = register_rule_set('test-short', {1: [('run', 3)], 2: [('set', 2), ('set', 2)]},
+                                  replace=True)
+        assert 'test-short' in rule_set_names()
+        with pytest.raises(ValueError):
+            register_rule_set('test-short', {1: [('set', 3)]})
+        with pytest.raises(ValueError):
+            register_rule_set('test-bad', {1: [('pair', 2)]})
+
+        player = Player("P")
+        game = Game([player, Player("Q")], rules=rules)
+        assert player.rules is rules
+        assert player.get_phase_requirements() == "1 run of 3"
+        player.hand = _hand_of(('red', 4), ('blue', 5), 'wild', ('green', 9))
+        assert PhaseValidator.validate_phase(1, [player.hand.cards[:3]], rules)
+        assert game.lay_down_phase(player, [player.hand.cards[:3]])
+        player.current_phase = 3
+        assert game.is_game_over()
+
+
+class TestBatchValidation:
+    def test_batch_matches_scalar_validators(self):
+        import random
+        np = pytest.importorskip("numpy")
+        from card.card import CARD_TABLE
+        from phase_validator.batch import validate_groups
+        scalar = {'set': PhaseValidator._validate_set, 'run': PhaseValidator._validate_run,
+                  'color': PhaseValidator._validate_color_set}
+        rng = random.Random(5)
+        pool = CARD_TABLE[:30] + CARD_TABLE[96:]
+        for group_type, check in scalar.items():
+            for size in (1, 3, 7, 13):
+                rows = [rng.sample(pool, size) for _ in range(400)]
+                expected = [check(row) for row in rows]
+                got = validate_groups(group_type, np.array([[card.id for card in row] for row in rows]))
+                assert got.tolist() == expected, (group_type, size)
+
+    def test_phase_batch(self):
+        pytest.importorskip("numpy")
+        from card.card import card_index
+        from phase_validator.batch import validate_phase_batch
+        wild = 100
+        candidates = [
+            [card_index('red', 3), card_index('blue', 3), wild,
+             card_index('red', 4), card_index('red', 5), wild, card_index('green', 7)],
+            [card_index('red', 3), card_index('blue', 4), wild,
+             card_index('red', 4), card_index('red', 5), wild, card_index('green', 7)],
+        ]
+        assert validate_phase_batch(PhaseValidator.PHASE_REQUIREMENTS[2], candidates).tolist() == [True, False]
+        with pytest.raises(ValueError):
+            validate_phase_batch([('set', 3)], candidates)
+
+
+class TestBitboardHand:
+    def test_runs_and_counts(self):
+        from hand.bitboard import BitboardHand
+        hand = _hand_of(('red', 3), ('blue', 4), ('red', 5), ('green', 6), ('red', 6), 'wild')
+        board = BitboardHand.from_hand(hand)
+        assert board.run_starts(4) == 1 << 2
+        assert board.run_starts(5) == 0
+        assert board.numbers_with_at_least(2) == 1 << 5
+        assert board.counts == hand.counts
+        assert board.number_counts == hand.number_counts
+        assert len(board) == len(hand)
+
+    def test_can_complete_matches_solver(self):
+        import random
+        from card.card import CARD_TABLE
+        from hand.bitboard import BitboardHand
+        from phase_solver.phase_solver import PhaseSolver
+        rng = random.Random(11)
+        for _ in range(300):
+            hand = Hand()
+            for card in rng.sample(CARD_TABLE, 11):
+                hand.add(card)
+            board = BitboardHand.from_hand(hand)
+            for phase, requirements in PhaseValidator.PHASE_REQUIREMENTS.items():
+                assert board.can_complete(requirements) == PhaseSolver.can_complete(hand, requirements)
+                assert PhaseValidator.can_complete_phase(phase, hand) == board.can_complete(requirements)
+
+    def test_hand_backend_follows_changes(self):
+        import random
+        from card.card import CARD_TABLE
+        from hand.bitboard import BitboardHand
+        rng = random.Random(3)
+        hand = Hand()
+        mirror = Hand()
+        hand.use_bitboard()
+        for card in rng.sample(CARD_TABLE, 40):
+            hand.add(card)
+            mirror.add(card)
+            if len(hand) > 12:
+                gone = hand.cards[rng.randrange(len(hand))]
+                hand.remove(gone)
+                mirror.remove(gone)
+            assert hand.bitboard.layers == BitboardHand.from_hand(hand).layers
+            assert hand.find_runs(4) == mirror.find_runs(4)
+            assert hand.find_sets(3) == mirror.find_sets(3)
+        assert hand.clone().bitboard.layers == hand.bitboard.layers
+
+
+class TestBenchmarks:
+    def test_phase_groups_are_valid(self):
+        from benchmarks.benchmarks import phase_groups
+        for phase, requirements in PhaseValidator.PHASE_REQUIREMENTS.items():
+            groups = phase_groups(requirements)
+            assert PhaseValidator.validate_phase(phase, groups)
+            ids = [card.id for group in groups for card in group]
+            assert len(set(ids)) == len(ids)
+
+    def test_run_save_and_compare(self, tmp_path):
+        from benchmarks.benchmarks import compare, load_results, main, run_benchmarks, save_results
+        results = run_benchmarks(repeat=1, only='try_hit')
+        assert set(results['results']) == {'hit_manager/try_hit/set', 'hit_manager/try_hit/run',
+                                           'hit_manager/try_hit/rejected'}
+        path = tmp_path / 'baseline.json'
+        save_results(results, path)
+        assert load_results(path) == results
+
+        slower = load_results(path)
+        for result in slower['results'].values():
+            result['best'] *= 1.5
+        rows = compare(results, slower, threshold=0.2)
+        assert all(row['regressed'] for row in rows)
+        assert not any(row['regressed'] for row in compare(results, slower, threshold=0.6))
+        save_results(slower, tmp_path / 'slower.json')
+        assert main(['compare', str(path), str(tmp_path / 'slower.json')]) == 1
+        assert main(['compare', str(tmp_path / 'slower.json'), str(path)]) == 0
+        with pytest.raises(ValueError):
+            run_benchmarks(['no/such/scenario'])
+
+
+class TestPerfStats:
+    def test_counts_and_rounds(self):
+        import io
+        import json
+        import random
+        from bot.bot import BotPlayer
+        from perf.perf import is_active
+        original = Hand.find_runs
+        game = Game([BotPlayer("A"), BotPlayer("B")], rng=random.Random(8))
+        assert game.get_perf_stats() is None
+        game.enable_perf_stats()
+        assert is_active() and Hand.find_runs is not original
+        for _ in range(2):
+            game.start_new_round()
+            for _ in range(30):
+                game.get_current_player().play_turn(game)
+                game.end_turn()
+            game.calculate_round_scores()
+            game.reset_for_next_round()
+        game.disable_perf_stats()
+        assert not is_active() and Hand.find_runs is original
+
+        stats = game.get_perf_stats()
+        assert [entry['round'] for entry in stats['rounds']] == [1, 2]
+        totals = stats['totals']
+        assert totals['validator.cached_can_complete']['calls'] > 0
+        assert totals['hit.find_hits']['calls'] == sum(
+            entry['stats'].get('hit.find_hits', {}).get('calls', 0) for entry in stats['rounds'])
+        stream = io.StringIO()
+        game.perf.export_rounds(stream)
+        assert [json.loads(line)['round'] for line in stream.getvalue().splitlines()] == [1, 2]
+        assert game.clone().perf is None
+
+    def test_stats_belong_to_their_game(self):
+        import random
+        from bot.bot import BotPlayer
+        game = Game([BotPlayer("A"), BotPlayer("B")], rng=random.Random(8))
+        other = Game([BotPlayer("C"), BotPlayer("D")], rng=random.Random(9))
+        game.enable_perf_stats()
+        other.start_new_round()
+        for _ in range(10):
+            other.get_current_player().play_turn(other)
+            other.end_turn()
+        assert game.get_perf_stats()['totals'] == {}
+        game.start_new_round()
+        game.get_current_player().play_turn(game)
+        assert game.get_perf_stats()['totals']['hit.find_hits']['calls'] > 0
+        game.disable_perf_stats()
+
+    def test_dropped_game_stops_recording(self):
+        import gc
+        import random
+        from bot.bot import BotPlayer
+        from perf.perf import is_active
+        original = Hand.find_runs
+        game = Game([BotPlayer("A"), BotPlayer("B")], rng=random.Random(8))
+        stats = game.enable_perf_stats()
+        del game
+        gc.collect()
+        assert not stats.active and not is_active() and Hand.find_runs is original
+
+
+class TestProfiling:
+    def test_profile_report_and_files(self, tmp_path):
+        import pstats
+        import tracemalloc
+        from simulation.profiling import MODULES, ProfiledSimulation, module_of
+        report = ProfiledSimulation(max_rounds=2).profile(1, str(tmp_path))
+        assert set(MODULES) <= set(report['modules'])
+        assert report['modules']['bot']['calls'] > 0
+        assert report['modules']['hand']['bytes'] > 0
+        assert report['rounds'] == 2
+        assert pstats.Stats(str(tmp_path / 'profile.pstats')).total_calls > 0
+        tracemalloc.Snapshot.load(str(tmp_path / 'memory_peak.snapshot'))
+        assert (tmp_path / 'report.json').exists()
+        assert module_of(Hand.find_sets.__code__.co_filename) == 'hand'
+        assert module_of('~') == 'other'
+
+
+class TestGameServer:
+    def test_load_generator_tables(self):
+        import asyncio
+        from server.loadgen import run_with_server
+        report = asyncio.run(run_with_server(3, 2, ['human', 'BotPlayer', 'BotPlayer'], 1, bot_workers=2))
+        assert report['tables_served'] == 3 and not report['failures']
+        assert report['actions'] > 0 and report['latency_p50'] <= report['latency_max']
+        assert report['server']['tables_finished'] == 3
+        assert report['server']['bot_turns'] > 0
+
+    def test_protocol_errors_and_moves(self):
+        import asyncio
+        import json
+        from server.server import GameServer, decode_move, encode_message
+
+        assert decode_move(json.loads(json.dumps(('lay', ((1, 2, 3), (4, 5)))))) == ('lay', ((1, 2, 3), (4, 5)))
+        with pytest.raises(ValueError):
+            decode_move([{'x': 1}])
+
+        async def session():
+            server = await GameServer(port=0, bot_workers=1).start()
+            try:
+                reader, writer = await asyncio.open_connection(server.host, server.port)
+
+                async def reply(*skip):
+                    while True:
+                        message = json.loads(await reader.readline())
+                        if message['type'] not in skip:
+                            return message
+
+                replies = []
+                for message in ({'type': 'create', 'seats': ['human', 'NoSuchBot']},
+                                {'type': 'join', 'table': 99},
+                                {'type': 'create', 'seats': ['human', 'BotPlayer'], 'max_rounds': 1},
+                                ):
+                    writer.write(encode_message(message))
+                    await writer.drain()
+                    replies.append(await reply())
+                turn = await reply('snapshot', 'delta')
+                for move in (['discard', 999], [{'x': 1}]):
+                    writer.write(encode_message({'type': 'action', 'move': move}))
+                    await writer.drain()
+                    replies.append(await reply())
+                writer.write(encode_message({'type': 'action', 'move': turn['moves'][0]}))
+                await writer.drain()
+                replies.append(await reply('delta'))
+                writer.close()
+                return turn, replies
+            finally:
+                await server.close()
+
+        turn, replies = asyncio.run(session())
+        assert [reply['type'] for reply in replies] == ['error', 'error', 'created', 'error', 'error', 'result']
+        assert turn['type'] == 'turn' and turn['stage'] == 'draw'
+        assert len(turn['view']['hand']) == 10
+        assert replies[-1]['ok']
+
+    def test_failing_table_reports_game_over(self, monkeypatch):
+        import asyncio
+        import json
+        from server.server import GameServer, encode_message
+
+        def broken_move(game, player, move):
+            raise ValueError("broken move")
+
+        monkeypatch.setattr('server.server.apply_move', broken_move)
+
+        async def session():
+            server = await GameServer(port=0, bot_workers=1).start()
+            try:
+                reader, writer = await asyncio.open_connection(server.host, server.port)
+                writer.write(encode_message({'type': 'create', 'seats': ['human', 'BotPlayer']}))
+                messages = []
+                while not messages or messages[-1]['type'] != 'game_over':
+                    messages.append(json.loads(await asyncio.wait_for(reader.readline(), 5)))
+                    if messages[-1]['type'] == 'turn':
+                        writer.write(encode_message({'type': 'action', 'move': messages[-1]['moves'][0]}))
+                writer.close()
+                return messages
+            finally:
+                await server.close()
+
+        messages = asyncio.run(session())
+        assert messages[-2]['type'] == 'error' and 'broken move' in messages[-2]['message']
+        assert not messages[-1]['completed'] and messages[-1]['winner'] is None
+
+
+class TestStateFeed:
+    def test_deltas_rebuild_redacted_snapshots(self):
+        import json
+        import random
+        from bot.bot import BotPlayer
+        from server.state_feed import StateFeed, apply_ops
+        game = Game([BotPlayer("A"), BotPlayer("B"), BotPlayer("C")], rng=random.Random(4))
+        feed = StateFeed(game, table=1, history=1000)
+        seat_view, spectator_view = feed.snapshot(0)['state'], feed.snapshot()['state']
+        deltas = []
+        for _ in range(2):
+            game.start_new_round()
+            deltas.append(feed.publish())
+            for _ in range(40):
+                game.get_current_player().play_turn(game)
+                game.end_turn()
+                deltas.append(feed.publish())
+            game.calculate_round_scores()
+            game.reset_for_next_round()
+            deltas.append(feed.publish())
+        deltas = [delta for delta in deltas if delta is not None]
+        assert [delta.version for delta in deltas] == list(range(1, feed.version + 1))
+        for delta in deltas:
+            apply_ops(seat_view, json.loads(delta.encode(0))['ops'])
+            apply_ops(spectator_view, json.loads(delta.encode())['ops'])
+            # Seats without private changes share the spectators' bytes
+            assert delta.encode(2) is delta.encode() or 2 in delta.private
+        assert seat_view == feed.snapshot(0)['state']
+        assert spectator_view == feed.snapshot()['state']
+        assert all(player['hand'] is None for player in spectator_view['players'])
+        assert all(op[0] != 'hand' for delta in deltas for op in delta.ops())
+
+        assert feed.since(feed.version) == []
+        assert len(feed.since(feed.version - 3, 1)) == 3
+        assert StateFeed(game, history=2).since(-5) is None
+
+    def test_ad_hoc_cards_are_described_by_kind(self):
+        from move_generator import card_kind
+        from server.state_feed import StateFeed
+        game = Game([Player("A"), Player("B")])
+        game.players[0].hand = _hand_of(('red', 5), 'wild')
+        feed = StateFeed(game)
+        hand = feed.snapshot(0)['state']['players'][0]['hand']
+        assert hand == sorted(card_kind(card) for card in game.players[0].hand.cards)
+
+    def test_spectators_follow_a_bot_table(self):
+        import asyncio
+        import json
+        from server.server import GameServer, encode_message
+        from server.state_feed import apply_ops
+
+        async def session():
+            server = await GameServer(port=0, bot_workers=1).start()
+            try:
+                reader, writer = await asyncio.open_connection(server.host, server.port)
+                writer.write(encode_message({'type': 'create', 'seats': ['BotPlayer', 'BotPlayer'],
+                                             'max_rounds': 1}))
+                await writer.drain()
+                view = None
+                while True:
+                    message = json.loads(await reader.readline())
+                    if message['type'] == 'snapshot':
+                        view = message
+                    elif message['type'] == 'delta':
+                        assert message['v'] == view['v'] + 1
+                        apply_ops(view['state'], message['ops'])
+                        view['v'] = message['v']
+                    elif message['type'] == 'game_over':
+                        break
+                writer.close()
+                return view
+            finally:
+                await server.close()
+
+        view = asyncio.run(session())
+        assert view['v'] > 1
+        assert sum(player['hand_size'] for player in view['state']['players']) > 0